@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Per-operation latency of the local memory backend.
+Fills a fresh SQLite store with synthetic preferences, then times add,
+bulk add, get, page and search calls in process, with no server and no
+network. Fails if the p50 of any single-item operation exceeds --budget-us
+(bulk adds get the budget per item), so it can run offline in CI.
+
+    python benchmarks/bench_backends.py --preferences 10000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from bench_search import WORDS, preference  # noqa: E402
+
+from mem0_mcp.local_backend import LocalBackend  # noqa: E402
+
+# Sub-millisecond target for a single operation
+DEFAULT_BUDGET_US = 1000.0
+
+
+async def timed(name: str, fn, runs: int, budget_us: float) -> bool:
+    latencies = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        await fn()
+        latencies.append((time.perf_counter() - started) * 1e6)
+    quantiles = statistics.quantiles(latencies, n=100)
+    over = quantiles[49] > budget_us
+    print(
+        f"  {name:<22} p50={quantiles[49]:>8.1f} us   p99={quantiles[98]:>8.1f} us"
+        f"{'   OVER BUDGET' if over else ''}"
+    )
+    return not over
+
+
+async def run(args) -> bool:
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as state_dir:
+        backend = LocalBackend(
+            os.path.join(state_dir, "memories.sqlite3"), search_limit=args.limit, dim=args.dim
+        )
+        await backend.start()
+        items = [
+            (p["content"], p["tags"]) for p in (preference(i, rng) for i in range(args.preferences))
+        ]
+        started = time.perf_counter()
+        for offset in range(0, len(items), 500):
+            await backend.add_many(items[offset : offset + 500])
+        elapsed = time.perf_counter() - started
+        print(
+            f"stored {len(items)} preferences in {elapsed * 1000:.0f} ms "
+            f"({elapsed / len(items) * 1e6:.1f} us each)"
+        )
+
+        ids = [p["id"] for p in (await backend.get_all())["preferences"]]
+        queries = [" ".join(rng.sample(WORDS, 2)) for _ in range(args.runs)]
+        fresh = iter(
+            [
+                (p["content"], p["tags"])
+                for p in (preference(args.preferences + i, rng) for i in range(args.runs * 51))
+            ]
+        )
+        query = iter(queries)
+
+        print(f"operations on {len(ids)} memories, search limit {args.limit}:")
+        # Reads first, so they run against exactly --preferences memories
+        results = [
+            await timed("get", lambda: backend.get(rng.choice(ids)), args.runs, args.budget_us),
+            await timed(
+                "get_page (100)",
+                lambda: backend.get_page(str(rng.randrange(len(ids))), 100),
+                args.runs,
+                args.budget_us,
+            ),
+            await timed("search", lambda: backend.search(next(query)), args.runs, args.budget_us),
+            await timed("add", lambda: backend.add(*next(fresh)), args.runs, args.budget_us),
+            await timed(
+                "add_many (50)",
+                lambda: backend.add_many([next(fresh) for _ in range(50)]),
+                args.runs,
+                args.budget_us * 50,
+            ),
+        ]
+        await backend.close()
+    return all(results)
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark the local memory backend")
+    parser.add_argument("--preferences", type=int, default=10000, help="Preferences to store")
+    parser.add_argument("--runs", type=int, default=500, help="Calls per operation")
+    parser.add_argument("--limit", type=int, default=10, help="Results per search")
+    parser.add_argument("--dim", type=int, default=256, help="Hashed embedding dimensions")
+    parser.add_argument(
+        "--budget-us",
+        type=float,
+        default=DEFAULT_BUDGET_US,
+        help="Max p50 per operation, in microseconds",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(run(parse_args())) else 1)
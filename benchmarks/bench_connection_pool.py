@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Compare a fresh aiohttp session per call against the shared pooled Mem0Client.
+Runs fully offline against benchmarks/stub_mem0.py.
+
+    python benchmarks/bench_connection_pool.py --calls 500 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from typing import Awaitable, Callable, List
+
+import aiohttp
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from stub_mem0 import start_stub  # noqa: E402
+
+from mem0_mcp import Mem0Client  # noqa: E402
+
+
+async def session_per_call(base_url: str, query: str) -> None:
+    """The pre-pool behaviour: a new session, connector and connection per call."""
+    async with aiohttp.ClientSession() as session:
+        async with session.get(
+            f"{base_url}/api/v1/mems/search",
+            headers={"Authorization": "Bearer bench"},
+            params={"query": query},
+        ) as response:
+            await response.json()
+
+
+async def run(
+    name: str,
+    call: Callable[[int], Awaitable[None]],
+    calls: int,
+    concurrency: int,
+) -> None:
+    latencies: List[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await call(i)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(calls)))
+    elapsed = time.perf_counter() - started
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{name:<18} {calls / elapsed:>9.0f} req/s   "
+        f"p50={quantiles[49]:.2f}ms  p95={quantiles[94]:.2f}ms  p99={quantiles[98]:.2f}ms"
+    )
+
+
+async def main(args) -> None:
+    runner, stub, base_url = await start_stub(latency_ms=args.latency_ms)
+    client = Mem0Client(base_url, "bench")
+    await client.start()
+    try:
+        print(f"stub={base_url} calls={args.calls} concurrency={args.concurrency}")
+        await run(
+            "session-per-call",
+            lambda i: session_per_call(base_url, f"q{i}"),
+            args.calls,
+            args.concurrency,
+        )
+        await run("pooled-client", lambda i: client.search(f"q{i}"), args.calls, args.concurrency)
+    finally:
+        await client.close()
+        await runner.cleanup()
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Connection pool benchmark")
+    parser.add_argument("--calls", type=int, default=500, help="Total calls per mode")
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent calls")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Stub latency per request")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
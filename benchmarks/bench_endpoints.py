@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Throughput and latency of every client-facing protocol, with baselines.
+Starts the stub Mem0 and the server (main_with_cors.py, which serves /mcp,
+/messages/ and /sse), seeds preferences, then drives each scenario from
+concurrent clients and reports requests per second and p50/p95/p99 latency.
+Results are compared with a saved baseline so regressions stand out.
+
+    python benchmarks/bench_endpoints.py                     # compare with the baseline
+    python benchmarks/bench_endpoints.py --save-baseline     # record a new baseline
+    python benchmarks/bench_endpoints.py --scenarios mcp_search sse_fanout --duration 10
+
+Scenarios:
+    mcp_search       POST /mcp search_coding_preferences
+    mcp_get_page     POST /mcp get_all_coding_preferences, 20 per page
+    mcp_batch        POST /mcp with an array of 10 searches
+    mcp_add          POST /mcp add_coding_preference
+    messages_search  POST /messages/ n8n tool_call search
+    messages_add     POST /messages/ n8n tool_call add (text only)
+    sse_connect      GET /sse until the first frame arrives
+    sse_fanout       add via /mcp while --sse-subscribers streams are open; latency is
+                     from the add request to the preference.added event at each
+                     subscriber, throughput is events delivered per second
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List
+
+import aiohttp
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from loadgen import (  # noqa: E402
+    ROOT,
+    LoadResult,
+    Request,
+    compare,
+    format_summary,
+    load_baseline,
+    run_load,
+    save_baseline,
+    server_process,
+    stub_process,
+)
+
+SEED_PREFERENCES = 100
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baselines", "endpoints.json")
+
+
+def tool_call(name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    return {"name": name, "arguments": arguments}
+
+
+def n8n_call(call_id: str, name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "type": "tool_call",
+        "tool_call": {"id": call_id, "function": {"name": name, "arguments": arguments}},
+    }
+
+
+def succeeded(body: Any) -> bool:
+    """Whether a tool result (or every result of a batch) succeeded."""
+    if isinstance(body, list):
+        return all(item["status"] == 200 and item["result"].get("success") for item in body)
+    return bool(body.get("success"))
+
+
+def post(url: str, make_body: Callable[[int, int], Any]) -> Request:
+    """A request posting make_body(client, iteration) to url."""
+
+    async def request(session: aiohttp.ClientSession, number: int, i: int) -> bool:
+        async with session.post(url, json=make_body(number, i)) as response:
+            return response.status == 200 and succeeded(await response.json())
+
+    return request
+
+
+def scenarios(base: str) -> Dict[str, Request]:
+    """The request of every plain load scenario (everything but sse_fanout)."""
+
+    def query(n: int, i: int) -> str:
+        return f"snippet {(n * 7 + i) % SEED_PREFERENCES}"
+
+    def add(n: int, i: int) -> Dict[str, Any]:
+        # Unique code, so the duplicate index does not answer the add
+        return {"title": f"bench {n}-{i}", "content": f"x = {n}_{i}", "language": "python"}
+
+    async def sse_connect(session: aiohttp.ClientSession, number: int, i: int) -> bool:
+        async with session.get(f"{base}/sse") as response:
+            async for line in response.content:
+                if line.startswith(b"data:"):
+                    return True
+        return False
+
+    return {
+        "mcp_search": post(
+            f"{base}/mcp",
+            lambda n, i: tool_call("search_coding_preferences", {"query": query(n, i)}),
+        ),
+        "mcp_get_page": post(
+            f"{base}/mcp", lambda n, i: tool_call("get_all_coding_preferences", {"limit": 20})
+        ),
+        "mcp_batch": post(
+            f"{base}/mcp",
+            lambda n, i: [
+                tool_call("search_coding_preferences", {"query": query(n, i + k)})
+                for k in range(10)
+            ],
+        ),
+        "messages_search": post(
+            f"{base}/messages/",
+            lambda n, i: n8n_call(f"{n}-{i}", "search_coding_preferences", {"query": query(n, i)}),
+        ),
+        "mcp_add": post(f"{base}/mcp", lambda n, i: tool_call("add_coding_preference", add(n, i))),
+        "messages_add": post(
+            f"{base}/messages/",
+            lambda n, i: n8n_call(
+                f"{n}-{i}", "add_coding_preference", {"text": f"const x = {n}_{i};"}
+            ),
+        ),
+        "sse_connect": sse_connect,
+    }
+
+
+async def sse_fanout(base: str, subscribers: int, concurrency: int, duration: float) -> LoadResult:
+    """Add preferences while subscribers listen on /sse; measure event delivery."""
+    received: Dict[str, List[float]] = defaultdict(list)
+    sent: Dict[str, float] = {}
+    connected = asyncio.Semaphore(0)
+
+    async def subscriber(session: aiohttp.ClientSession) -> None:
+        async with session.get(f"{base}/sse") as response:
+            first = True
+            async for line in response.content:
+                if not line.startswith(b"data:"):
+                    continue
+                if first:
+                    connected.release()
+                    first = False
+                message = json.loads(line[5:])
+                if message["type"] == "preference.added":
+                    received[message["content"]["id"]].append(time.perf_counter())
+
+    async def add(session: aiohttp.ClientSession, number: int, i: int) -> bool:
+        started = time.perf_counter()
+        body = tool_call(
+            "add_coding_preference",
+            {"title": f"fanout {number}-{i}", "content": f"y = {number}_{i}", "language": "python"},
+        )
+        async with session.post(f"{base}/mcp", json=body) as response:
+            result = await response.json()
+        if not result.get("success"):
+            return False
+        sent[result["id"]] = started
+        return True
+
+    connector = aiohttp.TCPConnector(limit=0)
+    timeout = aiohttp.ClientTimeout(total=None)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        tasks = [asyncio.create_task(subscriber(session)) for _ in range(subscribers)]
+        for _ in range(subscribers):
+            await asyncio.wait_for(connected.acquire(), timeout=30)
+
+        adds = await run_load(add, concurrency, duration)
+        # Let the last events arrive
+        await asyncio.sleep(1.0)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    result = LoadResult(requests=len(sent) * subscribers, elapsed=adds.elapsed)
+    for mem_id, started in sent.items():
+        arrivals = received.get(mem_id, [])
+        result.latencies.extend((arrival - started) * 1000 for arrival in arrivals)
+        result.errors += subscribers - len(arrivals)
+    return result
+
+
+async def seed(base: str) -> None:
+    """Store SEED_PREFERENCES preferences for the read scenarios to find."""
+    body = [
+        tool_call(
+            "add_coding_preference",
+            {"title": f"snippet {k}", "content": f"snippet {k}", "language": "python"},
+        )
+        for k in range(SEED_PREFERENCES)
+    ]
+    async with aiohttp.ClientSession() as session:
+        async with session.post(f"{base}/mcp", json=body) as response:
+            if not succeeded(await response.json()):
+                raise RuntimeError("Seeding the stub Mem0 failed")
+
+
+def run(args) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    with stub_process(args.stub_port, args.latency_ms, args.error_rate) as stub_url:
+        with server_process(args.server, args.port, stub_url, workers=args.workers) as base:
+            asyncio.run(seed(base))
+            requests = scenarios(base)
+            for name in args.scenarios:
+                if name == "sse_fanout":
+                    result = asyncio.run(
+                        sse_fanout(base, args.sse_subscribers, args.concurrency, args.duration)
+                    )
+                else:
+                    result = asyncio.run(run_load(requests[name], args.concurrency, args.duration))
+                results[name] = result.summary()
+                print(format_summary(name, results[name]))
+    return results
+
+
+SCENARIOS = [
+    "mcp_search",
+    "mcp_get_page",
+    "mcp_batch",
+    "messages_search",
+    "mcp_add",
+    "messages_add",
+    "sse_connect",
+    "sse_fanout",
+]
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Load test /mcp, /messages/ and /sse")
+    parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        choices=SCENARIOS,
+        default=SCENARIOS,
+        help="Scenarios to run, in order",
+    )
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per scenario")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Simulated Mem0 latency")
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Share of Mem0 requests the stub fails"
+    )
+    parser.add_argument(
+        "--sse-subscribers", type=int, default=50, help="Open /sse streams during sse_fanout"
+    )
+    parser.add_argument("--workers", type=int, default=1, help="Server worker processes")
+    parser.add_argument(
+        "--server",
+        type=str,
+        default="main_with_cors.py",
+        help="Server script, relative to the repo root",
+    )
+    parser.add_argument("--port", type=int, default=8092, help="Port for the server under test")
+    parser.add_argument("--stub-port", type=int, default=9092, help="Port for the stub Mem0")
+    parser.add_argument(
+        "--baseline",
+        type=str,
+        default=DEFAULT_BASELINE,
+        help="Baseline JSON to compare with (or to write)",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store these results as the baseline instead of comparing",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Allowed throughput drop or p95 rise before flagging a regression",
+    )
+    parser.add_argument(
+        "--fail-on-regression",
+        action="store_true",
+        help="Exit with status 1 if any scenario regressed",
+    )
+    parser.add_argument("--output", type=str, default=None, help="Also write results as JSON here")
+    return parser.parse_args()
+
+
+def main(args) -> int:
+    settings = {
+        key: getattr(args, key)
+        for key in (
+            "duration",
+            "concurrency",
+            "latency_ms",
+            "error_rate",
+            "sse_subscribers",
+            "workers",
+            "server",
+        )
+    }
+    print(
+        f"{os.cpu_count()} CPU cores, {args.concurrency} concurrent clients, "
+        f"Mem0 latency {args.latency_ms} ms, {args.workers} worker(s)"
+    )
+    results = run(args)
+
+    if args.output:
+        save_baseline(args.output, results, settings)
+    if args.save_baseline:
+        save_baseline(args.baseline, results, settings)
+        print(f"Baseline written to {os.path.relpath(args.baseline)}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print("No baseline yet; record one with --save-baseline")
+        return 0
+    if baseline["settings"] != settings or baseline.get("cpu_count") != os.cpu_count():
+        print("Note: the baseline was recorded with different settings or on another machine")
+    regressions = compare(results, baseline, args.tolerance)
+    for name, reason in regressions:
+        print(f"REGRESSION {name}: {reason}")
+    if not regressions:
+        print(
+            f"No regressions against {os.path.relpath(args.baseline)} "
+            f"(tolerance {args.tolerance:.0%})"
+        )
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
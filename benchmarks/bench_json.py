@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of JSON serialization on the hot paths.
+Compares the stdlib encoder with orjson (if installed) for a typical search
+response, and rebuilding the /sse tool frames per connect with sending the
+frames precomputed at startup.
+
+    python benchmarks/bench_json.py --preferences 100
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from mem0_mcp import serialization  # noqa: E402
+
+SNIPPET = (
+    "async def fetch(session, url):\n"
+    "    async with session.get(url) as r:\n"
+    "        return await r.json()\n"
+)
+
+
+def search_response(count: int):
+    return {
+        "success": True,
+        "preferences": [
+            {
+                "id": f"mem-{i}",
+                "content": (
+                    f"# Snippet {i}\n\n```python\n{SNIPPET}```\n\nFetches JSON — “ünïcode”"
+                ),
+                "tags": ["python", "async", "http"],
+                "score": 0.5 + i / (2 * count),
+            }
+            for i in range(count)
+        ],
+    }
+
+
+def stdlib_dumps(content) -> bytes:
+    # What starlette's JSONResponse does
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def report(name: str, fn, number: int) -> float:
+    seconds = min(timeit.repeat(fn, number=number, repeat=5)) / number
+    print(f"  {name:<28} {seconds * 1e6:>9.2f} us/op")
+    return seconds
+
+
+def main(args) -> None:
+    payload = search_response(args.preferences)
+    print(
+        f"search response with {args.preferences} preferences "
+        f"({len(stdlib_dumps(payload))} bytes):"
+    )
+    baseline = report("stdlib json", lambda: stdlib_dumps(payload), args.number)
+    if serialization.orjson is not None:
+        fast = report("orjson", lambda: serialization.orjson.dumps(payload), args.number)
+        print(f"  speedup: {baseline / fast:.1f}x")
+    else:
+        print('  orjson not installed (pip install -e ".[fast-json]")')
+
+    tools = [
+        {
+            "name": f"tool_{i}",
+            "description": "A tool",
+            "input_schema": {
+                "type": "object",
+                "properties": {"query": {"type": "string"}},
+                "required": ["query"],
+            },
+        }
+        for i in range(3)
+    ]
+
+    def rebuild_frames():
+        frames = [
+            f"data: {json.dumps({'type': 'server.info', 'content': {'name': 'mem0-mcp'}})}\n\n"
+        ]
+        for tool in tools:
+            frames.append(f"data: {json.dumps({'type': 'server.tool', 'content': tool})}\n\n")
+        return [frame.encode() for frame in frames]
+
+    precomputed = rebuild_frames()
+    print("/sse tool frames per connect:")
+    rebuilt = report("rebuilt per connect", rebuild_frames, args.number)
+    cached = report("precomputed at startup", lambda: list(precomputed), args.number)
+    print(f"  speedup: {rebuilt / cached:.1f}x")
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="JSON serialization micro-benchmark")
+    parser.add_argument("--preferences", type=int, default=100, help="Preferences per response")
+    parser.add_argument("--number", type=int, default=200, help="Iterations per measurement")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Event-loop stalls while parsing a large tool-call body.
+Parses an add_coding_preference call carrying a --size-mb snippet inline and
+with request_body's worker-thread path, while a ticker on the same loop
+records how late it wakes up, and times splitting the snippet into chunks.
+
+    python benchmarks/bench_large_body.py --size-mb 4
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from mem0_mcp.chunking import split  # noqa: E402
+from mem0_mcp.serialization import loads  # noqa: E402
+
+TICK = 0.001
+
+
+def request_body(size: int) -> bytes:
+    line = "    result = compute_value(argument_one, argument_two)  # “ünïcode”\n"
+    content = line * (size // len(line.encode()))
+    call = {
+        "name": "add_coding_preference",
+        "arguments": {"title": "Vendored module", "content": content, "language": "python"},
+    }
+    return json.dumps(call, ensure_ascii=False).encode()
+
+
+async def ticker(lags, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - started - TICK)
+
+
+async def measure(body: bytes, threaded: bool, runs: int):
+    lags = []
+    stop = asyncio.Event()
+    task = asyncio.create_task(ticker(lags, stop))
+    await asyncio.sleep(0.01)
+    started = time.perf_counter()
+    for _ in range(runs):
+        if threaded:
+            await asyncio.to_thread(loads, body)
+        else:
+            loads(body)
+        await asyncio.sleep(0)
+    elapsed = (time.perf_counter() - started) / runs
+    stop.set()
+    await task
+    return elapsed, max(lags)
+
+
+async def main(args) -> None:
+    body = request_body(int(args.size_mb * 1024 * 1024))
+    print(f"add_coding_preference body of {len(body)} bytes, {args.runs} parses:")
+    for name, threaded in (("inline", False), ("worker thread", True)):
+        elapsed, lag = await measure(body, threaded, args.runs)
+        print(f"  {name:<14} parse {elapsed * 1e3:>8.1f} ms   worst loop lag {lag * 1e3:>8.1f} ms")
+
+    content = loads(body)["arguments"]["content"]
+    started = time.perf_counter()
+    spans = split(content, args.chunk_size, args.overlap)
+    print(
+        f"  split into {len(spans)} chunks of <= {args.chunk_size} characters"
+        f" in {(time.perf_counter() - started) * 1e3:.1f} ms"
+    )
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Measure event-loop lag while parsing large bodies"
+    )
+    parser.add_argument("--size-mb", type=float, default=4, help="Snippet size in MiB")
+    parser.add_argument("--runs", type=int, default=5, help="Parses per mode")
+    parser.add_argument("--chunk-size", type=int, default=8000, help="CHUNK_SIZE")
+    parser.add_argument("--overlap", type=int, default=400, help="CHUNK_OVERLAP")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Payload bytes per read-tool call, before and after the response size controls.
+Builds a search response of realistic preferences and reports its serialized
+size in the full shape, with truncated snippets, with a field projection and
+in the compact shape, each uncompressed, gzipped and brotli-compressed
+(if brotli is installed), plus the time compression adds.
+
+    python benchmarks/bench_payload.py --preferences 20
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from mem0_mcp.compression import brotli, compress  # noqa: E402
+from mem0_mcp.projection import ResponseShapeArgs, shape_result  # noqa: E402
+from mem0_mcp.serialization import dumps  # noqa: E402
+
+WORDS = [
+    "fetch",
+    "parse",
+    "retry",
+    "cache",
+    "session",
+    "request",
+    "response",
+    "handler",
+    "stream",
+    "buffer",
+    "token",
+    "query",
+    "user",
+    "config",
+    "client",
+    "server",
+    "error",
+    "timeout",
+    "backoff",
+    "json",
+    "file",
+    "path",
+    "schema",
+    "worker",
+    "queue",
+    "batch",
+]
+
+
+def snippet(rng: random.Random) -> str:
+    """A few lines of plausible, non-repeating Python."""
+    lines = []
+    for _ in range(rng.randint(2, 4)):
+        a, b, c, d = rng.sample(WORDS, 4)
+        lines += [
+            f"async def {a}_{b}({c}, {d}=None):",
+            f'    """{a.title()} the {b} of a {c}, using {d} when given."""',
+            f"    {b}s = [{d} for {d} in {c}.{a}_{b}s() if {d}.{rng.choice(WORDS)}]",
+            f"    if not {b}s:",
+            f'        raise {c.title()}Error(f"no {b} for {{{c}!r}}")',
+            f"    return await {rng.choice(WORDS)}_{c}({b}s, limit={rng.randint(1, 500)})",
+            "",
+        ]
+    return "\n".join(lines)
+
+
+def search_response(count: int):
+    rng = random.Random(7)
+    return {
+        "success": True,
+        "preferences": [
+            {
+                "id": f"{rng.getrandbits(128):032x}",
+                "content": f"# {' '.join(rng.sample(WORDS, 3)).capitalize()} helper\n\n"
+                f"```python\n{snippet(rng)}```\n\n"
+                f"Use for {' and '.join(rng.sample(WORDS, 2))} handling.",
+                "tags": rng.sample(WORDS, 3),
+                "score": round(1.0 - i / count, 4),
+            }
+            for i in range(count)
+        ],
+    }
+
+
+SHAPES = {
+    "full (before)": ResponseShapeArgs(),
+    "max_content_chars=300": ResponseShapeArgs(max_content_chars=300),
+    "fields=id,title,tags,score": ResponseShapeArgs(fields=["id", "title", "tags", "score"]),
+    "compact": ResponseShapeArgs(compact=True),
+}
+
+
+def main(args) -> None:
+    result = search_response(args.preferences)
+    encodings = ["gzip"] + (["br"] if brotli is not None else [])
+    print(f"search response with {args.preferences} preferences, bytes per call:")
+    print(f"  {'shape':<28} {'identity':>9} " + " ".join(f"{e:>9}" for e in encodings))
+    full = len(dumps(result))
+    for name, shape in SHAPES.items():
+        body = dumps(shape_result(result, shape))
+        sizes = [len(body)] + [len(compress(body, e)) for e in encodings]
+        print(
+            f"  {name:<28} "
+            + " ".join(f"{size:>9}" for size in sizes)
+            + f"   ({full / min(sizes):.0f}x smaller at best)"
+        )
+    if brotli is None:
+        print('  brotli not installed (pip install -e ".[compression]")')
+
+    body = dumps(result)
+    print("compression time, full shape:")
+    for encoding in encodings:
+        seconds = (
+            min(timeit.repeat(lambda: compress(body, encoding), number=args.number, repeat=5))
+            / args.number
+        )
+        print(f"  {encoding:<28} {seconds * 1e6:>9.1f} us/op")
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Measure read-tool payload sizes")
+    parser.add_argument("--preferences", type=int, default=20, help="Preferences per response")
+    parser.add_argument("--number", type=int, default=100, help="Compressions per timing run")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Fault-injection scenarios for the Mem0 resilience layer.
+Runs Mem0Client against the local stub while it returns random 503s, sends
+429 with Retry-After, and goes fully down, and reports success rates,
+latencies, circuit breaker state and stale cache fallbacks.
+
+    python benchmarks/bench_resilience.py --calls 200 --error-rate 0.3
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from stub_mem0 import start_stub  # noqa: E402
+
+from mem0_mcp import ClientSettings, Mem0Client, ResponseCache  # noqa: E402
+
+
+async def run_calls(client: Mem0Client, calls: int, query_prefix: str):
+    """Run searches one after another. Returns (successes, stale, latencies in ms)."""
+    successes, stale, latencies = 0, 0, []
+    for i in range(calls):
+        started = time.perf_counter()
+        result = await client.search(f"{query_prefix} {i}")
+        latencies.append((time.perf_counter() - started) * 1000)
+        successes += bool(result.get("success"))
+        stale += bool(result.get("stale"))
+    return successes, stale, latencies
+
+
+def report(name: str, calls: int, successes: int, latencies, extra: str = "") -> None:
+    print(
+        f"  {name:<22} {successes / calls * 100:>5.1f}% ok   "
+        f"p50={statistics.median(latencies):.1f}ms  max={max(latencies):.1f}ms  {extra}"
+    )
+
+
+async def main(args) -> None:
+    # Injected failures are expected; keep the report readable
+    logging.disable(logging.ERROR)
+    runner, stub, base_url = await start_stub(error_rate=args.error_rate)
+    no_cache = dict(cache=None)
+    try:
+        print(f"random {stub.error_status}s on {args.error_rate:.0%} of requests:")
+        for retries in (0, 3):
+            settings = ClientSettings(max_retries=retries, retry_base=0.01, breaker_threshold=1000)
+            client = Mem0Client(base_url, "bench", settings, **no_cache)
+            ok, _, latencies = await run_calls(client, args.calls, f"flaky{retries}")
+            report(
+                f"max_retries={retries}",
+                args.calls,
+                ok,
+                latencies,
+                f"retries={client.resilience.stats.retries}",
+            )
+            await client.close()
+
+        print("429 with Retry-After: 0.2s on every other request:")
+        stub.error_rate, stub.error_status, stub.retry_after = 0.5, 429, 0.2
+        client = Mem0Client(base_url, "bench", ClientSettings(retry_base=0.01), **no_cache)
+        ok, _, latencies = await run_calls(client, 20, "throttled")
+        report("honoring Retry-After", 20, ok, latencies)
+        await client.close()
+
+        print("full outage, then recovery:")
+        stub.error_rate, stub.error_status, stub.retry_after = 0.0, 503, None
+        settings = ClientSettings(retry_base=0.01, breaker_threshold=5, breaker_reset=1.0)
+        client = Mem0Client(base_url, "bench", settings, cache=ResponseCache(ttl=0.0))
+        warm = 10
+        await run_calls(client, warm, "warm")
+
+        stub.down = True
+        faults_before = stub.faults
+        ok, stale, latencies = await run_calls(client, warm, "warm")
+        report(
+            "outage, cached queries",
+            warm,
+            ok,
+            latencies,
+            f"stale={stale} upstream_hits={stub.faults - faults_before} "
+            f"circuit={client.resilience.breaker.state}",
+        )
+        ok, _, latencies = await run_calls(client, args.calls, "cold")
+        report(
+            "outage, new queries",
+            args.calls,
+            ok,
+            latencies,
+            f"rejected={client.resilience.stats.rejected}",
+        )
+
+        stub.down = False
+        await asyncio.sleep(settings.breaker_reset)
+        ok, _, latencies = await run_calls(client, 10, "recovered")
+        report("after recovery", 10, ok, latencies, f"circuit={client.resilience.breaker.state}")
+        await client.close()
+    finally:
+        await runner.cleanup()
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Mem0 resilience fault-injection scenarios")
+    parser.add_argument("--calls", type=int, default=200, help="Calls per scenario")
+    parser.add_argument("--error-rate", type=float, default=0.3, help="Share of random 503s")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of the local keyword index.
+Indexes synthetic preferences across several languages and tags, then times
+filter-only, keyword and filtered keyword searches, plus hybrid fusion with a
+second ranking. No server and no network: this is the work a search does once
+the local index is ready.
+
+    python benchmarks/bench_search.py --preferences 10000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from mem0_mcp.keyword_index import KeywordIndex  # noqa: E402
+from mem0_mcp.local_search import FUSION_DEPTH, fuse  # noqa: E402
+
+LANGUAGES = ["python", "javascript", "typescript", "go", "rust", "java", "sql", "bash"]
+TAGS = [
+    "async",
+    "http",
+    "testing",
+    "database",
+    "cli",
+    "parsing",
+    "caching",
+    "logging",
+    "security",
+    "ui",
+    "retry",
+    "streaming",
+]
+WORDS = [
+    "fetch",
+    "parse",
+    "retry",
+    "cache",
+    "session",
+    "request",
+    "response",
+    "handler",
+    "stream",
+    "buffer",
+    "token",
+    "query",
+    "user",
+    "config",
+    "client",
+    "server",
+    "error",
+    "timeout",
+    "backoff",
+    "json",
+    "file",
+    "path",
+    "schema",
+    "worker",
+    "queue",
+    "batch",
+]
+
+
+def preference(i: int, rng: random.Random):
+    language = rng.choice(LANGUAGES)
+    words = rng.sample(WORDS, 6)
+    code = "\n".join(
+        f"def {a}_{b}(value):\n    return {c}Handler(value)"
+        for a, b, c in zip(words, words[1:], words[2:])
+    )
+    return {
+        "id": f"mem-{i}",
+        "content": f"# {words[0]} {words[1]} helper {i}\n\n```{language}\n{code}\n```\n\n"
+        f"Use {words[3]} with {words[4]}",
+        "tags": rng.sample(TAGS, 2),
+    }
+
+
+def timed(name: str, fn, runs: int) -> None:
+    latencies = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - started) * 1e6)
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"  {name:<34} p50={quantiles[49]:>8.1f} us   p99={quantiles[98]:>8.1f} us")
+
+
+def main(args) -> None:
+    rng = random.Random(42)
+    preferences = [preference(i, rng) for i in range(args.preferences)]
+
+    index = KeywordIndex()
+    started = time.perf_counter()
+    index.add_many(preferences)
+    elapsed = time.perf_counter() - started
+    print(
+        f"indexed {len(index)} preferences in {elapsed * 1000:.0f} ms "
+        f"({elapsed / len(index) * 1e6:.1f} us each)"
+    )
+
+    queries = [" ".join(rng.sample(WORDS, 2)) for _ in range(args.runs)]
+    cycle = iter(queries * 2)
+    limit = args.limit
+    print(f"searches, limit {limit}:")
+    timed("language filter", lambda: index.search("", limit, "python"), args.runs)
+    timed("language + tag filter", lambda: index.search("", limit, "go", ["async"]), args.runs)
+    timed("keyword", lambda: index.search(next(cycle), limit), args.runs)
+    cycle = iter(queries * 2)
+    timed(
+        "keyword + language + tag filter",
+        lambda: index.search(next(cycle), limit, "python", ["http"]),
+        args.runs,
+    )
+
+    # Hybrid fuses the keyword ranking with a semantic one; time the fusion itself
+    other = index.search("", FUSION_DEPTH, "python")
+    cycle = iter(queries * 2)
+    timed(
+        "hybrid fusion (keyword side + RRF)",
+        lambda: fuse([index.search(next(cycle), FUSION_DEPTH), other], limit),
+        args.runs,
+    )
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark the local keyword index")
+    parser.add_argument("--preferences", type=int, default=10000, help="Preferences to index")
+    parser.add_argument("--runs", type=int, default=500, help="Searches per case")
+    parser.add_argument("--limit", type=int, default=10, help="Results per search")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Write latency of add_coding_preference: synchronous Mem0 POST vs the spool.
+Runs against the local stub Mem0 with simulated latency and reports the time
+until the caller gets its ID back, then how long the worker takes to drain.
+
+    python benchmarks/bench_spool.py --writes 1000 --latency-ms 50
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from stub_mem0 import start_stub  # noqa: E402
+
+from mem0_mcp import Mem0Client, WriteSpool  # noqa: E402
+
+
+def report(name: str, samples) -> None:
+    samples = sorted(samples)
+    p99 = samples[int(len(samples) * 0.99) - 1]
+    print(
+        f"  {name:<12} median {statistics.median(samples) * 1e6:>10.1f} us   "
+        f"p99 {p99 * 1e6:>10.1f} us"
+    )
+
+
+async def main(args) -> None:
+    runner, stub, base_url = await start_stub(latency_ms=args.latency_ms)
+    client = Mem0Client(base_url, "bench")
+    await client.start()
+    try:
+        samples = []
+        for i in range(min(args.writes, 100)):
+            started = time.perf_counter()
+            await client.add(f"sync {i}", ["bench"])
+            samples.append(time.perf_counter() - started)
+        print(f"{args.writes} writes, Mem0 latency {args.latency_ms} ms:")
+        report("sync add", samples)
+
+        with tempfile.TemporaryDirectory() as directory:
+            spool = WriteSpool(os.path.join(directory, "spool.sqlite3"), fsync=args.fsync)
+            samples = []
+            for i in range(args.writes):
+                started = time.perf_counter()
+                await spool.append(f"spooled {i}", ["bench"])
+                samples.append(time.perf_counter() - started)
+            report("spool append", samples)
+
+            started = time.perf_counter()
+            spool.start(client)
+            while (await spool.stats())["pending"]:
+                await asyncio.sleep(0.01)
+            print(f"  drained to Mem0 in {time.perf_counter() - started:.2f}s")
+            await spool.stop()
+    finally:
+        await client.close()
+        await runner.cleanup()
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Spooled vs synchronous write latency")
+    parser.add_argument("--writes", type=int, default=1000, help="Spooled writes")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Simulated Mem0 latency")
+    parser.add_argument("--fsync", action="store_true", help="fsync every spooled write")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Idle SSE load test: CPU and memory cost per connected /sse client.
+Starts the server against the local stub Mem0, opens N idle /sse streams,
+holds them for a while and reads the server's CPU time and RSS from /proc.
+Linux only.
+
+    python benchmarks/bench_sse_idle.py --connections 10000 --hold 30
+"""
+
+import argparse
+import asyncio
+import os
+import resource
+import subprocess
+import sys
+import time
+
+import aiohttp
+from stub_mem0 import start_stub
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def proc_usage(pid: int):
+    """Return (cpu_seconds, rss_bytes) of a process."""
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    ticks = os.sysconf("SC_CLK_TCK")
+    cpu = (int(fields[11]) + int(fields[12])) / ticks
+    with open(f"/proc/{pid}/status") as f:
+        rss = next(int(line.split()[1]) * 1024 for line in f if line.startswith("VmRSS:"))
+    return cpu, rss
+
+
+async def wait_ready(base_url: str) -> None:
+    async with aiohttp.ClientSession() as session:
+        for _ in range(100):
+            try:
+                async with session.get(f"{base_url}/health") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+async def hold_connection(
+    session: aiohttp.ClientSession, url: str, opened: asyncio.Event, counter: list, target: int
+) -> None:
+    async with session.get(url) as response:
+        await response.content.readline()
+        counter[0] += 1
+        if counter[0] == target:
+            opened.set()
+        # Drain heartbeats until cancelled
+        async for _ in response.content:
+            pass
+
+
+async def measure(pid: int, seconds: float):
+    cpu_start, _ = proc_usage(pid)
+    await asyncio.sleep(seconds)
+    cpu_end, rss = proc_usage(pid)
+    return (cpu_end - cpu_start) / seconds, rss
+
+
+async def main(args) -> None:
+    # Each connection needs a file descriptor on both ends
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (min(hard, args.connections * 2 + 1024), hard))
+
+    runner, _, stub_url = await start_stub()
+    env = {**os.environ, "MEM0_API_KEY": "bench", "MEM0_API_URL": stub_url}
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            os.path.join(ROOT, args.server),
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(args.port),
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        preexec_fn=lambda: resource.setrlimit(
+            resource.RLIMIT_NOFILE, (min(hard, args.connections * 2 + 1024), hard)
+        ),
+    )
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        await wait_ready(base_url)
+        idle_cpu, base_rss = await measure(server.pid, args.hold / 3)
+
+        connector = aiohttp.TCPConnector(limit=0)
+        timeout = aiohttp.ClientTimeout(total=None, sock_read=None)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            opened, counter = asyncio.Event(), [0]
+            started = time.perf_counter()
+            tasks = [
+                asyncio.create_task(
+                    hold_connection(session, f"{base_url}/sse", opened, counter, args.connections)
+                )
+                for _ in range(args.connections)
+            ]
+            await opened.wait()
+            print(f"opened {args.connections} connections in {time.perf_counter() - started:.1f}s")
+
+            loaded_cpu, loaded_rss = await measure(server.pid, args.hold)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        per_connection_kb = (loaded_rss - base_rss) / args.connections / 1024
+        print(f"server CPU idle:  {idle_cpu * 100:.2f}%")
+        print(f"server CPU with {args.connections} idle streams: {loaded_cpu * 100:.2f}%")
+        print(
+            f"server RSS: {base_rss / 2**20:.1f} MiB -> {loaded_rss / 2**20:.1f} MiB "
+            f"({per_connection_kb:.1f} KiB per connection)"
+        )
+    finally:
+        server.terminate()
+        server.wait()
+        await runner.cleanup()
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Idle SSE connection load test")
+    parser.add_argument("--connections", type=int, default=1000, help="Idle /sse clients")
+    parser.add_argument("--hold", type=float, default=15.0, help="Seconds to measure under load")
+    parser.add_argument("--port", type=int, default=8090, help="Port for the server under test")
+    parser.add_argument(
+        "--server", type=str, default="src/app.py", help="Server script, relative to the repo root"
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Cold-start cost of a server script, with a budget and a baseline.
+Profiles the import of the server module with `python -X importtime` and
+reports the total and the most expensive top-level packages, then starts the
+server against the stub Mem0 several times and measures the time from process
+start to the first 200 from /health. Fails if the median time to first
+/health exceeds --budget-ms, and flags import-time regressions against the
+saved baseline.
+
+    python benchmarks/bench_startup.py                     # compare with the baseline
+    python benchmarks/bench_startup.py --save-baseline     # record a new baseline
+    python benchmarks/bench_startup.py --top 20 --runs 10
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+import aiohttp
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from loadgen import ROOT, load_baseline, running, save_baseline, stub_process  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baselines", "startup.json")
+# Time from process start to the first 200 from /health, on one core
+DEFAULT_BUDGET_MS = 1500.0
+
+
+def server_env(stub_url: str, state_dir: str) -> Dict[str, str]:
+    """Environment of a fresh server against the stub, with empty local state."""
+    return {
+        **os.environ,
+        "MEM0_API_KEY": "bench",
+        "MEM0_API_URL": stub_url,
+        "DEDUP_PATH": os.path.join(state_dir, "dedup.sqlite3"),
+        "SPOOL_PATH": os.path.join(state_dir, "spool.sqlite3"),
+        "SHARED_STATE_PATH": os.path.join(state_dir, "shared.sqlite3"),
+        "SNAPSHOT_PATH": os.path.join(state_dir, "snapshot.sqlite3"),
+    }
+
+
+def import_profile(script: str, env: Dict[str, str]) -> Tuple[float, Dict[str, float]]:
+    """
+    Import a server script under -X importtime. Returns the total import time
+    and the self time per top-level package, both in ms.
+    """
+    module = os.path.splitext(os.path.basename(script))[0]
+    code = (
+        f"import sys; sys.path[:0] = [{os.path.join(ROOT, os.path.dirname(script))!r}, "
+        f"{os.path.join(ROOT, 'src')!r}]; import {module}"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = 0.0
+    packages: Dict[str, float] = defaultdict(float)
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        if not self_us.strip().isdigit():
+            continue  # the header line
+        packages[name.strip().split(".")[0]] += int(self_us) / 1000
+        if name.strip() == module:
+            total = int(cumulative_us) / 1000
+    return total, dict(packages)
+
+
+async def first_health(url: str, timeout: float = 30.0) -> None:
+    """Poll /health until it answers 200."""
+    deadline = time.perf_counter() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.perf_counter() < deadline:
+            try:
+                async with session.get(f"{url}/health") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.005)
+    raise RuntimeError(f"{url}/health did not come up")
+
+
+def time_to_health(script: str, port: int, env: Dict[str, str]) -> float:
+    """Start the server and return the ms until /health first answers 200."""
+    started = time.perf_counter()
+    with running([script, "--host", "127.0.0.1", "--port", str(port)], env=env):
+        asyncio.run(first_health(f"http://127.0.0.1:{port}"))
+        return (time.perf_counter() - started) * 1000
+
+
+def run(args) -> Dict[str, Dict[str, float]]:
+    with stub_process(args.stub_port, latency_ms=5.0) as stub_url:
+        with tempfile.TemporaryDirectory() as state_dir:
+            env = server_env(stub_url, state_dir)
+            profiles = [import_profile(args.server, env) for _ in range(args.runs)]
+            totals = [total for total, _ in profiles]
+            packages = {
+                name: statistics.median(p.get(name, 0.0) for _, p in profiles)
+                for name in profiles[0][1]
+            }
+            starts: List[float] = []
+            for _ in range(args.runs):
+                starts.append(time_to_health(args.server, args.port, env))
+
+    print(
+        f"import of {args.server}: median {statistics.median(totals):.0f} ms over {args.runs} runs"
+    )
+    for name, ms in sorted(packages.items(), key=lambda item: -item[1])[: args.top]:
+        print(f"  {name:<32} {ms:>8.1f} ms")
+    print(
+        f"time to first /health: median {statistics.median(starts):.0f} ms, "
+        f"max {max(starts):.0f} ms (budget {args.budget_ms:.0f} ms)"
+    )
+    return {
+        "import": {"median_ms": round(statistics.median(totals), 1)},
+        "first_health": {
+            "median_ms": round(statistics.median(starts), 1),
+            "max_ms": round(max(starts), 1),
+        },
+        "packages_ms": {
+            name: round(ms, 1)
+            for name, ms in sorted(packages.items(), key=lambda item: -item[1])[: args.top]
+        },
+    }
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Measure server import and startup time")
+    parser.add_argument(
+        "--server",
+        type=str,
+        default="main_with_cors.py",
+        help="Server script, relative to the repo root",
+    )
+    parser.add_argument("--runs", type=int, default=5, help="Cold starts to measure")
+    parser.add_argument("--top", type=int, default=12, help="Packages to list by import time")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=DEFAULT_BUDGET_MS,
+        help="Max median ms from process start to the first /health",
+    )
+    parser.add_argument("--port", type=int, default=8093, help="Port for the server under test")
+    parser.add_argument("--stub-port", type=int, default=9093, help="Port for the stub Mem0")
+    parser.add_argument(
+        "--baseline",
+        type=str,
+        default=DEFAULT_BASELINE,
+        help="Baseline JSON to compare with (or to write)",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store these results as the baseline instead of comparing",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Allowed import time rise before flagging a regression",
+    )
+    return parser.parse_args()
+
+
+def main(args) -> int:
+    settings = {"server": args.server, "runs": args.runs}
+    results = run(args)
+    over_budget = results["first_health"]["median_ms"] > args.budget_ms
+    if over_budget:
+        print(
+            f"OVER BUDGET: time to first /health {results['first_health']['median_ms']:.0f} ms "
+            f"> {args.budget_ms:.0f} ms"
+        )
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results, settings)
+        print(f"Baseline written to {os.path.relpath(args.baseline)}")
+        return 1 if over_budget else 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print("No baseline yet; record one with --save-baseline")
+    else:
+        if baseline["settings"] != settings or baseline.get("cpu_count") != os.cpu_count():
+            print("Note: the baseline was recorded with different settings or on another machine")
+        base = baseline["results"]["import"]["median_ms"]
+        now = results["import"]["median_ms"]
+        if now > base * (1 + args.tolerance):
+            print(f"REGRESSION import: {now:.0f} > {base:.0f} ms")
+        else:
+            print(
+                f"No import regression against {os.path.relpath(args.baseline)} "
+                f"(tolerance {args.tolerance:.0%})"
+            )
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
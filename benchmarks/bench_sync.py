@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Session-start payload with and without sync tokens.
+Logs --preferences synthetic preferences in a fresh change log, then
+compares the bytes of a full get_all_coding_preferences listing with a
+`since` delta after --changed adds and retags, and times the delta query.
+
+    python benchmarks/bench_sync.py --preferences 5000 --changed 5
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from bench_payload import search_response  # noqa: E402
+
+from mem0_mcp.changelog import ChangeLog  # noqa: E402
+from mem0_mcp.serialization import dumps  # noqa: E402
+
+
+def main(args) -> None:
+    rng = random.Random(3)
+    preferences = search_response(args.preferences + args.changed)["preferences"]
+    for preference in preferences:
+        del preference["score"]
+    stored, added = preferences[: args.preferences], preferences[args.preferences :]
+
+    with tempfile.TemporaryDirectory() as state_dir:
+        log = ChangeLog(os.path.join(state_dir, "changes.sqlite3"))
+        for preference in stored:
+            log.record(preference)
+        token = log.token()
+        full = len(dumps({"success": True, "preferences": stored, "sync_token": token}))
+
+        # Half new preferences, half retags of stored ones
+        for preference in added[: (args.changed + 1) // 2]:
+            log.record(preference)
+        for preference in rng.sample(stored, args.changed // 2):
+            log.set_tags(preference["id"], preference["tags"] + ["reviewed"])
+        delta = log.since(token)
+        size = len(dumps(delta))
+
+        latencies = []
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            log.since(token)
+            latencies.append((time.perf_counter() - started) * 1e6)
+        log.close()
+
+    print(f"{args.preferences} stored preferences, {len(delta['preferences'])} changed:")
+    print(f"  full listing           {full:>10} bytes")
+    print(f"  since=<token>          {size:>10} bytes   ({full / size:.0f}x smaller)")
+    print(f"  since query            p50={statistics.median(latencies):>8.1f} us")
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Compare full listings with sync token deltas")
+    parser.add_argument("--preferences", type=int, default=5000, help="Preferences stored")
+    parser.add_argument("--changed", type=int, default=5, help="Preferences added or retagged")
+    parser.add_argument("--runs", type=int, default=200, help="Timed delta queries")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main(parse_args())
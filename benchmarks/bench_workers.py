@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Throughput of the server at different worker counts.
+Starts the stub Mem0 and the server with --workers N for each N, drives
+search tool calls at /mcp from several load generator processes and reports
+requests per second and latency percentiles. Only meaningful on a machine
+with at least as many cores as the largest worker count.
+
+    python benchmarks/bench_workers.py --workers 1 2 4 8 --duration 10
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+import aiohttp
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from loadgen import ROOT, wait_ready  # noqa: E402
+
+
+async def generate_load(base_url: str, concurrency: int, duration: float, seed: int) -> List[float]:
+    """Send search calls from `concurrency` loops until the duration is up. Returns latencies."""
+    latencies: List[float] = []
+    deadline = time.perf_counter() + duration
+    connector = aiohttp.TCPConnector(limit=concurrency)
+
+    async with aiohttp.ClientSession(connector=connector) as session:
+
+        async def client(number: int) -> None:
+            i = 0
+            while time.perf_counter() < deadline:
+                body = {
+                    "name": "search_coding_preferences",
+                    "arguments": {"query": f"q{seed}-{number}-{i}"},
+                }
+                started = time.perf_counter()
+                async with session.post(f"{base_url}/mcp", json=body) as response:
+                    await response.read()
+                latencies.append((time.perf_counter() - started) * 1000)
+                i += 1
+
+        await asyncio.gather(*(client(n) for n in range(concurrency)))
+    return latencies
+
+
+def generator_process(args) -> List[float]:
+    return asyncio.run(generate_load(*args))
+
+
+def run_level(workers: int, stub_url: str, args) -> None:
+    env = {
+        **os.environ,
+        "MEM0_API_KEY": "bench",
+        "MEM0_API_URL": stub_url,
+        # Measure the request path, not cache hits
+        "CACHE_ENABLED": "false",
+        "SHARED_STATE_PATH": os.path.join(args.state_dir, f"shared-{workers}.sqlite3"),
+    }
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            os.path.join(ROOT, args.server),
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(args.port),
+            "--workers",
+            str(workers),
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        asyncio.run(wait_ready(f"{base_url}/health"))
+        per_generator = max(1, args.concurrency // args.generators)
+        started = time.perf_counter()
+        with multiprocessing.Pool(args.generators) as pool:
+            results = pool.map(
+                generator_process,
+                [(base_url, per_generator, args.duration, seed) for seed in range(args.generators)],
+            )
+        elapsed = time.perf_counter() - started
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies = [latency for result in results for latency in result]
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"workers={workers:<3} {len(latencies) / elapsed:>9.0f} req/s   "
+        f"p50={quantiles[49]:.2f}ms  p95={quantiles[94]:.2f}ms  p99={quantiles[98]:.2f}ms"
+    )
+
+
+def main(args) -> None:
+    stub = subprocess.Popen(
+        [
+            sys.executable,
+            os.path.join(ROOT, "benchmarks", "stub_mem0.py"),
+            "--port",
+            str(args.stub_port),
+            "--latency-ms",
+            str(args.latency_ms),
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    stub_url = f"http://127.0.0.1:{args.stub_port}"
+    try:
+        asyncio.run(wait_ready(f"{stub_url}/api/v1/mems"))
+        print(
+            f"{os.cpu_count()} CPU cores, {args.concurrency} concurrent clients, "
+            f"Mem0 latency {args.latency_ms} ms"
+        )
+        with tempfile.TemporaryDirectory() as state_dir:
+            args.state_dir = state_dir
+            for workers in args.workers:
+                run_level(workers, stub_url, args)
+    finally:
+        stub.terminate()
+        stub.wait()
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Throughput at different worker counts")
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="Worker counts to measure"
+    )
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per worker count")
+    parser.add_argument("--concurrency", type=int, default=64, help="Concurrent clients in total")
+    parser.add_argument("--generators", type=int, default=4, help="Load generator processes")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Simulated Mem0 latency")
+    parser.add_argument("--port", type=int, default=8091, help="Port for the server under test")
+    parser.add_argument("--stub-port", type=int, default=9091, help="Port for the stub Mem0")
+    parser.add_argument(
+        "--server", type=str, default="src/app.py", help="Server script, relative to the repo root"
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main(parse_args())
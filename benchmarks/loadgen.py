@@ -0,0 +1,207 @@
+"""
+Shared helpers for the HTTP load benchmarks.
+Starts the stub Mem0 and a server script as subprocesses, drives requests
+from concurrent client loops and summarizes throughput and latency
+percentiles. Baselines are plain JSON files of those summaries.
+"""
+
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+import aiohttp
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# request(session, client_number, iteration) -> True on success
+Request = Callable[[aiohttp.ClientSession, int, int], Awaitable[bool]]
+
+
+@dataclass
+class LoadResult:
+    """Latencies (ms) and error count of one load run."""
+
+    requests: int = 0
+    errors: int = 0
+    elapsed: float = 0.0
+    latencies: List[float] = field(default_factory=list)
+
+    def summary(self) -> Dict[str, float]:
+        """Throughput and latency percentiles, as stored in baselines."""
+        latencies = self.latencies or [0.0]
+        quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "rps": round(self.requests / self.elapsed, 1) if self.elapsed else 0.0,
+            "p50_ms": round(quantiles[49], 3),
+            "p95_ms": round(quantiles[94], 3),
+            "p99_ms": round(quantiles[98], 3),
+        }
+
+
+def format_summary(name: str, summary: Dict[str, float]) -> str:
+    """One report line for a scenario."""
+    return (
+        f"{name:<18} {summary['rps']:>9.0f} req/s   p50={summary['p50_ms']:.2f}ms  "
+        f"p95={summary['p95_ms']:.2f}ms  p99={summary['p99_ms']:.2f}ms  "
+        f"errors={summary['errors']}"
+    )
+
+
+async def wait_ready(url: str) -> None:
+    """Poll url until it answers 200."""
+    async with aiohttp.ClientSession() as session:
+        for _ in range(200):
+            try:
+                async with session.get(url) as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"{url} did not come up")
+
+
+@contextmanager
+def running(args: List[str], env: Optional[Dict[str, str]] = None) -> Iterator[subprocess.Popen]:
+    """Run a Python script (args relative to the repo root) for the duration of the block."""
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, args[0]), *args[1:]],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        yield process
+    finally:
+        process.terminate()
+        process.wait()
+
+
+@contextmanager
+def stub_process(port: int, latency_ms: float, error_rate: float = 0.0) -> Iterator[str]:
+    """Run the stub Mem0 in its own process. Yields its base URL once it is up."""
+    with running(
+        [
+            "benchmarks/stub_mem0.py",
+            "--port",
+            str(port),
+            "--latency-ms",
+            str(latency_ms),
+            "--error-rate",
+            str(error_rate),
+        ]
+    ):
+        url = f"http://127.0.0.1:{port}"
+        asyncio.run(wait_ready(f"{url}/api/v1/mems?limit=1"))
+        yield url
+
+
+@contextmanager
+def server_process(
+    script: str, port: int, stub_url: str, workers: int = 1, **env: str
+) -> Iterator[str]:
+    """
+    Run a server script against the stub. Yields its base URL once /health answers.
+    Local state (duplicate index, spool, shared state, snapshot) starts empty on every run.
+    """
+    with tempfile.TemporaryDirectory() as state_dir:
+        environment = {
+            **os.environ,
+            "MEM0_API_KEY": "bench",
+            "MEM0_API_URL": stub_url,
+            # Measure the request path, not cache hits
+            "CACHE_ENABLED": "false",
+            "DEDUP_PATH": os.path.join(state_dir, "dedup.sqlite3"),
+            "SPOOL_PATH": os.path.join(state_dir, "spool.sqlite3"),
+            "SHARED_STATE_PATH": os.path.join(state_dir, "shared.sqlite3"),
+            "SNAPSHOT_PATH": os.path.join(state_dir, "snapshot.sqlite3"),
+            **env,
+        }
+        with running(
+            [script, "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers)],
+            env=environment,
+        ):
+            url = f"http://127.0.0.1:{port}"
+            asyncio.run(wait_ready(f"{url}/health"))
+            yield url
+
+
+async def run_load(request: Request, concurrency: int, duration: float) -> LoadResult:
+    """Call request from `concurrency` loops until the duration is up."""
+    result = LoadResult()
+    deadline = time.perf_counter() + duration
+    connector = aiohttp.TCPConnector(limit=concurrency)
+
+    async with aiohttp.ClientSession(connector=connector) as session:
+
+        async def client(number: int) -> None:
+            i = 0
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    ok = await request(session, number, i)
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    ok = False
+                result.requests += 1
+                if ok:
+                    result.latencies.append((time.perf_counter() - started) * 1000)
+                else:
+                    result.errors += 1
+                i += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client(n) for n in range(concurrency)))
+        result.elapsed = time.perf_counter() - started
+    return result
+
+
+def load_baseline(path: str) -> Optional[Dict[str, Any]]:
+    """A saved baseline, or None if there is none yet."""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(
+    path: str, results: Dict[str, Dict[str, float]], settings: Dict[str, Any]
+) -> None:
+    """Write results as the new baseline."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(
+            {"settings": settings, "cpu_count": os.cpu_count(), "results": results},
+            f,
+            indent=2,
+            sort_keys=True,
+        )
+        f.write("\n")
+
+
+def compare(
+    results: Dict[str, Dict[str, float]], baseline: Dict[str, Any], tolerance: float
+) -> List[Tuple[str, str]]:
+    """
+    Compare results with a baseline. Returns (scenario, reason) for every
+    scenario whose throughput fell, or whose p95 rose, by more than tolerance.
+    """
+    regressions = []
+    for name, summary in results.items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        if base["rps"] and summary["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append((name, f"throughput {summary['rps']:.0f} < {base['rps']:.0f} req/s"))
+        if base["p95_ms"] and summary["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append((name, f"p95 {summary['p95_ms']:.2f} > {base['p95_ms']:.2f} ms"))
+    return regressions
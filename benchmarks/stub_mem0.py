@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Local stub of the Mem0 REST API for offline benchmarks and tests.
+Serves /api/v1/mems and /api/v1/mems/search from an in-memory store, and can
+inject faults (random or scheduled error statuses, Retry-After, full outages). Memories are
+scoped by the org_id, user_id and project_id query parameters like Mem0's:
+writes record them and reads only see memories matching the ones given.
+"""
+
+import argparse
+import asyncio
+import itertools
+import random
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+
+SCOPE = ("org_id", "user_id", "project_id")
+
+
+class StubMem0:
+    """In-memory fake of the Mem0 endpoints used by the server."""
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        retry_after: Optional[float] = None,
+    ):
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.down = False
+        # Fail this many upcoming requests, for deterministic scenarios
+        self.fail_next = 0
+        self.mems: List[Dict[str, Any]] = []
+        self.requests = 0
+        self.faults = 0
+        self._ids = itertools.count(1)
+
+    async def inject_faults(self, request: web.Request, handler) -> web.StreamResponse:
+        """
+        Fail every request while down, then the next fail_next requests, otherwise
+        a random error_rate share of them.
+        """
+        scheduled = self.fail_next > 0
+        if scheduled:
+            self.fail_next -= 1
+        if self.down or scheduled or random.random() < self.error_rate:
+            self.requests += 1
+            self.faults += 1
+            headers = (
+                {"Retry-After": f"{self.retry_after:g}"} if self.retry_after is not None else {}
+            )
+            return web.json_response(
+                {"error": "injected fault"}, status=self.error_status, headers=headers
+            )
+        return await handler(request)
+
+    async def _delay(self) -> None:
+        self.requests += 1
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+
+    @staticmethod
+    def _scope(request: web.Request) -> Dict[str, str]:
+        return {name: request.query[name] for name in SCOPE if name in request.query}
+
+    def _visible(self, request: web.Request) -> List[Dict[str, Any]]:
+        scope = self._scope(request)
+        if not scope:
+            return self.mems
+        return [m for m in self.mems if all(m.get(k) == v for k, v in scope.items())]
+
+    def _find(self, request: web.Request) -> Optional[Dict[str, Any]]:
+        for mem in self._visible(request):
+            if mem["id"] == request.match_info["mem_id"]:
+                return mem
+        return None
+
+    async def add(self, request: web.Request) -> web.Response:
+        await self._delay()
+        body = await request.json()
+        mem = {
+            "id": f"mem-{next(self._ids)}",
+            "content": body.get("content", ""),
+            "tags": body.get("tags", []),
+            **self._scope(request),
+        }
+        self.mems.append(mem)
+        return web.json_response({"id": mem["id"]})
+
+    async def add_bulk(self, request: web.Request) -> web.Response:
+        await self._delay()
+        body = await request.json()
+        ids = []
+        for item in body.get("mems", []):
+            mem = {
+                "id": f"mem-{next(self._ids)}",
+                "content": item.get("content", ""),
+                "tags": item.get("tags", []),
+                **self._scope(request),
+            }
+            self.mems.append(mem)
+            ids.append(mem["id"])
+        return web.json_response({"ids": ids})
+
+    async def update(self, request: web.Request) -> web.Response:
+        await self._delay()
+        body = await request.json()
+        mem = self._find(request)
+        if mem is None:
+            return web.json_response({"error": "Memory not found"}, status=404)
+        mem["tags"] = body.get("tags", mem["tags"])
+        return web.json_response({"id": mem["id"]})
+
+    async def delete(self, request: web.Request) -> web.Response:
+        await self._delay()
+        mem = self._find(request)
+        if mem is None:
+            return web.json_response({"error": "Memory not found"}, status=404)
+        self.mems.remove(mem)
+        return web.json_response({"id": mem["id"]})
+
+    async def get(self, request: web.Request) -> web.Response:
+        await self._delay()
+        mem = self._find(request)
+        if mem is None:
+            return web.json_response({"error": "Memory not found"}, status=404)
+        return web.json_response(mem)
+
+    async def get_all(self, request: web.Request) -> web.Response:
+        await self._delay()
+        mems = self._visible(request)
+        if "limit" not in request.query:
+            return web.json_response({"mems": mems})
+
+        # Cursor pagination: the cursor is the offset of the next page
+        offset = int(request.query.get("cursor") or 0)
+        limit = int(request.query["limit"])
+        end = offset + limit
+        return web.json_response(
+            {
+                "mems": mems[offset:end],
+                "next_cursor": str(end) if end < len(mems) else None,
+            }
+        )
+
+    async def search(self, request: web.Request) -> web.Response:
+        await self._delay()
+        query = request.query.get("query", "").lower()
+        return web.json_response(
+            {"mems": [m for m in self._visible(request) if query in m["content"].lower()]}
+        )
+
+    def make_app(self) -> web.Application:
+        @web.middleware
+        async def faults(request: web.Request, handler) -> web.StreamResponse:
+            return await self.inject_faults(request, handler)
+
+        app = web.Application(middlewares=[faults])
+        app.router.add_post("/api/v1/mems", self.add)
+        app.router.add_post("/api/v1/mems/batch", self.add_bulk)
+        app.router.add_get("/api/v1/mems", self.get_all)
+        app.router.add_get("/api/v1/mems/search", self.search)
+        app.router.add_get("/api/v1/mems/{mem_id}", self.get)
+        app.router.add_put("/api/v1/mems/{mem_id}", self.update)
+        app.router.add_delete("/api/v1/mems/{mem_id}", self.delete)
+        return app
+
+
+async def start_stub(host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0.0, **faults):
+    """Start the stub in the running loop. Returns (runner, stub, base_url)."""
+    stub = StubMem0(latency_ms=latency_ms, **faults)
+    runner = web.AppRunner(stub.make_app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = site._server.sockets[0].getsockname()[1]
+    return runner, stub, f"http://{host}:{bound_port}"
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Local stub Mem0 API server")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Host to bind to")
+    parser.add_argument("--port", type=int, default=9000, help="Port to bind to")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Added latency per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests that fail")
+    parser.add_argument("--error-status", type=int, default=503, help="Status of injected failures")
+    parser.add_argument(
+        "--retry-after",
+        type=float,
+        default=None,
+        help="Retry-After seconds sent with injected failures",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    web.run_app(
+        StubMem0(
+            latency_ms=args.latency_ms,
+            error_rate=args.error_rate,
+            error_status=args.error_status,
+            retry_after=args.retry_after,
+        ).make_app(),
+        host=args.host,
+        port=args.port,
+        access_log=None,
+    )
@@ -0,0 +1,110 @@
+"""
+Shared building blocks for the mem0-mcp servers.
+Both src/app.py and main_with_cors.py build their app with create_app.
+The memory backend classes are imported on first access, like
+backend_from_env does, so only the backend in use is loaded.
+"""
+
+import importlib
+from typing import Any
+
+from .adapters import ToolDispatcher
+from .admission import AdmissionController, AdmissionSettings
+from .application import create_app, main, run_stdio
+from .backends import MemoryBackend, backend_from_env
+from .batch import BatchSettings, run_batch
+from .cache import CacheStats, ResponseCache
+from .changelog import ChangeLog
+from .chunking import ChunkIndex
+from .keyword_index import KeywordIndex
+from .local_search import LocalSearchEngine, LocalSearchPartitions
+from .mcp_transport import MCPTransports, build_mcp_server
+from .metrics import (
+    instrument_bulk,
+    instrument_tool,
+    metrics_response,
+    observe_stage,
+    register_collectors,
+    trace_span,
+    track_in_flight,
+)
+from .namespaces import Namespace, NamespaceArgs
+from .preferences import CodingPreferences
+from .request_body import BodySettings, BodyTooLarge
+from .resilience import CircuitOpenError, Resilience, UpstreamError
+from .serialization import FastJSONResponse, PrecomputedJSON, dumps
+from .server import resolve_workers, run_server
+from .singleflight import SingleFlight
+from .spool import WriteSpool
+from .sse import ConnectionRegistry, SSEResponse
+from .streaming import NDJSON_MEDIA_TYPE, ndjson_preferences
+from .tools import Tool, ToolRegistry
+
+__all__ = [
+    "NDJSON_MEDIA_TYPE",
+    "AdmissionController",
+    "AdmissionSettings",
+    "BatchSettings",
+    "BodySettings",
+    "BodyTooLarge",
+    "CacheStats",
+    "ChangeLog",
+    "ChunkIndex",
+    "CircuitOpenError",
+    "ClientSettings",
+    "CodingPreferences",
+    "ConnectionRegistry",
+    "FastJSONResponse",
+    "KeywordIndex",
+    "LocalBackend",
+    "LocalSearchEngine",
+    "LocalSearchPartitions",
+    "MCPTransports",
+    "Mem0Client",
+    "Mem0LibraryBackend",
+    "MemoryBackend",
+    "Namespace",
+    "NamespaceArgs",
+    "PrecomputedJSON",
+    "Resilience",
+    "ResponseCache",
+    "SSEResponse",
+    "SingleFlight",
+    "Tool",
+    "ToolDispatcher",
+    "ToolRegistry",
+    "UpstreamError",
+    "WriteSpool",
+    "backend_from_env",
+    "build_mcp_server",
+    "create_app",
+    "dumps",
+    "instrument_bulk",
+    "instrument_tool",
+    "main",
+    "metrics_response",
+    "ndjson_preferences",
+    "observe_stage",
+    "register_collectors",
+    "resolve_workers",
+    "run_batch",
+    "run_server",
+    "run_stdio",
+    "trace_span",
+    "track_in_flight",
+]
+
+# Name -> module of the memory backends, imported on first access
+_BACKENDS = {
+    "ClientSettings": ".client",
+    "Mem0Client": ".client",
+    "Mem0LibraryBackend": ".library_backend",
+    "LocalBackend": ".local_backend",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _BACKENDS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module, __name__), name)
@@ -0,0 +1,351 @@
+"""
+HTTP protocol adapters over the tool registry.
+POST /mcp takes {"name", "arguments"} (or an array of them) and POST /messages/
+takes n8n tool_call messages (or an array of them). Both translate their
+payload into registry calls through one ToolDispatcher, so tool lookup,
+argument validation, admission control, streaming and batching behave the
+same on every route. X-Tenant-Id, X-User-Id and X-Project-Id headers set the
+namespace of every call in the request. Bodies are read within the size
+limits of request_body.BodySettings.
+"""
+
+import logging
+from json import JSONDecodeError
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from fastapi import APIRouter, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+
+from .admission import BULK, INTERACTIVE, AdmissionController, AdmissionRejected, client_id
+from .batch import BatchCall, BatchSettings, run_batch
+from .metrics import (
+    instrument_bulk,
+    instrument_tool,
+    observe_stage,
+    trace_span,
+    track_in_flight,
+)
+from .namespaces import request_namespace, with_namespace
+from .request_body import BodySettings, BodyTooLarge, read_json
+from .serialization import FastJSONResponse, loads
+from .streaming import NDJSON_MEDIA_TYPE
+from .tools import ToolRegistry
+
+logger = logging.getLogger(__name__)
+
+
+class ToolDispatcher:
+    """Runs registry tool calls for the HTTP adapters, singly or as batches."""
+
+    def __init__(
+        self,
+        registry: ToolRegistry,
+        batch_settings: BatchSettings,
+        admission: Optional[AdmissionController] = None,
+    ):
+        self.registry = registry
+        self.batch_settings = batch_settings
+        self.admission = admission
+        self.call_tool = instrument_tool(registry.call)
+        self.bulk = {
+            name: instrument_bulk(name, bulk_call)
+            for name, bulk_call in registry.bulk_calls().items()
+        }
+
+    def priority(self, tool_names: List[Any]) -> str:
+        """Interactive if every call is to a latency-sensitive tool, else bulk."""
+        tools = [self.registry.get(name) for name in tool_names]
+        if tools and all(tool is not None and tool.latency_sensitive for tool in tools):
+            return INTERACTIVE
+        return BULK
+
+    def client(self, request: Request) -> str:
+        """The client a request is charged to for quotas and fair queueing."""
+        if self.admission is None:
+            return client_id(request)
+        settings = self.admission.settings
+        return client_id(request, settings.trust_client_id, settings.keys)
+
+    async def admit(self, endpoint: str, client: str, tool_names: List[Any]) -> Callable[[], None]:
+        """
+        Wait for admission of a request making these calls and return the
+        function releasing its slot. Raises AdmissionRejected if it is shed.
+        """
+        if self.admission is None:
+            return lambda: None
+        with observe_stage(endpoint, "admission"):
+            return await self.admission.acquire(
+                client, self.priority(tool_names), max(1, len(tool_names))
+            )
+
+    async def respond(
+        self, endpoint: str, tool_name: Any, arguments: Dict[str, Any], client: str = "anonymous"
+    ) -> Response:
+        """Run one tool call: a streamed response if the tool streams, else its JSON result."""
+        release = await self.admit(endpoint, client, [tool_name])
+        try:
+            stream = self.registry.open_stream(tool_name, arguments)
+            if stream is not None:
+                # Admitted like any call, but the slot is not held while the pages stream
+                return StreamingResponse(stream, media_type=NDJSON_MEDIA_TYPE)
+
+            with observe_stage(endpoint, "tool"):
+                result = await self.call_tool(tool_name, arguments)
+        finally:
+            release()
+        if result is None:
+            return FastJSONResponse({"error": f"Unknown tool: {tool_name}"}, status_code=400)
+        with observe_stage(endpoint, "serialize"):
+            return FastJSONResponse(result)
+
+    def check_batch_size(self, size: int) -> Optional[Response]:
+        """A 400 response if a batch exceeds BATCH_MAX_SIZE, else None."""
+        if size > self.batch_settings.max_size:
+            return FastJSONResponse(
+                {"error": f"Batch too large: {size} > {self.batch_settings.max_size}"},
+                status_code=400,
+            )
+        return None
+
+    async def run_batch(
+        self, endpoint: str, calls: List[BatchCall], client: str = "anonymous"
+    ) -> List[Dict[str, Any]]:
+        """
+        Run a batch of tool calls and return {"status", "result"} per call, in
+        order. The batch takes one admission slot and one quota token per call.
+        """
+        release = await self.admit(endpoint, client, [name for name, _ in calls])
+        try:
+            with observe_stage(endpoint, "tool"):
+                return await run_batch(calls, self.call_tool, self.batch_settings, bulk=self.bulk)
+        finally:
+            release()
+
+
+def is_tool_call(data: Any) -> bool:
+    """Whether a /mcp body or batch item is shaped like {"name": str, "arguments": ...}."""
+    return isinstance(data, dict) and isinstance(data.get("name"), str)
+
+
+INVALID_TOOL_CALL = 'Expected a tool call object: {"name": ..., "arguments": {...}}'
+
+
+def mcp_router(dispatcher: ToolDispatcher, body: Optional[BodySettings] = None) -> APIRouter:
+    """POST /mcp: tool calls as {"name", "arguments"}, singly or as an array batch."""
+    router = APIRouter()
+    body = body or BodySettings()
+
+    @router.post("/mcp")
+    async def mcp_endpoint(request: Request) -> Response:
+        """Endpoint for handling MCP tool calls, singly or as an array batch."""
+        with track_in_flight("/mcp"), trace_span("mcp_endpoint"):
+            try:
+                with observe_stage("/mcp", "parse"):
+                    try:
+                        data = await read_json(request, body, loads)
+                    except JSONDecodeError as e:
+                        return FastJSONResponse({"error": f"Invalid JSON: {e}"}, status_code=400)
+                namespace = request_namespace(request)
+
+                # An array body is a batch of tool calls
+                if isinstance(data, list):
+                    too_large = dispatcher.check_batch_size(len(data))
+                    if too_large is not None:
+                        return too_large
+                    # Malformed items fail on their own, without failing the batch
+                    results: List[Dict[str, Any]] = [
+                        {"status": 400, "result": {"error": INVALID_TOOL_CALL}} for _ in data
+                    ]
+                    valid = [i for i, call in enumerate(data) if is_tool_call(call)]
+                    calls = [
+                        (data[i]["name"], with_namespace(data[i].get("arguments", {}), namespace))
+                        for i in valid
+                    ]
+                    batch = (
+                        await dispatcher.run_batch("/mcp", calls, dispatcher.client(request))
+                        if calls
+                        else []
+                    )
+                    for index, result in zip(valid, batch):
+                        results[index] = result
+                    with observe_stage("/mcp", "serialize"):
+                        return FastJSONResponse(results)
+
+                if not is_tool_call(data):
+                    return FastJSONResponse({"error": INVALID_TOOL_CALL}, status_code=400)
+                return await dispatcher.respond(
+                    "/mcp",
+                    data.get("name"),
+                    with_namespace(data.get("arguments", {}), namespace),
+                    dispatcher.client(request),
+                )
+
+            except (AdmissionRejected, BodyTooLarge) as e:
+                return e.response()
+            except Exception as e:
+                logger.exception("Error processing MCP request")
+                return FastJSONResponse({"error": str(e)}, status_code=500)
+
+    return router
+
+
+class FunctionArguments(BaseModel):
+    """Model for function arguments in tool calls."""
+
+    text: Optional[str] = None
+    query: Optional[str] = None
+
+
+class Function(BaseModel):
+    """Model for function in tool calls."""
+
+    name: str
+    arguments: Union[Dict[str, Any], FunctionArguments]
+
+
+class ToolCall(BaseModel):
+    """Model for tool call requests."""
+
+    id: str
+    function: Function
+
+
+class MessageRequest(BaseModel):
+    """Model for message requests."""
+
+    type: str = Field(..., description="The type of message, e.g., 'tool_call'")
+    tool_call: Optional[ToolCall] = Field(
+        None, description="The tool call details if type is 'tool_call'"
+    )
+
+
+# n8n sends snippets as "text" and may omit the other fields, so fill them in
+# before the registry validates the arguments
+N8N_DEFAULTS: Dict[str, Dict[str, Any]] = {
+    "add_coding_preference": {"title": "Code Snippet", "language": "javascript", "content": ""},
+    "search_coding_preferences": {"query": ""},
+}
+
+
+def tool_call_arguments(tool_call: ToolCall) -> Dict[str, Any]:
+    """Get the arguments of an n8n tool call as a plain dict in the registry's format."""
+    arguments = tool_call.function.arguments
+    if isinstance(arguments, dict):
+        arguments = dict(arguments)
+    else:
+        arguments = arguments.model_dump(exclude_unset=True)
+    if arguments.get("text") is not None:
+        arguments["content"] = arguments.pop("text")
+    return {**N8N_DEFAULTS.get(tool_call.function.name, {}), **arguments}
+
+
+# The /messages/ body is validated in the endpoint so validation can be timed separately
+MESSAGE_ADAPTER = TypeAdapter(Union[MessageRequest, List[MessageRequest]])
+
+
+def parse_body(body: bytes) -> Any:
+    """Decode a JSON request body, raising the same 422 error FastAPI would."""
+    try:
+        return loads(body)
+    except JSONDecodeError as e:
+        raise RequestValidationError(
+            [
+                {
+                    "type": "json_invalid",
+                    "loc": ("body", e.pos),
+                    "msg": "JSON decode error",
+                    "input": {},
+                    "ctx": {"error": e.msg},
+                }
+            ]
+        )
+
+
+def validate_message(data: Any) -> Union[MessageRequest, List[MessageRequest]]:
+    """Validate a /messages/ body, raising the same 422 errors FastAPI would."""
+    try:
+        return MESSAGE_ADAPTER.validate_python(data)
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+        )
+
+
+def n8n_router(dispatcher: ToolDispatcher, body: Optional[BodySettings] = None) -> APIRouter:
+    """POST /messages/: n8n tool_call messages, singly or as an array batch."""
+    router = APIRouter()
+    body = body or BodySettings()
+
+    async def messages_batch(
+        messages: List[MessageRequest], client: str, namespace: Dict[str, str]
+    ) -> Response:
+        """Run a batch of n8n tool calls and return per-item results in order."""
+        too_large = dispatcher.check_batch_size(len(messages))
+        if too_large is not None:
+            return too_large
+
+        logger.info(f"Processing batch of {len(messages)} messages")
+
+        results: List[Dict[str, Any]] = [
+            {"status": 400, "result": {"error": "Invalid message format"}} for _ in messages
+        ]
+        valid = [i for i, m in enumerate(messages) if m.type == "tool_call" and m.tool_call]
+        calls = [
+            (
+                messages[i].tool_call.function.name,
+                with_namespace(tool_call_arguments(messages[i].tool_call), namespace),
+            )
+            for i in valid
+        ]
+        for index, result in zip(valid, await dispatcher.run_batch("/messages/", calls, client)):
+            results[index] = result
+
+        for message, result in zip(messages, results):
+            result["id"] = message.tool_call.id if message.tool_call else None
+        with observe_stage("/messages/", "serialize"):
+            return FastJSONResponse(results)
+
+    @router.post("/messages/")
+    async def messages_endpoint(request: Request) -> Response:
+        """Enhanced endpoint for handling n8n tool calls, singly or as an array batch."""
+        with track_in_flight("/messages/"), trace_span("messages_endpoint"):
+            with observe_stage("/messages/", "parse"):
+                try:
+                    data = await read_json(request, body, parse_body)
+                except BodyTooLarge as e:
+                    return e.response()
+            with observe_stage("/messages/", "validate"):
+                message = validate_message(data)
+
+            try:
+                if isinstance(message, list):
+                    return await messages_batch(
+                        message, dispatcher.client(request), request_namespace(request)
+                    )
+
+                logger.info(f"Received message of type: {message.type}")
+
+                if message.type == "tool_call" and message.tool_call:
+                    tool_name = message.tool_call.function.name
+                    arguments = with_namespace(
+                        tool_call_arguments(message.tool_call), request_namespace(request)
+                    )
+
+                    # Argument sizes only: contents may be large, or secrets pasted into a snippet
+                    sizes = {name: len(str(value)) for name, value in arguments.items()}
+                    logger.info(f"Processing tool call: {tool_name} with argument sizes: {sizes}")
+                    return await dispatcher.respond(
+                        "/messages/", tool_name, arguments, dispatcher.client(request)
+                    )
+
+                return FastJSONResponse({"error": "Invalid message format"}, status_code=400)
+
+            except AdmissionRejected as e:
+                return e.response()
+            except Exception as e:
+                logger.exception("Error processing message")
+                return FastJSONResponse({"error": str(e)}, status_code=500)
+
+    return router
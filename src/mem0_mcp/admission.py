@@ -0,0 +1,338 @@
+"""
+Admission control for the tool-call endpoints.
+Every /mcp and /messages/ request is charged to a client (its address, the
+name of an API key listed in CLIENT_KEYS, or X-Client-Id from a trusted
+proxy) and takes a token from that client's bucket. Admitted calls
+run under a concurrency cap; the rest wait in a bounded queue that is served
+weighted-fair across clients, with latency-sensitive tools (search, get)
+ahead of bulk work. Calls over quota, or arriving while the queue is full,
+are rejected with 429 and Retry-After.
+"""
+
+import asyncio
+import hashlib
+import heapq
+import itertools
+import math
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from starlette.requests import Request
+
+from .metrics import ADMISSION_QUEUE_DEPTH, ADMISSION_REJECTED, ADMISSION_WAIT
+from .serialization import FastJSONResponse
+
+INTERACTIVE, BULK = "interactive", "bulk"
+# Queue order between the priority classes: interactive calls always go first
+_PRIORITY_RANK = {INTERACTIVE: 0, BULK: 1}
+
+# Smoothing of the average call duration used to estimate Retry-After
+_DURATION_ALPHA = 0.2
+# Forget idle clients' buckets and virtual times once this many are tracked
+_MAX_CLIENTS = 4096
+
+
+def key_fingerprint(key: str) -> str:
+    """SHA-256 of an API key, so configured keys are not kept in memory as is."""
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def presented_key(request: Request) -> Optional[str]:
+    """The API key a request carries in X-API-Key or an Authorization bearer token."""
+    key = request.headers.get("x-api-key")
+    if key:
+        return key
+    scheme, _, credentials = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() in ("bearer", "token") and credentials:
+        return credentials
+    return None
+
+
+def client_id(
+    request: Request, trust_header: bool = False, keys: Optional[Dict[str, str]] = None
+) -> str:
+    """
+    The client a request is charged to: its peer address, unless it presents
+    an API key whose fingerprint is in keys (then the key's name), or
+    trust_header is set and a proxy put the name in X-Client-Id. The server
+    checks no other header, so keys and tenants it does not know are ignored:
+    a caller could otherwise pick a fresh name, and a fresh quota, per request.
+    """
+    if trust_header and request.headers.get("x-client-id"):
+        return request.headers["x-client-id"]
+    key = presented_key(request) if keys else None
+    if key is not None and key_fingerprint(key) in keys:
+        return keys[key_fingerprint(key)]
+    return request.client.host if request.client else "anonymous"
+
+
+def parse_client_map(value: str) -> Dict[str, str]:
+    """Parse "name=value,name=value" into a dict."""
+    entries: Dict[str, str] = {}
+    for item in value.split(","):
+        name, _, setting = item.strip().partition("=")
+        if name and setting:
+            entries[name.strip()] = setting.strip()
+    return entries
+
+
+def parse_quota(name: str, spec: str) -> Tuple[float, float]:
+    """(rate, burst) of a CLIENT_QUOTAS entry "rate/burst"; the burst defaults to the rate."""
+    rate, _, burst = spec.partition("/")
+    quota = (float(rate), float(burst or max(1.0, float(rate))))
+    if min(quota) <= 0:
+        raise ValueError(f"CLIENT_QUOTAS: {name} needs a positive rate and burst, not {spec!r}")
+    return quota
+
+
+@dataclass
+class Quota:
+    """Token bucket of one client: `rate` calls per second, bursts up to `burst`."""
+
+    rate: float
+    burst: float
+    tokens: float = field(init=False)
+    updated: float = field(default_factory=time.monotonic)
+
+    def __post_init__(self):
+        self.tokens = self.burst
+
+    def take(self, cost: float) -> float:
+        """
+        Take `cost` tokens if available and return 0, else the seconds until they
+        are. A cost above the burst (a large batch) takes a full bucket.
+        """
+        cost = min(cost, self.burst)
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+    def full(self) -> bool:
+        return self.tokens + (time.monotonic() - self.updated) * self.rate >= self.burst
+
+
+@dataclass
+class AdmissionSettings:
+    """Concurrency, queue and per-client quota limits for tool calls."""
+
+    concurrency: int = 32
+    queue_size: int = 256
+    queue_timeout: float = 10.0
+    client_rate: float = 0.0
+    client_burst: float = 20.0
+    quotas: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+    weights: Dict[str, float] = field(default_factory=dict)
+    # Client name by key fingerprint, for requests presenting one of these API keys
+    keys: Dict[str, str] = field(default_factory=dict)
+    # Charge requests to their X-Client-Id header, set by a trusted proxy
+    trust_client_id: bool = False
+
+    @classmethod
+    def from_env(cls) -> "AdmissionSettings":
+        """
+        Build settings from ADMISSION_* and CLIENT_* environment variables.
+        Raises ValueError for quotas or weights that are not positive.
+        """
+        quotas = {
+            name: parse_quota(name, spec)
+            for name, spec in parse_client_map(os.getenv("CLIENT_QUOTAS", "")).items()
+        }
+        weights = {
+            name: float(weight)
+            for name, weight in parse_client_map(os.getenv("CLIENT_WEIGHTS", "")).items()
+        }
+        for name, weight in weights.items():
+            if weight <= 0:
+                raise ValueError(f"CLIENT_WEIGHTS: {name} needs a positive weight, not {weight:g}")
+        return cls(
+            concurrency=int(os.getenv("ADMISSION_CONCURRENCY", cls.concurrency)),
+            queue_size=int(os.getenv("ADMISSION_QUEUE_SIZE", cls.queue_size)),
+            queue_timeout=float(os.getenv("ADMISSION_QUEUE_TIMEOUT", cls.queue_timeout)),
+            client_rate=float(os.getenv("CLIENT_RATE", cls.client_rate)),
+            client_burst=float(os.getenv("CLIENT_BURST", cls.client_burst)),
+            quotas=quotas,
+            weights=weights,
+            keys={
+                key_fingerprint(key): name
+                for name, key in parse_client_map(os.getenv("CLIENT_KEYS", "")).items()
+            },
+            trust_client_id=os.getenv("TRUST_CLIENT_ID", "false").lower() in ("true", "1", "yes"),
+        )
+
+    def quota(self, client: str) -> Optional[Tuple[float, float]]:
+        """(rate, burst) of a client, or None if it is unlimited."""
+        if client in self.quotas:
+            return self.quotas[client]
+        return (self.client_rate, self.client_burst) if self.client_rate > 0 else None
+
+
+class AdmissionRejected(Exception):
+    """A call was shed: over its client's quota, or the queue was full or too slow."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+    def response(self) -> FastJSONResponse:
+        """The 429 response telling the client when to retry."""
+        seconds = max(1, math.ceil(self.retry_after))
+        return FastJSONResponse(
+            {"error": f"Too many requests ({self.reason}), retry in {seconds}s"},
+            status_code=429,
+            headers={"Retry-After": str(seconds)},
+        )
+
+
+class AdmissionController:
+    """
+    Per-client quotas plus a concurrency cap with a start-time fair queue:
+    each waiting call is tagged with its client's virtual time, which advances
+    by cost / weight per call, and the lowest tag within the highest priority
+    class runs next. A client sending many calls therefore waits behind
+    clients sending few, in proportion to their weights.
+    """
+
+    def __init__(self, settings: AdmissionSettings):
+        self.settings = settings
+        self.running = 0
+        self.rejected: Dict[str, int] = {}
+        self._quotas: Dict[str, Quota] = {}
+        self._finish: Dict[str, float] = {}
+        self._vtime = 0.0
+        self._queue: List[Tuple[int, float, int, asyncio.Future]] = []
+        self._queued = {INTERACTIVE: 0, BULK: 0}
+        self._sequence = itertools.count()
+        self._avg_duration = 0.05
+
+    @classmethod
+    def from_env(cls) -> Optional["AdmissionController"]:
+        """Build the controller from environment variables. Off unless ADMISSION=true."""
+        if os.getenv("ADMISSION", "false").lower() not in ("true", "1", "yes", "on"):
+            return None
+        return cls(AdmissionSettings.from_env())
+
+    def __len__(self) -> int:
+        return sum(self._queued.values())
+
+    async def acquire(self, client: str, priority: str, cost: int = 1) -> Callable[[], None]:
+        """
+        Admit a call, waiting for a slot if all are busy. Returns the function
+        releasing the slot. Raises AdmissionRejected if the call is shed.
+        """
+        self._charge(client, priority, cost)
+        if self.running < self.settings.concurrency and not self._queue:
+            return self._start(self._tag(client, cost))
+        if len(self) >= self.settings.queue_size:
+            self._reject(priority, "queue_full", self._estimated_wait())
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (_PRIORITY_RANK[priority], self._tag(client, cost), next(self._sequence), future)
+        heapq.heappush(self._queue, entry)
+        self._queued[priority] += 1
+        ADMISSION_QUEUE_DEPTH.labels(priority).inc()
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.settings.queue_timeout)
+        except asyncio.TimeoutError:
+            pass
+        except BaseException:
+            # Cancelled while waiting, or just after being handed a slot
+            if future.done():
+                self._release_function()()
+            else:
+                self._drop(entry)
+            raise
+        finally:
+            self._queued[priority] -= 1
+            ADMISSION_QUEUE_DEPTH.labels(priority).dec()
+            ADMISSION_WAIT.labels(priority).observe(time.perf_counter() - started)
+
+        if not future.done():
+            self._drop(entry)
+            self._reject(priority, "timeout", self._estimated_wait())
+        return self._release_function()
+
+    def info(self) -> Dict[str, Any]:
+        """Running and queued calls, tracked clients and rejections by reason."""
+        return {
+            "running": self.running,
+            "concurrency": self.settings.concurrency,
+            "queued": dict(self._queued),
+            "queue_size": self.settings.queue_size,
+            "clients": len(self._quotas),
+            "rejected": dict(self.rejected),
+        }
+
+    def _charge(self, client: str, priority: str, cost: int) -> None:
+        limits = self.settings.quota(client)
+        if limits is None:
+            return
+        quota = self._quotas.get(client)
+        if quota is None:
+            if len(self._quotas) >= _MAX_CLIENTS:
+                self._forget_idle_clients()
+            quota = self._quotas[client] = Quota(*limits)
+        wait = quota.take(cost)
+        if wait > 0:
+            self._reject(priority, "quota", wait)
+
+    def _tag(self, client: str, cost: int) -> float:
+        start = max(self._vtime, self._finish.get(client, 0.0))
+        if client not in self._finish and len(self._finish) >= _MAX_CLIENTS:
+            self._finish = {c: f for c, f in self._finish.items() if f > self._vtime}
+        self._finish[client] = start + cost / self.settings.weights.get(client, 1.0)
+        return start
+
+    def _start(self, tag: float) -> Callable[[], None]:
+        self._vtime = max(self._vtime, tag)
+        self.running += 1
+        return self._release_function()
+
+    def _release_function(self) -> Callable[[], None]:
+        started = time.perf_counter()
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if released:
+                return
+            released = True
+            duration = time.perf_counter() - started
+            self._avg_duration += _DURATION_ALPHA * (duration - self._avg_duration)
+            self.running -= 1
+            self._dispatch()
+
+        return release
+
+    def _drop(self, entry: Tuple[int, float, int, asyncio.Future]) -> None:
+        entry[3].cancel()
+        self._queue.remove(entry)
+        heapq.heapify(self._queue)
+
+    def _dispatch(self) -> None:
+        """Hand free slots to the next waiting calls."""
+        while self._queue and self.running < self.settings.concurrency:
+            _, tag, _, future = heapq.heappop(self._queue)
+            if future.done():
+                continue
+            self._vtime = max(self._vtime, tag)
+            self.running += 1
+            future.set_result(True)
+
+    def _estimated_wait(self) -> float:
+        return self._avg_duration * (len(self) + 1) / self.settings.concurrency
+
+    def _reject(self, priority: str, reason: str, retry_after: float) -> None:
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+        ADMISSION_REJECTED.labels(priority, reason).inc()
+        raise AdmissionRejected(reason, retry_after)
+
+    def _forget_idle_clients(self) -> None:
+        self._quotas = {c: q for c, q in self._quotas.items() if not q.full()}
@@ -0,0 +1,340 @@
+"""
+The FastAPI application behind both servers.
+create_app wires the memory backend, the tool registry and the background
+services (SSE registry, local search, write spool) together and mounts every
+protocol adapter over the same registry: /mcp, the legacy /sse stream, the
+MCP SDK transports and, for n8n, /messages/.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Dict
+
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
+
+from .adapters import ToolDispatcher, mcp_router, n8n_router
+from .admission import AdmissionController
+from .backends import backend_from_env
+from .batch import BatchSettings
+from .changelog import ChangeLog
+from .chunking import ChunkIndex
+from .compression import CompressionMiddleware, CompressionSettings
+from .dedup import DedupIndex
+from .local_search import LocalSearchPartitions
+from .mcp_transport import MCPTransports, build_mcp_server
+from .metrics import metrics_response, register_collectors
+from .namespaces import DEFAULT_NAMESPACE
+from .preferences import CodingPreferences
+from .request_body import BodySettings
+from .serialization import FastJSONResponse, PrecomputedJSON
+from .server import resolve_workers, run_server
+from .spool import WriteSpool
+from .sse import ConnectionRegistry, SSEResponse
+from .tools import ToolRegistry
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MCPMessage:
+    """A message in the Model Context Protocol format."""
+
+    type: str
+    content: Dict[str, Any]
+
+    def to_json(self) -> str:
+        """Convert the message to a JSON string."""
+        return json.dumps({"type": self.type, "content": self.content})
+
+
+def sse_frame(message: MCPMessage) -> bytes:
+    """Encode a message as an SSE data frame."""
+    return f"data: {message.to_json()}\n\n".encode()
+
+
+def create_app(
+    api_key: str,
+    api_url: str = "https://api.mem0.ai",
+    title: str = "MCP Server with Mem0",
+    n8n: bool = False,
+) -> FastAPI:
+    """
+    Build the server app. With n8n set, the app also serves POST /messages/
+    and exposes response headers to cross-origin callers.
+    """
+    # Memory backend (MEMORY_BACKEND: Mem0 cloud, self-hosted mem0ai or local SQLite),
+    # opened and closed by the app lifespan
+    backend = backend_from_env(api_url, api_key)
+
+    # Legacy /sse connections, with shared heartbeat and broadcast tasks
+    sse_connections = ConnectionRegistry.from_env()
+
+    # In-process keyword index (KEYWORD_INDEX) and embedding index (SEARCH_ENGINE=local),
+    # one per namespace in use (LOCAL_INDEX_MAX_NAMESPACES)
+    local_search = LocalSearchPartitions.from_env()
+    if local_search is not None:
+        backend.on_add(local_search.add)
+
+    # Durable write-behind spool for adds (WRITE_MODE=async)
+    write_spool = WriteSpool.from_env()
+
+    # Local fingerprint index that turns re-added snippets into no-ops (DEDUP_MODE)
+    dedup = DedupIndex.from_env()
+
+    # Versioned log of adds and tag changes behind get_all_coding_preferences(since=...)
+    # (CHANGE_LOG)
+    changes = ChangeLog.from_env()
+    if changes is not None:
+        backend.on_add(changes.record)
+
+    # Oversized snippets are stored in linked chunks (CHUNKING, CHUNK_*)
+    chunks = ChunkIndex.from_env()
+    if chunks is not None and write_spool is not None:
+        write_spool.on_delivered(chunks.resolve)
+
+    # Every tool is declared once here and served by all adapters below
+    registry = ToolRegistry()
+    CodingPreferences(backend, write_spool, local_search, dedup, changes, chunks).register(registry)
+    # Per-client quotas and weighted-fair admission for /mcp and /messages/ (ADMISSION, CLIENT_*)
+    admission = AdmissionController.from_env()
+    dispatcher = ToolDispatcher(registry, BatchSettings.from_env(), admission)
+
+    # MCP SDK transports: GET /mcp/sse + POST /mcp/messages/, and /mcp/stream,
+    # loaded when the first SDK client connects
+    mcp_transports = MCPTransports(partial(build_mcp_server, list(registry), dispatcher.call_tool))
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        """Open the memory backend and MCP session manager for the app lifetime."""
+        await backend.start()
+        await sse_connections.start()
+        if local_search is not None:
+            local_search.start(backend)
+        if write_spool is not None:
+            write_spool.start(backend)
+        try:
+            async with mcp_transports.run():
+                yield
+        finally:
+            if write_spool is not None:
+                await write_spool.stop()
+            if local_search is not None:
+                await local_search.stop()
+            await sse_connections.stop()
+            await backend.close()
+            if dedup is not None:
+                dedup.close()
+            if changes is not None:
+                changes.close()
+            if chunks is not None:
+                chunks.close()
+
+    app = FastAPI(title=title, lifespan=lifespan)
+    app.state.backend = backend
+    app.state.registry = registry
+    app.state.mcp_transports = mcp_transports
+
+    # gzip/brotli for large tool-call responses (COMPRESSION, COMPRESSION_MIN_SIZE)
+    app.add_middleware(
+        CompressionMiddleware,
+        paths=["/mcp", "/messages/"],
+        settings=CompressionSettings.from_env(),
+    )
+
+    cors: Dict[str, Any] = {}
+    if n8n:
+        cors = {"expose_headers": ["*"], "max_age": 86400}  # 24 hours in seconds
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=os.getenv("ALLOWED_ORIGINS", "*").split(","),
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        **cors,
+    )
+
+    mcp_transports.mount(app)
+
+    # Serialized once at startup, since the tool list never changes while the server runs
+    tools_json = PrecomputedJSON({"tools": registry.definitions()})
+    sse_initial_frames = [sse_frame(MCPMessage("server.info", {"name": "mem0-mcp"}))] + [
+        sse_frame(MCPMessage("server.tool", definition)) for definition in registry.definitions()
+    ]
+
+    def broadcast_preference_added(memory: Dict[str, Any]) -> None:
+        """
+        Notify every /sse subscriber that a preference was stored. /sse has no
+        namespace, so only adds to the default namespace are announced.
+        """
+        if not memory.get("namespace", DEFAULT_NAMESPACE).is_default:
+            return
+        sse_connections.broadcast(
+            sse_frame(MCPMessage("preference.added", {"id": memory["id"], "tags": memory["tags"]}))
+        )
+
+    backend.on_add(broadcast_preference_added)
+    register_collectors(backend, sse_connections)
+
+    def readiness() -> Dict[str, Any]:
+        if local_search is None:
+            return {"ready": True}
+        return {"ready": local_search.ready, "local_index": local_search.info()}
+
+    @app.get("/health")
+    async def health_check():
+        """Liveness, plus readiness and snapshot age of the local index for information."""
+        return {"status": "healthy", **readiness()}
+
+    @app.get("/ready")
+    async def ready_check():
+        """Readiness: 503 until the local index can serve reads (snapshot loaded or synced)."""
+        body = readiness()
+        return FastJSONResponse(body, status_code=200 if body["ready"] else 503)
+
+    @app.get("/cache/stats")
+    async def cache_stats():
+        """Response cache hit, miss and eviction counters."""
+        if backend.cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **(await backend.cache.info())}
+
+    @app.get("/metrics")
+    async def metrics_endpoint() -> Response:
+        """Prometheus metrics."""
+        return metrics_response()
+
+    @app.get("/backend/stats")
+    async def backend_stats():
+        """The selected memory backend and its size or connection details."""
+        return backend.info()
+
+    @app.get("/upstream/stats")
+    async def upstream_stats():
+        """Mem0 call, retry and failure counters and the circuit breaker state."""
+        if backend.resilience is None:
+            return {"enabled": False}
+        return backend.resilience.info()
+
+    @app.get("/spool/stats")
+    async def spool_stats():
+        """Number of spooled writes per delivery status."""
+        if write_spool is None:
+            return {"enabled": False}
+        return {"enabled": True, **(await write_spool.stats())}
+
+    @app.get("/spool/{spool_id}")
+    async def spool_status(spool_id: str) -> Response:
+        """Delivery status of a write queued in async write mode."""
+        status = await write_spool.status(spool_id) if write_spool is not None else None
+        if status is None:
+            return FastJSONResponse({"error": f"Unknown spool id: {spool_id}"}, status_code=404)
+        return FastJSONResponse(status)
+
+    @app.get("/admission/stats")
+    async def admission_stats():
+        """Running and queued tool calls and rejections by reason."""
+        if admission is None:
+            return {"enabled": False}
+        return {"enabled": True, **admission.info()}
+
+    @app.get("/dedup/stats")
+    async def dedup_stats():
+        """Size of the duplicate index and how many adds it answered."""
+        if dedup is None:
+            return {"enabled": False}
+        return {"enabled": True, **dedup.info()}
+
+    @app.get("/changes/stats")
+    async def changes_stats():
+        """Size and current version of the change log behind sync tokens."""
+        if changes is None:
+            return {"enabled": False}
+        return {"enabled": True, **changes.info()}
+
+    @app.get("/chunks/stats")
+    async def chunks_stats():
+        """Snippets stored in chunks, and the chunking settings."""
+        if chunks is None:
+            return {"enabled": False}
+        return {"enabled": True, **chunks.info()}
+
+    @app.get("/tools")
+    async def list_tools(request: Request) -> Response:
+        """Tool definitions, with an ETag so clients can revalidate cheaply."""
+        return tools_json.response(request)
+
+    @app.get("/sse")
+    async def sse_endpoint() -> SSEResponse:
+        """SSE endpoint for MCP clients to connect to."""
+        # Server info and tool definitions go out first; the stream then stays open
+        # for heartbeats and broadcasts until the client disconnects
+        return SSEResponse(sse_connections, sse_initial_frames)
+
+    # Request body limits for /mcp and /messages/ (MAX_BODY_BYTES, BODY_PARSE_THREAD_BYTES)
+    body_settings = BodySettings.from_env()
+    app.include_router(mcp_router(dispatcher, body_settings))
+    if n8n:
+        app.include_router(n8n_router(dispatcher, body_settings))
+
+    return app
+
+
+async def run_stdio(app: FastAPI) -> None:
+    """Serve MCP over stdio, with the same startup and shutdown as the HTTP server."""
+    async with app.router.lifespan_context(app):
+        await app.state.mcp_transports.run_stdio()
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="MCP Server with Mem0 for Managing Coding Preferences"
+    )
+    parser.add_argument(
+        "--host", type=str, default=os.getenv("HOST", "0.0.0.0"), help="Host to bind the server to"
+    )
+    parser.add_argument(
+        "--port", type=int, default=int(os.getenv("PORT", 8080)), help="Port to bind the server to"
+    )
+    parser.add_argument(
+        "--workers",
+        type=resolve_workers,
+        default=os.getenv("WORKERS", "1"),
+        help="Worker processes to run, or 'auto' for one per CPU core",
+    )
+    parser.add_argument(
+        "--transport",
+        type=str,
+        choices=["http", "stdio"],
+        default=os.getenv("MCP_TRANSPORT", "http"),
+        help="Serve over HTTP (SSE, streamable HTTP and REST) or a single stdio MCP session",
+    )
+    return parser.parse_args()
+
+
+def main(app: FastAPI, import_string: str, app_dir: str) -> None:
+    """
+    Command line entry point of a server script. import_string ("module:app")
+    and app_dir let extra worker processes import the same app.
+    """
+    args = parse_args()
+    if args.transport == "stdio":
+        asyncio.run(run_stdio(app))
+    else:
+        logger.info(f"Starting {app.title} on {args.host}:{args.port}")
+        run_server(
+            app,
+            import_string,
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            app_dir=app_dir,
+        )
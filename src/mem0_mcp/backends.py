@@ -0,0 +1,144 @@
+"""
+Memory backends behind the coding preference tools.
+MemoryBackend is the interface the tool handlers, the local search mirror and
+the write spool use. Three implementations ship, selected with MEMORY_BACKEND:
+the Mem0 REST API (cloud, the default), the self-hosted mem0ai library
+(mem0ai), and a SQLite store searched in process with NumPy (local), which
+needs no network at all. Only the selected backend's module is imported.
+Every call takes the namespace it is scoped to; the default namespace is the
+whole store.
+"""
+
+import asyncio
+import logging
+import os
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from .namespaces import DEFAULT_NAMESPACE, Namespace
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("cloud", "mem0ai", "local")
+
+
+class MemoryBackend(ABC):
+    """
+    Stores memories as {"id", "content", "tags"} dicts. Every call returns a
+    result dict with "success"; failed reads and updates of a missing memory,
+    or of one outside the namespace, carry "status": 404.
+    """
+
+    name = "base"
+    # ResponseCache in front of the backend, if it has one
+    cache = None
+    # Resilience policy of a remote backend (retries, rate limit, circuit breaker)
+    resilience = None
+
+    def __init__(self):
+        self._add_listeners: List[Callable[[Dict[str, Any]], None]] = []
+
+    async def start(self) -> None:
+        """Open connections or load the store. Called once from the app lifespan."""
+
+    async def close(self) -> None:
+        """Release whatever start opened."""
+
+    def on_add(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Register a callback run with {"id", "content", "tags", "namespace"}
+        after each stored memory.
+        """
+        self._add_listeners.append(listener)
+
+    def _notify_add(self, memory: Dict[str, Any]) -> None:
+        for listener in self._add_listeners:
+            try:
+                listener(memory)
+            except Exception:
+                logger.exception("Error in add listener")
+
+    def pool_usage(self) -> Dict[str, int]:
+        """Connections in use and the pool limit; zero for backends without a pool."""
+        return {"in_use": 0, "limit": 0}
+
+    def info(self) -> Dict[str, Any]:
+        """Backend name and size or connection details, for /backend/stats."""
+        return {"backend": self.name}
+
+    @abstractmethod
+    async def add(
+        self, content: str, tags: List[str], namespace: Namespace = DEFAULT_NAMESPACE
+    ) -> Dict[str, Any]:
+        """Store a memory; returns {"success", "id"}."""
+
+    async def add_many(
+        self, items: List[Tuple[str, List[str]]], namespace: Namespace = DEFAULT_NAMESPACE
+    ) -> List[Dict[str, Any]]:
+        """Store several memories, returning one result per item in order."""
+        return list(
+            await asyncio.gather(*(self.add(content, tags, namespace) for content, tags in items))
+        )
+
+    @abstractmethod
+    async def update_tags(
+        self, mem_id: str, tags: List[str], namespace: Namespace = DEFAULT_NAMESPACE
+    ) -> Dict[str, Any]:
+        """Replace the tags of a stored memory."""
+
+    @abstractmethod
+    async def delete(self, mem_id: str, namespace: Namespace = DEFAULT_NAMESPACE) -> Dict[str, Any]:
+        """Delete a stored memory."""
+
+    @abstractmethod
+    async def get(self, mem_id: str, namespace: Namespace = DEFAULT_NAMESPACE) -> Dict[str, Any]:
+        """Fetch one memory; returns {"success", "preference"}."""
+
+    @abstractmethod
+    async def get_all(self, namespace: Namespace = DEFAULT_NAMESPACE) -> Dict[str, Any]:
+        """Fetch every memory; returns {"success", "preferences"}."""
+
+    @abstractmethod
+    async def get_page(
+        self,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        namespace: Namespace = DEFAULT_NAMESPACE,
+    ) -> Dict[str, Any]:
+        """Fetch one page of memories; returns {"success", "preferences", "next_cursor"}."""
+
+    async def iter_pages(
+        self, limit: Optional[int] = None, namespace: Namespace = DEFAULT_NAMESPACE
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield pages of memories until there is no next cursor."""
+        cursor = None
+        while True:
+            page = await self.get_page(cursor, limit, namespace)
+            yield page
+            cursor = page.get("next_cursor")
+            if not page.get("success") or not cursor:
+                return
+
+    @abstractmethod
+    async def search(self, query: str, namespace: Namespace = DEFAULT_NAMESPACE) -> Dict[str, Any]:
+        """Search memories; returns {"success", "preferences"} with a score each."""
+
+
+def backend_from_env(api_url: str, api_key: str) -> MemoryBackend:
+    """Build the backend selected by MEMORY_BACKEND (cloud, mem0ai or local)."""
+    kind = os.getenv("MEMORY_BACKEND", "cloud").lower()
+    if kind == "local":
+        from .local_backend import LocalBackend
+
+        return LocalBackend.from_env()
+    if kind == "mem0ai":
+        from .library_backend import Mem0LibraryBackend
+
+        return Mem0LibraryBackend.from_env()
+    if kind != "cloud":
+        raise ValueError(f"MEMORY_BACKEND must be one of {', '.join(BACKENDS)}, not {kind!r}")
+
+    from .cache import ResponseCache
+    from .client import Mem0Client
+
+    return Mem0Client(api_url, api_key, cache=ResponseCache.from_env())
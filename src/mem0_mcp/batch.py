@@ -0,0 +1,93 @@
+"""
+Batch execution of tool calls.
+A batch runs its calls concurrently under a concurrency cap and returns one
+result per call, in request order. Calls to tools with a bulk handler (adds)
+are grouped into bulk upstream requests instead.
+"""
+
+import asyncio
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BatchCall = Tuple[str, Dict[str, Any]]
+CallTool = Callable[[str, Dict[str, Any]], Awaitable[Optional[Dict[str, Any]]]]
+BulkCall = Callable[[List[Dict[str, Any]]], Awaitable[List[Dict[str, Any]]]]
+
+
+@dataclass
+class BatchSettings:
+    """Limits for batch tool calls."""
+
+    concurrency: int = 10
+    max_size: int = 500
+    bulk_add_size: int = 50
+
+    @classmethod
+    def from_env(cls) -> "BatchSettings":
+        """Build settings from BATCH_* environment variables."""
+        return cls(
+            concurrency=int(os.getenv("BATCH_CONCURRENCY", cls.concurrency)),
+            max_size=int(os.getenv("BATCH_MAX_SIZE", cls.max_size)),
+            bulk_add_size=int(os.getenv("BATCH_BULK_ADD_SIZE", cls.bulk_add_size)),
+        )
+
+
+async def run_batch(
+    calls: List[BatchCall],
+    call_tool: CallTool,
+    settings: BatchSettings,
+    bulk: Optional[Dict[str, BulkCall]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Run tool calls concurrently and return {"status", "result"} per call, in order.
+    call_tool returns None for an unknown tool. Calls to a tool named in bulk
+    are sent through its bulk function in groups of bulk_add_size.
+    """
+    bulk = bulk or {}
+    results: List[Dict[str, Any]] = [{} for _ in calls]
+    semaphore = asyncio.Semaphore(settings.concurrency)
+
+    async def run_one(index: int) -> None:
+        tool_name, arguments = calls[index]
+        async with semaphore:
+            try:
+                result = await call_tool(tool_name, arguments)
+            except Exception as e:
+                logger.exception(f"Error processing batch item {index}")
+                results[index] = {"status": 500, "result": {"error": str(e)}}
+                return
+
+        if result is None:
+            results[index] = {"status": 400, "result": {"error": f"Unknown tool: {tool_name}"}}
+        else:
+            results[index] = {"status": 200, "result": result}
+
+    async def run_bulk(tool_name: str, indexes: List[int]) -> None:
+        async with semaphore:
+            try:
+                bulk_results = await bulk[tool_name]([calls[i][1] for i in indexes])
+            except Exception as e:
+                logger.exception(f"Error processing bulk {tool_name}")
+                bulk_results = [{"success": False, "error": str(e)} for _ in indexes]
+
+        for index, result in zip(indexes, bulk_results):
+            results[index] = {"status": 200, "result": result}
+
+    bulk_indexes: Dict[str, List[int]] = {}
+    tasks = []
+    for index, (tool_name, _) in enumerate(calls):
+        if tool_name in bulk:
+            bulk_indexes.setdefault(tool_name, []).append(index)
+        else:
+            tasks.append(run_one(index))
+
+    for tool_name, indexes in bulk_indexes.items():
+        for start in range(0, len(indexes), settings.bulk_add_size):
+            tasks.append(run_bulk(tool_name, indexes[start : start + settings.bulk_add_size]))
+
+    await asyncio.gather(*tasks)
+    return results
@@ -0,0 +1,378 @@
+"""
+Read-through response cache for Mem0 read calls.
+Results of get_all and search are cached per normalized query with a TTL and
+LRU eviction. Expired entries are kept a while longer so they can be served
+when Mem0 is failing. The cache is kept in process by default, in SQLite to
+share it between the workers of one host, or in Redis to share it between
+replicas.
+
+Keys start with a partition (the namespace key) followed by "|", so a write
+only invalidates the partitions that can see it. Every backend keeps a
+generation per partition that invalidation bumps; a fill only stores its
+result if the generation it read before fetching is still current, so a
+read that raced a write cannot put the pre-write answer back.
+"""
+
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from .shared import SharedDatabase, shared_state_path
+
+logger = logging.getLogger(__name__)
+
+
+def partition_of(key: str) -> str:
+    """The partition a cache key belongs to."""
+    return key.partition("|")[0]
+
+
+@dataclass
+class CacheStats:
+    """Counters used to size the cache."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+    stale_hits: int = 0
+    # Fills dropped because a write invalidated their partition while they ran
+    discarded_fills: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        """Convert the counters to a plain dict."""
+        return asdict(self)
+
+
+class MemoryCacheBackend:
+    """Bounded in-process cache with TTL and LRU eviction."""
+
+    def __init__(self, max_entries: int, ttl: float, stale_ttl: float, stats: CacheStats):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.stats = stats
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        # Bumped by clear(): everything, and per partition
+        self._epoch = 0
+        self._generations: Dict[str, int] = {}
+
+    async def generation(self, key: str) -> Tuple[int, int]:
+        return self._epoch, self._generations.get(partition_of(key), 0)
+
+    async def get(self, key: str, allow_stale: bool = False) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        now = time.monotonic()
+        if expires_at + self.stale_ttl < now:
+            del self._entries[key]
+            self.stats.expirations += 1
+            return None
+        if expires_at < now and not allow_stale:
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, generation: Tuple[int, int]) -> bool:
+        if generation != await self.generation(key):
+            return False
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+        return True
+
+    async def clear(self, partitions: Optional[Set[str]] = None) -> None:
+        if partitions is None:
+            self._epoch += 1
+            self._entries.clear()
+            return
+        for partition in partitions:
+            self._generations[partition] = self._generations.get(partition, 0) + 1
+        for key in [k for k in self._entries if partition_of(k) in partitions]:
+            del self._entries[key]
+
+    async def size(self) -> int:
+        return len(self._entries)
+
+
+class RedisCacheBackend:
+    """
+    Cache backend shared between replicas through Redis.
+    Entries expire through Redis TTLs and the size bound comes from the server's
+    maxmemory policy. Invalidation bumps a generation counter (global, or
+    per partition) instead of scanning keys, so it costs one round trip
+    regardless of cache size.
+    """
+
+    def __init__(self, url: str, ttl: float, stale_ttl: float, prefix: str = "mem0-mcp:cache"):
+        # Imported lazily so redis is only required when this backend is configured
+        import redis.asyncio as redis
+
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.prefix = prefix
+        self._redis = redis.from_url(url)
+
+    async def generation(self, key: str) -> str:
+        generations = await self._redis.mget(
+            f"{self.prefix}:generation", f"{self.prefix}:generation:{partition_of(key)}"
+        )
+        return ".".join(str(int(g or 0)) for g in generations)
+
+    async def get(self, key: str, allow_stale: bool = False) -> Optional[Any]:
+        generation = await self.generation(key)
+        raw = await self._redis.get(f"{self.prefix}:{generation}:{key}")
+        if raw is None:
+            return None
+        expires_at, value = json.loads(raw)
+        if expires_at < time.time() and not allow_stale:
+            return None
+        return value
+
+    async def set(self, key: str, value: Any, generation: str) -> bool:
+        # Stored under the generation read before the fetch: if a write bumped it
+        # meanwhile, the entry is never read
+        await self._redis.set(
+            f"{self.prefix}:{generation}:{key}",
+            json.dumps([time.time() + self.ttl, value]),
+            px=int((self.ttl + self.stale_ttl) * 1000),
+        )
+        return generation == await self.generation(key)
+
+    async def clear(self, partitions: Optional[Set[str]] = None) -> None:
+        if partitions is None:
+            await self._redis.incr(f"{self.prefix}:generation")
+            return
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for partition in partitions:
+                pipe.incr(f"{self.prefix}:generation:{partition}")
+            await pipe.execute()
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+class SQLiteCacheBackend:
+    """
+    Cache backend shared by the worker processes of one host through SQLite.
+    Entries past their stale window are pruned, and the oldest ones are
+    evicted beyond max_entries, on each write. Generations live in the same
+    database, so a write in one worker discards fills running in the others.
+    Statements run on a worker thread, so a database locked by another worker
+    only delays the calls waiting on the cache.
+    """
+
+    def __init__(self, path: str, max_entries: int, ttl: float, stale_ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._shared = SharedDatabase(path)
+        self._db = self._shared.db
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        # Partition "*" counts clears of the whole cache
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS cache_generations "
+            "(partition TEXT PRIMARY KEY, generation INTEGER NOT NULL)"
+        )
+
+    async def generation(self, key: str) -> int:
+        return await self._shared.run(self._generation, key)
+
+    def _generation(self, key: str) -> int:
+        # Both counters only grow, so their sum changes whenever either does
+        (generation,) = self._db.execute(
+            "SELECT COALESCE(SUM(generation), 0) FROM cache_generations"
+            " WHERE partition IN ('*', ?)",
+            (partition_of(key),),
+        ).fetchone()
+        return generation
+
+    async def get(self, key: str, allow_stale: bool = False) -> Optional[Any]:
+        return await self._shared.run(self._get, key, allow_stale)
+
+    def _get(self, key: str, allow_stale: bool) -> Optional[Any]:
+        row = self._db.execute(
+            "SELECT value, expires_at FROM response_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at < time.time() and not allow_stale:
+            return None
+        return json.loads(value)
+
+    async def set(self, key: str, value: Any, generation: int) -> bool:
+        return await self._shared.run(self._set, key, json.dumps(value), generation)
+
+    def _set(self, key: str, value: str, generation: int) -> bool:
+        now = time.time()
+        # Checked in the same statement, so a clear from another worker cannot slip in
+        stored = self._db.execute(
+            "INSERT OR REPLACE INTO response_cache (key, value, expires_at)"
+            " SELECT ?, ?, ? WHERE (SELECT COALESCE(SUM(generation), 0) FROM cache_generations"
+            " WHERE partition IN ('*', ?)) = ?",
+            (key, value, now + self.ttl, partition_of(key), generation),
+        ).rowcount
+        if not stored:
+            return False
+        self._db.execute("DELETE FROM response_cache WHERE expires_at < ?", (now - self.stale_ttl,))
+        self._db.execute(
+            "DELETE FROM response_cache WHERE key IN (SELECT key FROM response_cache "
+            "ORDER BY expires_at LIMIT max(0, (SELECT COUNT(*) FROM response_cache) - ?))",
+            (self.max_entries,),
+        )
+        return True
+
+    async def clear(self, partitions: Optional[Set[str]] = None) -> None:
+        await self._shared.run(self._clear, partitions)
+
+    def _clear(self, partitions: Optional[Set[str]]) -> None:
+        self._db.executemany(
+            "INSERT INTO cache_generations (partition, generation) VALUES (?, 1)"
+            " ON CONFLICT (partition) DO UPDATE SET generation = generation + 1",
+            [("*",)] if partitions is None else [(partition,) for partition in partitions],
+        )
+        if partitions is None:
+            self._db.execute("DELETE FROM response_cache")
+            return
+        self._db.executemany(
+            "DELETE FROM response_cache WHERE substr(key, 1, length(?) + 1) = ? || '|'",
+            [(partition, partition) for partition in partitions],
+        )
+
+    async def close(self) -> None:
+        self._shared.close()
+
+    async def size(self) -> int:
+        return await self._shared.run(self._size)
+
+    def _size(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+
+
+class ResponseCache:
+    """Read-through cache in front of the Mem0 read calls."""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: float = 60.0,
+        redis_url: Optional[str] = None,
+        stale_ttl: float = 600.0,
+        shared_path: Optional[str] = None,
+    ):
+        self.stats = CacheStats()
+        if redis_url:
+            self.backend = RedisCacheBackend(redis_url, ttl, stale_ttl)
+            logger.info("Using Redis response cache")
+        elif shared_path:
+            self.backend = SQLiteCacheBackend(shared_path, max_entries, ttl, stale_ttl)
+            logger.info(f"Using response cache shared between workers at {shared_path}")
+        else:
+            self.backend = MemoryCacheBackend(max_entries, ttl, stale_ttl, self.stats)
+
+    @classmethod
+    def from_env(cls) -> Optional["ResponseCache"]:
+        """Build the cache from CACHE_* environment variables, or None if disabled."""
+        if os.getenv("CACHE_ENABLED", "true").lower() in ("0", "false", "no"):
+            return None
+        return cls(
+            max_entries=int(os.getenv("CACHE_MAX_ENTRIES", 1024)),
+            ttl=float(os.getenv("CACHE_TTL_SECONDS", 60)),
+            redis_url=os.getenv("CACHE_REDIS_URL") or None,
+            stale_ttl=float(os.getenv("CACHE_STALE_SECONDS", 600)),
+            shared_path=shared_state_path(),
+        )
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Normalize a search query so trivially different spellings share an entry."""
+        return " ".join(query.lower().split())
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Return a cached value, counting the hit or miss."""
+        try:
+            value = await self.backend.get(key)
+        except Exception:
+            logger.exception("Error reading from response cache")
+            value = None
+
+        if value is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+        return value
+
+    async def get_stale(self, key: str) -> Optional[Any]:
+        """Return a cached value even if expired, as a fallback while Mem0 is failing."""
+        try:
+            value = await self.backend.get(key, allow_stale=True)
+        except Exception:
+            logger.exception("Error reading from response cache")
+            return None
+
+        if value is not None:
+            self.stats.stale_hits += 1
+        return value
+
+    async def generation(self, key: str) -> Optional[Any]:
+        """
+        Generation of the key's partition, to read before fetching a value
+        and pass to set. None if the backend could not be read.
+        """
+        try:
+            return await self.backend.generation(key)
+        except Exception:
+            logger.exception("Error reading from response cache")
+            return None
+
+    async def set(self, key: str, value: Any, generation: Optional[Any]) -> None:
+        """
+        Store a fetched value, unless its partition was invalidated since
+        generation was read (or it could not be read).
+        """
+        if generation is None:
+            return
+        try:
+            stored = await self.backend.set(key, value, generation)
+        except Exception:
+            logger.exception("Error writing to response cache")
+            return
+        if not stored:
+            self.stats.discarded_fills += 1
+
+    async def invalidate(self, partitions: Optional[Iterable[str]] = None) -> None:
+        """Drop cached responses after a successful write: those of the partitions, or all."""
+        self.stats.invalidations += 1
+        try:
+            await self.backend.clear(set(partitions) if partitions is not None else None)
+        except Exception:
+            logger.exception("Error invalidating response cache")
+
+    async def close(self) -> None:
+        """Release backend resources."""
+        if isinstance(self.backend, (RedisCacheBackend, SQLiteCacheBackend)):
+            await self.backend.close()
+
+    async def info(self) -> Dict[str, Any]:
+        """Counters and current size, for the stats endpoint."""
+        info: Dict[str, Any] = self.stats.to_dict()
+        if isinstance(self.backend, (MemoryCacheBackend, SQLiteCacheBackend)):
+            info["size"] = await self.backend.size()
+            info["max_entries"] = self.backend.max_entries
+        info["backend"] = type(self.backend).__name__
+        return info
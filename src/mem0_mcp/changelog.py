@@ -0,0 +1,162 @@
+"""
+Change log behind incremental get_all_coding_preferences.
+Every preference stored or retagged through the server is written to a local
+SQLite log under a new, increasing version; a memory keeps only its latest
+row, so the log never outgrows the store. A listing returns a sync_token, and
+a client keeping a copy of its preferences passes it back as since to get
+only what changed after it. Tokens name the log that issued them, so a token
+from another or a recreated log is answered with a full listing instead.
+"""
+
+import json
+import os
+import time
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .namespaces import DEFAULT_NAMESPACE, Namespace, sql_filter
+from .shared import connect
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS changes (
+    version INTEGER PRIMARY KEY AUTOINCREMENT,
+    mem_id TEXT NOT NULL UNIQUE,
+    content TEXT NOT NULL,
+    tags TEXT NOT NULL,
+    tenant TEXT,
+    user_id TEXT,
+    project TEXT,
+    changed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS changes_namespace ON changes (tenant, user_id, project, version);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class ChangeLog:
+    """Latest version of every preference written through the server, by version."""
+
+    def __init__(self, path: str = "data/changes.sqlite3", max_page_size: int = 1000):
+        self.path = path
+        self.max_page_size = max_page_size
+        self._db = connect(path)
+        self._db.executescript(_SCHEMA)
+        # Every worker sharing the file agrees on the first id written
+        self._db.execute(
+            "INSERT OR IGNORE INTO meta (key, value) VALUES ('log_id', ?)", (uuid.uuid4().hex[:12],)
+        )
+        (self.log_id,) = self._db.execute("SELECT value FROM meta WHERE key = 'log_id'").fetchone()
+
+    @classmethod
+    def from_env(cls) -> Optional["ChangeLog"]:
+        """Build the log from CHANGE_LOG_* variables. Off unless CHANGE_LOG=true."""
+        if os.getenv("CHANGE_LOG", "false").lower() not in ("true", "1", "yes", "on"):
+            return None
+        return cls(path=os.getenv("CHANGE_LOG_PATH", "data/changes.sqlite3"))
+
+    def _token(self, version: int) -> str:
+        return f"{self.log_id}.{version}"
+
+    def _parse(self, token: str) -> Optional[Tuple[str, int]]:
+        log_id, _, version = token.rpartition(".")
+        if not log_id or not version.isdigit():
+            return None
+        return log_id, int(version)
+
+    def _version(self) -> int:
+        (version,) = self._db.execute("SELECT COALESCE(MAX(version), 0) FROM changes").fetchone()
+        return version
+
+    def token(self) -> str:
+        """Sync token of everything logged so far. Take it before listing the store."""
+        return self._token(self._version())
+
+    def record(self, memory: Dict[str, Any]) -> None:
+        """Log a stored preference; an add listener."""
+        if memory.get("id") is None:
+            return
+        namespace = memory.get("namespace", DEFAULT_NAMESPACE)
+        self._db.execute(
+            "INSERT OR REPLACE INTO changes"
+            " (mem_id, content, tags, tenant, user_id, project, changed_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                memory["id"],
+                memory.get("content", ""),
+                json.dumps(memory.get("tags") or []),
+                namespace.tenant,
+                namespace.user,
+                namespace.project,
+                time.time(),
+            ),
+        )
+
+    def forget(self, mem_ids: Iterable[str]) -> None:
+        """Drop preferences that were deleted again, so deltas no longer list them."""
+        self._db.executemany("DELETE FROM changes WHERE mem_id = ?", [(i,) for i in mem_ids])
+
+    def set_tags(self, mem_id: str, tags: List[str]) -> bool:
+        """Log new tags of a preference. False if it is not in the log yet."""
+        return bool(
+            self._db.execute(
+                "INSERT OR REPLACE INTO changes"
+                " (mem_id, content, tags, tenant, user_id, project, changed_at)"
+                " SELECT mem_id, content, ?, tenant, user_id, project, ?"
+                " FROM changes WHERE mem_id = ?",
+                (json.dumps(tags), time.time(), mem_id),
+            ).rowcount
+        )
+
+    def since(
+        self,
+        token: str,
+        namespace: Namespace = DEFAULT_NAMESPACE,
+        limit: Optional[int] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Preferences of the namespace changed after the token, oldest change
+        first, with the token to pass next; a 400 result for a malformed
+        token. None if the token is not from this log, in which case the
+        client has to list everything again.
+        """
+        parsed = self._parse(token)
+        if parsed is None:
+            return {"success": False, "error": f"Invalid sync token: {token}", "status": 400}
+        log_id, after = parsed
+        # Versions above the current one can only come from a log that was recreated
+        current = self._version()
+        if log_id != self.log_id or after > current:
+            return None
+
+        limit = self.max_page_size if limit is None else max(1, min(int(limit), self.max_page_size))
+        where, params = sql_filter(namespace, "AND")
+        # Bounded by the version read first, so a change committed meanwhile is left
+        # for the next call instead of being skipped by the returned token
+        rows = self._db.execute(
+            "SELECT version, mem_id, content, tags FROM changes WHERE version > ? AND version <= ?"
+            + where
+            + " ORDER BY version LIMIT ?",
+            (after, current, *params, limit + 1),
+        ).fetchall()
+        more = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            "success": True,
+            "preferences": [
+                {"id": mem_id, "content": content, "tags": json.loads(tags)}
+                for _, mem_id, content, tags in rows
+            ],
+            "sync_token": self._token(rows[-1][0] if more else current),
+            "has_more": more,
+        }
+
+    def info(self) -> Dict[str, Any]:
+        """Logged preferences, the current version and the log id."""
+        (entries,) = self._db.execute("SELECT COUNT(*) FROM changes").fetchone()
+        return {"entries": entries, "version": self._version(), "log_id": self.log_id}
+
+    def close(self) -> None:
+        self._db.close()
@@ -0,0 +1,150 @@
+"""
+Chunking of oversized code snippets.
+add_coding_preference stores a snippet longer than CHUNK_THRESHOLD characters
+as a parent memory (title, language and description, with an empty code
+block and a "parts:<n>" tag) plus one memory per chunk of at most CHUNK_SIZE
+characters. Chunks are cut at line ends and overlap by about CHUNK_OVERLAP
+characters, so code near a cut can be found from either side. Each chunk is
+tagged "parent:<id>" and "part:<i>", which search uses to return a matching
+chunk with its parent; the local index records where each chunk came from,
+so get_coding_preference can put the snippet back together. In async write
+mode the parent and its chunks are queued in the write spool together.
+"""
+
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from .shared import connect
+
+PARENT_TAG = "parent:"
+
+# Chunks stored per bulk add
+ADD_BATCH = 50
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    parent_id TEXT NOT NULL,
+    part INTEGER NOT NULL,
+    mem_id TEXT NOT NULL,
+    start INTEGER NOT NULL,
+    end INTEGER NOT NULL,
+    PRIMARY KEY (parent_id, part)
+);
+CREATE INDEX IF NOT EXISTS chunks_mem_id ON chunks (mem_id);
+"""
+
+Span = Tuple[int, int]
+
+
+def split(content: str, size: int, overlap: int) -> List[Span]:
+    """
+    (start, end) offsets of chunks of at most size characters covering the
+    content. Each chunk ends after a newline where there is one, and the next
+    starts at the first line beginning in the overlap before that end.
+    """
+    spans: List[Span] = []
+    start = 0
+    while True:
+        end = min(start + size, len(content))
+        if end < len(content):
+            cut = content.rfind("\n", start, end - 1)
+            if cut >= start:
+                end = cut + 1
+        spans.append((start, end))
+        if end >= len(content):
+            return spans
+        window = max(end - overlap, start + 1)
+        newline = content.find("\n", window - 1, end - 1)
+        start = newline + 1 if newline >= 0 else window
+
+
+def join(pieces: List[str], spans: List[Span]) -> str:
+    """The content the chunks were split from."""
+    parts = [pieces[0]]
+    for (start, _), (_, previous_end), piece in zip(spans[1:], spans, pieces[1:]):
+        parts.append(piece[previous_end - start :])
+    return "".join(parts)
+
+
+def parent_of(preference: Dict[str, Any]) -> Optional[str]:
+    """The id of the memory a chunk belongs to, or None if it is not a chunk."""
+    for tag in preference.get("tags") or ():
+        if tag.startswith(PARENT_TAG):
+            return tag[len(PARENT_TAG) :]
+    return None
+
+
+class ChunkIndex:
+    """Chunking settings and the chunks stored for each oversized snippet."""
+
+    def __init__(
+        self,
+        path: str = "data/chunks.sqlite3",
+        threshold: int = 32000,
+        size: int = 8000,
+        overlap: int = 400,
+    ):
+        self.path = path
+        self.size = max(1, size)
+        self.threshold = max(threshold, self.size)
+        self.overlap = max(0, min(overlap, self.size // 2))
+        self._db = connect(path)
+        self._db.executescript(_SCHEMA)
+
+    @classmethod
+    def from_env(cls) -> Optional["ChunkIndex"]:
+        """Build the index from CHUNK_* variables. Off unless CHUNKING=true."""
+        if os.getenv("CHUNKING", "false").lower() not in ("true", "1", "yes", "on"):
+            return None
+        return cls(
+            path=os.getenv("CHUNK_INDEX_PATH", "data/chunks.sqlite3"),
+            threshold=int(os.getenv("CHUNK_THRESHOLD", 32000)),
+            size=int(os.getenv("CHUNK_SIZE", 8000)),
+            overlap=int(os.getenv("CHUNK_OVERLAP", 400)),
+        )
+
+    def needs_split(self, content: str) -> bool:
+        return len(content) > self.threshold
+
+    def split(self, content: str) -> List[Span]:
+        return split(content, self.size, self.overlap)
+
+    def record(self, parent_id: str, mem_ids: List[str], spans: List[Span]) -> None:
+        """Remember the chunks stored for a parent, in order."""
+        self._db.executemany(
+            "INSERT OR REPLACE INTO chunks (parent_id, part, mem_id, start, end)"
+            " VALUES (?, ?, ?, ?, ?)",
+            [
+                (parent_id, part, mem_id, start, end)
+                for part, (mem_id, (start, end)) in enumerate(zip(mem_ids, spans), 1)
+            ],
+        )
+
+    def resolve(self, spool_id: str, mem_id: str) -> None:
+        """Replace the spool ID of a queued parent or chunk by its Mem0 ID; a delivery listener."""
+        self._db.execute("UPDATE chunks SET parent_id = ? WHERE parent_id = ?", (mem_id, spool_id))
+        self._db.execute("UPDATE chunks SET mem_id = ? WHERE mem_id = ?", (mem_id, spool_id))
+
+    def parts(self, parent_id: str) -> List[Tuple[str, Span]]:
+        """(chunk id, span) of each chunk of a parent, in order; empty for other memories."""
+        rows = self._db.execute(
+            "SELECT mem_id, start, end FROM chunks WHERE parent_id = ? ORDER BY part",
+            (parent_id,),
+        ).fetchall()
+        return [(mem_id, (start, end)) for mem_id, start, end in rows]
+
+    def info(self) -> Dict[str, Any]:
+        """Chunked snippets and chunks stored, and the settings."""
+        parents, chunks = self._db.execute(
+            "SELECT COUNT(DISTINCT parent_id), COUNT(*) FROM chunks"
+        ).fetchone()
+        return {
+            "parents": parents,
+            "chunks": chunks,
+            "threshold": self.threshold,
+            "size": self.size,
+            "overlap": self.overlap,
+        }
+
+    def close(self) -> None:
+        self._db.close()
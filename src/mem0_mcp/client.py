@@ -0,0 +1,478 @@
+"""
+Pooled HTTP client for the Mem0 REST API.
+One client is opened per app lifetime and shared by every tool handler, so
+tool calls reuse keep-alive connections instead of paying DNS, TCP and TLS
+setup on each invocation.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import aiohttp
+
+from .backends import MemoryBackend
+from .cache import ResponseCache
+from .metrics import UPSTREAM_DURATION, UPSTREAM_RESPONSES, trace_span
+from .namespaces import DEFAULT_NAMESPACE, Namespace
+from .resilience import CircuitOpenError, Resilience, UpstreamError, parse_retry_after
+from .shared import shared_state_path
+from .singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ClientSettings:
+    """Connection pool, timeout and retry settings for the Mem0 client."""
+
+    pool_size: int = 100
+    pool_size_per_host: int = 20
+    keepalive_timeout: float = 30.0
+    dns_cache_ttl: int = 300
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    coalesce_requests: bool = True
+    bulk_add_path: Optional[str] = None
+    page_size: int = 100
+    max_page_size: int = 1000
+    deadline: float = 30.0
+    max_retries: int = 3
+    retry_base: float = 0.2
+    retry_max: float = 5.0
+    rate_limit: float = 0.0
+    rate_burst: int = 20
+    breaker_threshold: int = 5
+    breaker_reset: float = 30.0
+    shared_state_path: Optional[str] = None
+
+    @classmethod
+    def from_env(cls) -> "ClientSettings":
+        """Build settings from MEM0_* environment variables."""
+        return cls(
+            pool_size=int(os.getenv("MEM0_POOL_SIZE", cls.pool_size)),
+            pool_size_per_host=int(os.getenv("MEM0_POOL_SIZE_PER_HOST", cls.pool_size_per_host)),
+            keepalive_timeout=float(os.getenv("MEM0_KEEPALIVE_TIMEOUT", cls.keepalive_timeout)),
+            dns_cache_ttl=int(os.getenv("MEM0_DNS_CACHE_TTL", cls.dns_cache_ttl)),
+            connect_timeout=float(os.getenv("MEM0_CONNECT_TIMEOUT", cls.connect_timeout)),
+            read_timeout=float(os.getenv("MEM0_READ_TIMEOUT", cls.read_timeout)),
+            coalesce_requests=os.getenv("MEM0_COALESCE_REQUESTS", "true").lower()
+            not in ("0", "false", "no"),
+            bulk_add_path=os.getenv("MEM0_BULK_ADD_PATH") or None,
+            page_size=int(os.getenv("MEM0_PAGE_SIZE", cls.page_size)),
+            max_page_size=int(os.getenv("MEM0_MAX_PAGE_SIZE", cls.max_page_size)),
+            deadline=float(os.getenv("MEM0_DEADLINE", cls.deadline)),
+            max_retries=int(os.getenv("MEM0_MAX_RETRIES", cls.max_retries)),
+            retry_base=float(os.getenv("MEM0_RETRY_BASE", cls.retry_base)),
+            retry_max=float(os.getenv("MEM0_RETRY_MAX", cls.retry_max)),
+            rate_limit=float(os.getenv("MEM0_RATE_LIMIT", cls.rate_limit)),
+            rate_burst=int(os.getenv("MEM0_RATE_BURST", cls.rate_burst)),
+            breaker_threshold=int(os.getenv("MEM0_BREAKER_THRESHOLD", cls.breaker_threshold)),
+            breaker_reset=float(os.getenv("MEM0_BREAKER_RESET", cls.breaker_reset)),
+            shared_state_path=shared_state_path(),
+        )
+
+
+class Mem0Client(MemoryBackend):
+    """App-lifetime client for the Mem0 REST API; the cloud memory backend."""
+
+    name = "cloud"
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        settings: Optional[ClientSettings] = None,
+        cache: Optional[ResponseCache] = None,
+    ):
+        super().__init__()
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.settings = settings or ClientSettings.from_env()
+        self.cache = cache
+        self.flight = SingleFlight() if self.settings.coalesce_requests else None
+        self.resilience = Resilience(
+            deadline=self.settings.deadline,
+            max_retries=self.settings.max_retries,
+            retry_base=self.settings.retry_base,
+            retry_max=self.settings.retry_max,
+            rate_limit=self.settings.rate_limit,
+            rate_burst=self.settings.rate_burst,
+            breaker_threshold=self.settings.breaker_threshold,
+            breaker_reset=self.settings.breaker_reset,
+            shared_path=self.settings.shared_state_path,
+        )
+        self._session: Optional[aiohttp.ClientSession] = None
+        # Requests holding a pool connection; aiohttp has no public counter of its own
+        self._checked_out = 0
+
+    async def start(self) -> None:
+        """Open the pooled session. Must be called from a running event loop."""
+        if self._session is not None and not self._session.closed:
+            return
+
+        connector = aiohttp.TCPConnector(
+            limit=self.settings.pool_size,
+            limit_per_host=self.settings.pool_size_per_host,
+            keepalive_timeout=self.settings.keepalive_timeout,
+            ttl_dns_cache=self.settings.dns_cache_ttl,
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=None,
+            sock_connect=self.settings.connect_timeout,
+            sock_read=self.settings.read_timeout,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=timeout,
+            headers={"Authorization": f"Bearer {self.api_key}"},
+        )
+        logger.info(
+            f"Opened Mem0 connection pool to {self.base_url} "
+            f"(limit={self.settings.pool_size}, per_host={self.settings.pool_size_per_host})"
+        )
+
+    async def close(self) -> None:
+        """Close the pooled session and release its connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        if self.cache is not None:
+            await self.cache.close()
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        # Fall back to opening the pool lazily when used outside the app lifespan
+        if self._session is None or self._session.closed:
+            await self.start()
+        return self._session
+
+    def pool_usage(self) -> Dict[str, int]:
+        """Mem0 requests in flight, each holding or waiting for a pool connection, and the limit."""
+        return {"in_use": self._checked_out, "limit": self.settings.pool_size}
+
+    def info(self) -> Dict[str, Any]:
+        return {"backend": self.name, "url": self.base_url, "pool": self.pool_usage()}
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        idempotent: bool = True,
+        operation: Optional[str] = None,
+        **kwargs,
+    ) -> Any:
+        """
+        Call a Mem0 endpoint under the resilience policy and return the parsed JSON.
+        Raises UpstreamError for non-200 responses. operation labels the call in
+        metrics and spans (default "METHOD path"), so paths with IDs can share one.
+        """
+        session = await self._get_session()
+        operation = operation or f"{method} {path}"
+
+        async def attempt() -> Any:
+            started = time.perf_counter()
+            status = "error"
+            self._checked_out += 1
+            try:
+                async with session.request(method, f"{self.base_url}{path}", **kwargs) as response:
+                    status = str(response.status)
+                    if response.status != 200:
+                        raise UpstreamError(
+                            response.status,
+                            await response.text(),
+                            parse_retry_after(response.headers.get("Retry-After")),
+                        )
+                    return await response.json()
+            except asyncio.CancelledError:
+                # Cut off by the call deadline
+                status = "timeout"
+                raise
+            finally:
+                self._checked_out -= 1
+                UPSTREAM_RESPONSES.labels(operation, status).inc()
+                UPSTREAM_DURATION.labels(operation).observe(time.perf_counter() - started)
+
+        with trace_span("mem0_request", operation=operation):
+            try:
+                return await self.resilience.call(attempt, idempotent=idempotent)
+            except CircuitOpenError:
+                UPSTREAM_RESPONSES.labels(operation, "circuit_open").inc()
+                raise
+
+    async def add(
+        self, content: str, tags: List[str], namespace: Namespace = DEFAULT_NAMESPACE
+    ) -> Dict[str, Any]:
+        """
+        Store a memory in Mem0. Adds are never coalesced: two callers storing the
+        same snippet at once each get a memory of their own.
+        """
+        return await self._add(content, tags, namespace)
+
+    async def add_many(
+        self, items: List[Tuple[str, List[str]]], namespace: Namespace = DEFAULT_NAMESPACE
+    ) -> List[Dict[str, Any]]:
+        """
+        Store several memories, returning one result per item in order.
+        Uses a single bulk request when MEM0_BULK_ADD_PATH is configured,
+        otherwise falls back to concurrent single adds over the shared pool.
+        """
+        if not self.settings.bulk_add_path:
+            return list(
+                await asyncio.gather(
+                    *(self.add(content, tags, namespace) for content, tags in items)
+                )
+            )
+
+        try:
+            result = await self._request(
+                "POST",
+                self.settings.bulk_add_path,
+                idempotent=False,
+                params=namespace.scope(),
+                json={"mems": [{"content": content, "tags": tags} for content, tags in items]},
+            )
+        except (UpstreamError, CircuitOpenError) as e:
+            logger.error(f"Failed to add coding preferences: {e}")
+            return [{"success": False, "error": str(e)} for _ in items]
+        except Exception as e:
+            logger.exception("Error adding coding preferences")
+            return [{"success": False, "error": str(e)} for _ in items]
+
+        await self._invalidate(namespace)
+        ids = result.get("ids", [])
+        for mem_id, (content, tags) in zip(ids, items):
+            self._notify_add(
+                {"id": mem_id, "content": content, "tags": tags, "namespace": namespace}
+            )
+        return [
+            (
+                {"success": True, "id": ids[i]}
+                if i < len(ids)
+                else {"success": False, "error": "Missing id in bulk add response"}
+            )
+            for i in range(len(items))
+        ]
+
+    async def update_tags(
+        self, mem_id: str, tags: List[str], namespace: Namespace = DEFAULT_NAMESPACE
+    ) -> Dict[str, Any]:
+        """Replace the tags of a stored memory. A failed result carries the upstream status."""
+        try:
+            await self._request(
+                "PUT",
+                f"/api/v1/mems/{mem_id}",
+                operation="PUT /api/v1/mems/{id}",
+                params=namespace.scope(),
+                json={"tags": tags},
+            )
+        except UpstreamError as e:
+            logger.error(f"Failed to update coding preference tags: {e}")
+            return {"success": False, "error": str(e), "status": e.status}
+        except CircuitOpenError as e:
+            logger.error(f"Failed to update coding preference tags: {e}")
+            return {"success": False, "error": str(e)}
+        except Exception as e:
+            logger.exception("Error updating coding preference tags")
+            return {"success": False, "error": str(e)}
+
+        await self._invalidate(namespace)
+        return {"success": True, "id": mem_id}
+
+    async def delete(self, mem_id: str, namespace: Namespace = DEFAULT_NAMESPACE) -> Dict[str, Any]:
+        """Delete a stored memory. A failed result carries the upstream status."""
+        try:
+            await self._request(
+                "DELETE",
+                f"/api/v1/mems/{mem_id}",
+                operation="DELETE /api/v1/mems/{id}",
+                params=namespace.scope(),
+            )
+        except UpstreamError as e:
+            logger.error(f"Failed to delete coding preference: {e}")
+            return {"success": False, "error": str(e), "status": e.status}
+        except CircuitOpenError as e:
+            logger.error(f"Failed to delete coding preference: {e}")
+            return {"success": False, "error": str(e)}
+        except Exception as e:
+            logger.exception("Error deleting coding preference")
+            return {"success": False, "error": str(e)}
+
+        await self._invalidate(namespace)
+        return {"success": True, "id": mem_id}
+
+    async def get(self, mem_id: str, namespace: Namespace = DEFAULT_NAMESPACE) -> Dict[str, Any]:
+        """
+        Fetch one memory, through the response cache. A failed result carries
+        the upstream status.
+        """
+        return await self._cached(namespace, f"get:{mem_id}", lambda: self._get(mem_id, namespace))
+
+    async def get_all(self, namespace: Namespace = DEFAULT_NAMESPACE) -> Dict[str, Any]:
+        """Fetch every memory from Mem0, through the response cache."""
+        return await self._cached(namespace, "get_all", lambda: self._get_all(namespace))
+
+    async def get_page(
+        self,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        namespace: Namespace = DEFAULT_NAMESPACE,
+    ) -> Dict[str, Any]:
+        """Fetch one page of memories, through the response cache."""
+        limit = self._page_limit(limit)
+        key = f"get_page:{cursor or ''}:{limit}"
+        return await self._cached(namespace, key, lambda: self._get_page(cursor, limit, namespace))
+
+    async def iter_pages(
+        self, limit: Optional[int] = None, namespace: Namespace = DEFAULT_NAMESPACE
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield pages of memories until Mem0 reports no next cursor.
+        Pages bypass the cache and are fetched one at a time, so memory use is
+        bounded by the page size rather than the size of the store.
+        """
+        limit = self._page_limit(limit)
+        cursor = None
+        while True:
+            page = await self._get_page(cursor, limit, namespace)
+            yield page
+            cursor = page.get("next_cursor")
+            if not page.get("success") or not cursor:
+                return
+
+    def _page_limit(self, limit: Optional[int]) -> int:
+        if limit is None:
+            return self.settings.page_size
+        return max(1, min(int(limit), self.settings.max_page_size))
+
+    async def search(self, query: str, namespace: Namespace = DEFAULT_NAMESPACE) -> Dict[str, Any]:
+        """Search memories in Mem0, through the response cache."""
+        key = f"search:{ResponseCache.normalize(query)}"
+        return await self._cached(namespace, key, lambda: self._search(query, namespace))
+
+    async def _coalesce(self, key: str, fn) -> Dict[str, Any]:
+        if self.flight is None:
+            return await fn()
+        return await self.flight.do(key, fn)
+
+    async def _invalidate(self, namespace: Namespace) -> None:
+        # A write is visible in its namespace and in every namespace covering it
+        if self.cache is not None:
+            await self.cache.invalidate(ns.key for ns in namespace.covering())
+
+    async def _cached(self, namespace: Namespace, key: str, fetch) -> Dict[str, Any]:
+        key = f"{namespace.key}|{key}"
+        if self.cache is None:
+            return await self._coalesce(key, fetch)
+
+        cached = await self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        async def fetch_and_store() -> Dict[str, Any]:
+            # Read first: a write landing during the fetch makes the result too old to cache
+            generation = await self.cache.generation(key)
+            result = await fetch()
+            # Only successful responses are cached so errors are retried on the next call
+            if result.get("success"):
+                await self.cache.set(key, result, generation)
+            return result
+
+        result = await self._coalesce(key, fetch_and_store)
+        if not result.get("success"):
+            # Mem0 is failing: an expired answer is better than none
+            stale = await self.cache.get_stale(key)
+            if stale is not None:
+                return {**stale, "stale": True}
+        return result
+
+    async def _add(self, content: str, tags: List[str], namespace: Namespace) -> Dict[str, Any]:
+        try:
+            result = await self._request(
+                "POST",
+                "/api/v1/mems",
+                idempotent=False,
+                params=namespace.scope(),
+                json={"content": content, "tags": tags},
+            )
+        except (UpstreamError, CircuitOpenError) as e:
+            logger.error(f"Failed to add coding preference: {e}")
+            return {"success": False, "error": str(e)}
+        except Exception as e:
+            logger.exception("Error adding coding preference")
+            return {"success": False, "error": str(e)}
+
+        await self._invalidate(namespace)
+        self._notify_add(
+            {"id": result.get("id"), "content": content, "tags": tags, "namespace": namespace}
+        )
+        return {"success": True, "id": result.get("id")}
+
+    async def _get(self, mem_id: str, namespace: Namespace) -> Dict[str, Any]:
+        try:
+            result = await self._request(
+                "GET",
+                f"/api/v1/mems/{mem_id}",
+                operation="GET /api/v1/mems/{id}",
+                params=namespace.scope(),
+            )
+        except UpstreamError as e:
+            logger.error(f"Failed to get coding preference: {e}")
+            return {"success": False, "error": str(e), "status": e.status}
+        except CircuitOpenError as e:
+            logger.error(f"Failed to get coding preference: {e}")
+            return {"success": False, "error": str(e)}
+        except Exception as e:
+            logger.exception("Error getting coding preference")
+            return {"success": False, "error": str(e)}
+
+        return {"success": True, "preference": result}
+
+    async def _get_all(self, namespace: Namespace) -> Dict[str, Any]:
+        try:
+            result = await self._request("GET", "/api/v1/mems", params=namespace.scope())
+        except (UpstreamError, CircuitOpenError) as e:
+            logger.error(f"Failed to get coding preferences: {e}")
+            return {"success": False, "error": str(e)}
+        except Exception as e:
+            logger.exception("Error getting coding preferences")
+            return {"success": False, "error": str(e)}
+
+        return {"success": True, "preferences": result.get("mems", [])}
+
+    async def _get_page(
+        self, cursor: Optional[str], limit: int, namespace: Namespace
+    ) -> Dict[str, Any]:
+        params: Dict[str, Any] = {"limit": limit, **namespace.scope()}
+        if cursor:
+            params["cursor"] = cursor
+        try:
+            result = await self._request("GET", "/api/v1/mems", params=params)
+        except (UpstreamError, CircuitOpenError) as e:
+            logger.error(f"Failed to get coding preferences: {e}")
+            return {"success": False, "error": str(e)}
+        except Exception as e:
+            logger.exception("Error getting coding preferences")
+            return {"success": False, "error": str(e)}
+
+        return {
+            "success": True,
+            "preferences": result.get("mems", []),
+            "next_cursor": result.get("next_cursor"),
+        }
+
+    async def _search(self, query: str, namespace: Namespace) -> Dict[str, Any]:
+        try:
+            result = await self._request(
+                "GET", "/api/v1/mems/search", params={"query": query, **namespace.scope()}
+            )
+        except (UpstreamError, CircuitOpenError) as e:
+            logger.error(f"Failed to search coding preferences: {e}")
+            return {"success": False, "error": str(e)}
+        except Exception as e:
+            logger.exception("Error searching coding preferences")
+            return {"success": False, "error": str(e)}
+
+        return {"success": True, "preferences": result.get("mems", [])}
@@ -0,0 +1,147 @@
+"""
+Response compression for the tool-call endpoints.
+Complete /mcp and /messages/ responses above COMPRESSION_MIN_SIZE are
+compressed with brotli (when installed) or gzip, whichever the client's
+Accept-Encoding prefers. Streamed responses pass through untouched, so NDJSON
+lines still reach the client as they are written. The size of every response
+before and after compression is recorded in metrics.
+"""
+
+import asyncio
+import gzip
+import os
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .metrics import RESPONSE_BYTES
+
+GZIP_LEVEL = 6
+# Low brotli qualities are as fast as gzip and still compress JSON better
+BROTLI_QUALITY = 4
+# Bodies above this size are compressed in a worker thread, off the event loop
+THREAD_MIN_SIZE = 256 * 1024
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Map each encoding in an Accept-Encoding header to its q-value."""
+    accepted: Dict[str, float] = {}
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[name.strip().lower()] = q
+    return accepted
+
+
+def choose_encoding(header: str, available: Iterable[str]) -> Optional[str]:
+    """The available encoding (in server preference order) the client accepts most, if any."""
+    accepted = parse_accept_encoding(header)
+    best, best_q = None, 0.0
+    for encoding in available:
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def brotli_module():
+    """The brotli module, or None if it is not installed."""
+    # Imported lazily so brotli is only loaded once compression is enabled
+    try:
+        import brotli
+    except ImportError:  # pragma: no cover - optional dependency
+        return None
+    return brotli
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress a body with "br" or "gzip"."""
+    if encoding == "br":
+        return brotli_module().compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+@dataclass
+class CompressionSettings:
+    """When to compress tool-call responses."""
+
+    enabled: bool = False
+    min_size: int = 1024
+
+    @classmethod
+    def from_env(cls) -> "CompressionSettings":
+        """Build settings from COMPRESSION and COMPRESSION_MIN_SIZE."""
+        return cls(
+            enabled=os.getenv("COMPRESSION", "false").lower() in ("true", "1", "yes"),
+            min_size=int(os.getenv("COMPRESSION_MIN_SIZE", cls.min_size)),
+        )
+
+    def encodings(self) -> List[str]:
+        """Supported encodings, preferred first."""
+        if not self.enabled:
+            return []
+        return ["br", "gzip"] if brotli_module() is not None else ["gzip"]
+
+
+class CompressionMiddleware:
+    """ASGI middleware that compresses complete responses on the given paths."""
+
+    def __init__(self, app: ASGIApp, paths: Iterable[str], settings: CompressionSettings):
+        self.app = app
+        self.paths = frozenset(paths)
+        self.settings = settings
+        self.encodings = settings.encodings()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        endpoint = scope["path"]
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        start: Optional[Message] = None
+        streaming = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, streaming
+            if message["type"] == "http.response.start":
+                # Held back until the body shows whether the response is streamed
+                start = message
+                return
+            if message["type"] != "http.response.body" or streaming:
+                await send(message)
+                return
+            if message.get("more_body", False):
+                streaming = True
+                await send(start)
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            RESPONSE_BYTES.labels(endpoint, "uncompressed").observe(len(body))
+            headers = MutableHeaders(scope=start)
+            if len(body) >= self.settings.min_size and "content-encoding" not in headers:
+                headers.add_vary_header("Accept-Encoding")
+                if encoding is not None:
+                    if len(body) >= THREAD_MIN_SIZE:
+                        body = await asyncio.to_thread(compress, body, encoding)
+                    else:
+                        body = compress(body, encoding)
+                    headers["Content-Encoding"] = encoding
+                    headers["Content-Length"] = str(len(body))
+            RESPONSE_BYTES.labels(endpoint, "sent").observe(len(body))
+            await send(start)
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, send_compressed)
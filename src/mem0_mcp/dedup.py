@@ -0,0 +1,245 @@
+"""
+Duplicate detection for add_coding_preference.
+Every stored preference is indexed in a local SQLite database by a fingerprint
+of its language and whitespace-normalized code. Re-adding the same snippet
+returns the existing memory ID instead of storing a copy. In near mode a
+64-bit SimHash of the code also catches small edits: a snippet within
+DEDUP_MAX_DISTANCE bits of a stored one has its tags merged into that memory.
+Snippets only duplicate ones stored in the same namespace.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from .metrics import DEDUP_HITS
+from .namespaces import DEFAULT_NAMESPACE, Namespace
+from .shared import connect
+
+logger = logging.getLogger(__name__)
+
+# The SimHash is split into four 16-bit bands. Two hashes at most 3 bits apart
+# share at least one band, so candidates are found with indexed lookups.
+BANDS = 4
+BAND_BITS = 16
+MAX_DISTANCE = BANDS - 1
+
+# Below this many tokens a few edits change too large a share of the snippet
+# for the SimHash to mean anything, so only exact matches count
+MIN_NEAR_TOKENS = 8
+# Above this many characters hashing would hold up the event loop for too
+# long, so only exact matches count (chunked snippets start at 32000)
+MAX_NEAR_CHARS = 32000
+
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fingerprints (
+    fingerprint TEXT PRIMARY KEY,
+    mem_id TEXT NOT NULL,
+    queued INTEGER NOT NULL DEFAULT 0,
+    language TEXT NOT NULL,
+    simhash INTEGER NOT NULL,
+    band0 INTEGER NOT NULL,
+    band1 INTEGER NOT NULL,
+    band2 INTEGER NOT NULL,
+    band3 INTEGER NOT NULL,
+    tags TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    namespace TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS fingerprints_mem_id ON fingerprints (mem_id);
+CREATE INDEX IF NOT EXISTS fingerprints_band0 ON fingerprints (language, band0);
+CREATE INDEX IF NOT EXISTS fingerprints_band1 ON fingerprints (language, band1);
+CREATE INDEX IF NOT EXISTS fingerprints_band2 ON fingerprints (language, band2);
+CREATE INDEX IF NOT EXISTS fingerprints_band3 ON fingerprints (language, band3);
+"""
+
+
+def normalize_language(language: str) -> str:
+    return language.strip().lower()
+
+
+def fingerprint(language: str, content: str, namespace: Namespace = DEFAULT_NAMESPACE) -> str:
+    """Hash of the namespace, the language and the code with every whitespace run collapsed."""
+    normalized = " ".join(content.split())
+    key = f"{normalize_language(language)}\n{normalized}"
+    if not namespace.is_default:
+        # Default namespace fingerprints are unchanged from before namespaces existed
+        key = f"{namespace.key}\n{key}"
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def simhash(content: str) -> Optional[int]:
+    """64-bit SimHash over token trigrams of the code, or None if it is too short or too long."""
+    if len(content) > MAX_NEAR_CHARS:
+        return None
+    tokens = _TOKEN.findall(content)
+    if len(tokens) < MIN_NEAR_TOKENS:
+        return None
+
+    weights = [0] * 64
+    for i in range(len(tokens) - 2):
+        shingle = " ".join(tokens[i : i + 3]).encode()
+        value = int.from_bytes(hashlib.blake2b(shingle, digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+
+def _bands(value: int) -> List[int]:
+    return [(value >> (BAND_BITS * band)) & 0xFFFF for band in range(BANDS)]
+
+
+def _signed(value: int) -> int:
+    # SQLite integers are signed 64-bit
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+@dataclass
+class Duplicate:
+    """A stored preference matching a new one."""
+
+    mem_id: str
+    tags: List[str]
+    queued: bool
+    kind: str  # "exact" or "near"
+    distance: int = 0
+
+
+class DedupIndex:
+    """Local index of stored preferences by fingerprint and SimHash."""
+
+    def __init__(
+        self,
+        path: str = "data/dedup.sqlite3",
+        near_duplicates: bool = False,
+        max_distance: int = 3,
+    ):
+        self.path = path
+        self.near_duplicates = near_duplicates
+        self.max_distance = max(0, min(max_distance, MAX_DISTANCE))
+        self.exact_hits = 0
+        self.near_hits = 0
+        self._db = connect(path)
+        self._db.executescript(_SCHEMA)
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(fingerprints)")}
+        if "namespace" not in columns:
+            self._db.execute(
+                "ALTER TABLE fingerprints ADD COLUMN namespace TEXT NOT NULL DEFAULT ''"
+            )
+
+    @classmethod
+    def from_env(cls) -> Optional["DedupIndex"]:
+        """Build the index from DEDUP_* variables. Off unless DEDUP_MODE is exact or near."""
+        mode = os.getenv("DEDUP_MODE", "off").lower()
+        if mode in ("off", "none", "false", "0"):
+            return None
+        return cls(
+            path=os.getenv("DEDUP_PATH", "data/dedup.sqlite3"),
+            near_duplicates=mode == "near",
+            max_distance=int(os.getenv("DEDUP_MAX_DISTANCE", 3)),
+        )
+
+    def find(
+        self, language: str, content: str, namespace: Namespace = DEFAULT_NAMESPACE
+    ) -> Optional[Duplicate]:
+        """The preference stored in the namespace that this one duplicates, if any."""
+        row = self._db.execute(
+            "SELECT mem_id, tags, queued FROM fingerprints WHERE fingerprint = ?",
+            (fingerprint(language, content, namespace),),
+        ).fetchone()
+        if row is not None:
+            self.exact_hits += 1
+            DEDUP_HITS.labels("exact").inc()
+            return Duplicate(row[0], json.loads(row[1]), bool(row[2]), "exact")
+
+        if not self.near_duplicates:
+            return None
+        value = simhash(content)
+        if value is None:
+            return None
+
+        bands = _bands(value)
+        candidates = self._db.execute(
+            "SELECT mem_id, tags, queued, simhash FROM fingerprints"
+            " WHERE language = ? AND namespace = ? AND ("
+            + " OR ".join(f"band{band} = ?" for band in range(BANDS))
+            + ")",
+            (normalize_language(language), namespace.key, *bands),
+        ).fetchall()
+        best: Optional[Duplicate] = None
+        for mem_id, tags, queued, stored in candidates:
+            distance = bin((stored & ((1 << 64) - 1)) ^ value).count("1")
+            if distance <= self.max_distance and (best is None or distance < best.distance):
+                best = Duplicate(mem_id, json.loads(tags), bool(queued), "near", distance)
+        if best is not None:
+            self.near_hits += 1
+            DEDUP_HITS.labels("near").inc()
+        return best
+
+    def record(
+        self,
+        language: str,
+        content: str,
+        mem_id: str,
+        tags: List[str],
+        queued: bool = False,
+        namespace: Namespace = DEFAULT_NAMESPACE,
+    ) -> None:
+        """Index a stored preference (or a queued one, by its spool ID)."""
+        value = simhash(content)
+        # Snippets without a SimHash get a value no other snippet shares a band with
+        bands = _bands(value) if value is not None else [-1] * BANDS
+        self._db.execute(
+            "INSERT OR REPLACE INTO fingerprints (fingerprint, mem_id, queued, language, simhash,"
+            " band0, band1, band2, band3, tags, created_at, namespace)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                fingerprint(language, content, namespace),
+                mem_id,
+                int(queued),
+                normalize_language(language),
+                _signed(value or 0),
+                *bands,
+                json.dumps(tags),
+                time.time(),
+                namespace.key,
+            ),
+        )
+
+    def set_tags(self, mem_id: str, tags: List[str]) -> None:
+        """Record the merged tags of a memory."""
+        self._db.execute(
+            "UPDATE fingerprints SET tags = ? WHERE mem_id = ?", (json.dumps(tags), mem_id)
+        )
+
+    def resolve(self, spool_id: str, mem_id: str) -> None:
+        """Replace the spool ID of a delivered preference with its Mem0 ID."""
+        self._db.execute(
+            "UPDATE fingerprints SET mem_id = ?, queued = 0 WHERE mem_id = ? AND queued = 1",
+            (mem_id, spool_id),
+        )
+
+    def forget(self, mem_id: str) -> None:
+        """Drop every fingerprint pointing at a memory that no longer exists."""
+        self._db.execute("DELETE FROM fingerprints WHERE mem_id = ?", (mem_id,))
+
+    def info(self) -> Dict[str, Any]:
+        """Index size, hit counters and settings."""
+        (entries,) = self._db.execute("SELECT COUNT(*) FROM fingerprints").fetchone()
+        return {
+            "entries": entries,
+            "exact_hits": self.exact_hits,
+            "near_hits": self.near_hits,
+            "near_duplicates": self.near_duplicates,
+            "max_distance": self.max_distance,
+        }
+
+    def close(self) -> None:
+        self._db.close()
@@ -0,0 +1,248 @@
+"""
+Local keyword index over coding preferences.
+An inverted index scored with BM25 over the title, description and code of
+every preference, plus facet indexes on language and tags, so filtered and
+keyword searches are answered in-process. Pure Python: it needs none of the
+optional dependencies of the semantic index.
+"""
+
+import heapq
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+_WORD_RE = re.compile(r"[A-Za-z0-9_]+")
+_CAMEL_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+")
+
+# Inverse of preferences.format_preference: "# title", a fenced code block, a description
+_PREFERENCE_RE = re.compile(
+    r"\A# (?P<title>[^\n]*)\n\n```(?P<language>[^\n]*)\n(?P<code>.*)\n```\n\n(?P<description>.*)\Z",
+    re.DOTALL,
+)
+
+# Standard BM25 parameters
+K1 = 1.2
+B = 0.75
+# Title words count this many times as often as code and description words
+TITLE_WEIGHT = 2
+
+
+@lru_cache(maxsize=65536)
+def _word_tokens(word: str) -> Tuple[str, ...]:
+    # Identifiers repeat a lot across snippets, so each is split once
+    parts = [p for chunk in word.split("_") for p in _CAMEL_RE.findall(chunk)]
+    if len(parts) > 1:
+        return (word.lower(), *(p.lower() for p in parts))
+    return (word.lower(),)
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase words, plus the parts of snake_case and camelCase identifiers."""
+    tokens: List[str] = []
+    for word in _WORD_RE.findall(text):
+        tokens.extend(_word_tokens(word))
+    return tokens
+
+
+def parse_preference(content: str) -> Dict[str, str]:
+    """Split stored markdown back into title, language, code and description."""
+    match = _PREFERENCE_RE.match(content)
+    if match is None:
+        # Stored some other way: index it all as code
+        return {"title": "", "language": "", "code": content, "description": ""}
+    fields = match.groupdict()
+    fields["language"] = fields["language"].strip().lower()
+    return fields
+
+
+def matches(preference: Dict[str, Any], language: Optional[str], tags: Iterable[str]) -> bool:
+    """Whether a preference has the language (if given) and every one of the tags."""
+    if (
+        language
+        and parse_preference(preference.get("content", ""))["language"] != language.strip().lower()
+    ):
+        return False
+    return set(tags) <= set(preference.get("tags") or [])
+
+
+class KeywordIndex:
+    """BM25 inverted index with language and tag facets, keyed on Mem0 id."""
+
+    def __init__(self):
+        self._preferences: Dict[str, Dict[str, Any]] = {}
+        self._lengths: Dict[str, int] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._languages: Dict[str, Set[str]] = {}
+        self._tags: Dict[str, Set[str]] = {}
+        self._language_of: Dict[str, str] = {}
+        # Insertion order, so unranked (filter-only) results come newest first
+        self._sequence: Dict[str, int] = {}
+        self._next = 0
+        self._total_length = 0
+        # Per-term BM25 weights of each posting, valid until the index changes
+        self._weights: Dict[str, Dict[str, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._preferences)
+
+    def add_many(self, preferences: List[Dict[str, Any]]) -> None:
+        """Insert or replace preferences ({"id", "content", "tags"})."""
+        for preference in preferences:
+            mem_id = preference.get("id")
+            if mem_id is None:
+                continue
+            current = self._preferences.get(mem_id)
+            if current is not None:
+                if (current.get("content"), current.get("tags")) == (
+                    preference.get("content"),
+                    preference.get("tags"),
+                ):
+                    continue
+                self._remove(mem_id)
+            self._insert(mem_id, preference)
+
+    def get(self, mem_id: str) -> Optional[Dict[str, Any]]:
+        """The indexed preference with this id, if any."""
+        return self._preferences.get(mem_id)
+
+    def ids(self) -> Set[str]:
+        return set(self._preferences)
+
+    def all(self) -> List[Dict[str, Any]]:
+        """Every indexed preference, oldest first."""
+        return [self._preferences[i] for i in sorted(self._preferences, key=self._sequence.get)]
+
+    def remove_many(self, mem_ids: Iterable[str]) -> None:
+        """Drop preferences from the index."""
+        for mem_id in mem_ids:
+            if mem_id in self._preferences:
+                self._remove(mem_id)
+                del self._sequence[mem_id]
+
+    def set_tags(self, mem_id: str, tags: List[str]) -> None:
+        """Replace the tags of an indexed preference."""
+        current = self._preferences.get(mem_id)
+        if current is not None:
+            self.add_many([{**current, "tags": list(tags)}])
+
+    def _insert(self, mem_id: str, preference: Dict[str, Any]) -> None:
+        self._weights.clear()
+        fields = parse_preference(preference.get("content", ""))
+        terms = Counter(
+            tokenize(fields["title"]) * TITLE_WEIGHT
+            + tokenize(fields["description"])
+            + tokenize(fields["code"])
+        )
+        for term, count in terms.items():
+            self._postings.setdefault(term, {})[mem_id] = count
+        length = sum(terms.values())
+        self._lengths[mem_id] = length
+        self._total_length += length
+
+        self._language_of[mem_id] = fields["language"]
+        self._languages.setdefault(fields["language"], set()).add(mem_id)
+        for tag in preference.get("tags") or []:
+            self._tags.setdefault(tag, set()).add(mem_id)
+
+        self._preferences[mem_id] = preference
+        self._sequence.setdefault(mem_id, self._next)
+        self._next += 1
+
+    def _remove(self, mem_id: str) -> None:
+        self._weights.clear()
+        preference = self._preferences.pop(mem_id)
+        fields = parse_preference(preference.get("content", ""))
+        for term in set(
+            tokenize(fields["title"]) + tokenize(fields["description"]) + tokenize(fields["code"])
+        ):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(mem_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._lengths.pop(mem_id)
+
+        language = self._language_of.pop(mem_id)
+        self._languages[language].discard(mem_id)
+        if not self._languages[language]:
+            del self._languages[language]
+        for tag in preference.get("tags") or []:
+            members = self._tags.get(tag)
+            if members is not None:
+                members.discard(mem_id)
+                if not members:
+                    del self._tags[tag]
+
+    def filter(
+        self, language: Optional[str] = None, tags: Iterable[str] = ()
+    ) -> Optional[Set[str]]:
+        """Ids with the language and all the tags, or None when nothing is filtered."""
+        sets = []
+        if language:
+            sets.append(self._languages.get(language.strip().lower(), set()))
+        sets.extend(self._tags.get(tag, set()) for tag in tags)
+        if not sets:
+            return None
+        # Intersect starting from the smallest facet
+        sets.sort(key=len)
+        result = set(sets[0])
+        for other in sets[1:]:
+            result &= other
+        return result
+
+    def search(
+        self,
+        query: str,
+        limit: int,
+        language: Optional[str] = None,
+        tags: Iterable[str] = (),
+    ) -> List[Dict[str, Any]]:
+        """
+        Up to limit preferences matching the filters, ranked by BM25 score for
+        the query. Without query terms, the newest matching preferences.
+        """
+        allowed = self.filter(language, tags)
+        terms = set(tokenize(query))
+        if not terms:
+            ids = allowed if allowed is not None else self._preferences.keys()
+            newest = heapq.nlargest(limit, ids, key=self._sequence.__getitem__)
+            return [self._preferences[mem_id] for mem_id in newest]
+
+        documents = len(self._preferences)
+        scores: Dict[str, float] = {}
+        for term in terms:
+            weights = self._term_weights(term)
+            if not weights:
+                continue
+            idf = math.log(1 + (documents - len(weights) + 0.5) / (len(weights) + 0.5))
+            if allowed is not None:
+                weights = {mem_id: weights[mem_id] for mem_id in weights.keys() & allowed}
+            if not scores:
+                scores = {mem_id: idf * weight for mem_id, weight in weights.items()}
+                continue
+            get = scores.get
+            for mem_id, weight in weights.items():
+                scores[mem_id] = get(mem_id, 0.0) + idf * weight
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [{**self._preferences[mem_id], "score": score} for mem_id, score in best]
+
+    def _term_weights(self, term: str) -> Dict[str, float]:
+        """BM25 term-frequency part of the score of every preference containing term."""
+        weights = self._weights.get(term)
+        if weights is None:
+            postings = self._postings.get(term)
+            if not postings:
+                return {}
+            lengths = self._lengths
+            # tf * (k1 + 1) / (tf + k1 * (1 - b + b * length / average length))
+            base = K1 * (1 - B)
+            scale = K1 * B * len(self._preferences) / self._total_length
+            weights = {
+                mem_id: count * (K1 + 1) / (count + base + scale * lengths[mem_id])
+                for mem_id, count in postings.items()
+            }
+            self._weights[term] = weights
+        return weights
@@ -0,0 +1,219 @@
+"""
+Self-hosted memory backend on the mem0ai library.
+Runs Mem0's open-source AsyncMemory in process against the vector store, LLM
+and embedder of MEM0_LIBRARY_CONFIG, instead of calling the Mem0 REST API.
+Snippets are stored verbatim (no LLM extraction) with their tags in the
+memory metadata, under the namespace's user or else MEM0_USER_ID. The tenant
+and project of a namespace are kept in the metadata too and filtered on.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+from .backends import MemoryBackend
+from .namespaces import DEFAULT_NAMESPACE, Namespace
+
+logger = logging.getLogger(__name__)
+
+
+def _preference(item: Dict[str, Any]) -> Dict[str, Any]:
+    """A mem0ai memory as a coding preference dict."""
+    preference = {
+        "id": item.get("id"),
+        "content": item.get("memory", ""),
+        "tags": (item.get("metadata") or {}).get("tags", []),
+    }
+    if item.get("score") is not None:
+        preference["score"] = item["score"]
+    return preference
+
+
+def load_config(value: Optional[str]) -> Optional[Dict[str, Any]]:
+    """MEM0_LIBRARY_CONFIG as a dict: inline JSON, or the path of a JSON file."""
+    if not value:
+        return None
+    if value.lstrip().startswith("{"):
+        return json.loads(value)
+    with open(value) as f:
+        return json.load(f)
+
+
+class Mem0LibraryBackend(MemoryBackend):
+    """Memories in a self-hosted mem0ai AsyncMemory."""
+
+    name = "mem0ai"
+
+    def __init__(
+        self,
+        config: Optional[Dict[str, Any]] = None,
+        user_id: str = "mem0-mcp",
+        search_limit: int = 10,
+        max_results: int = 10000,
+        page_size: int = 100,
+    ):
+        super().__init__()
+        self.config = config
+        self.user_id = user_id
+        self.search_limit = search_limit
+        self.max_results = max_results
+        self.page_size = page_size
+        self.memory = None
+
+    @classmethod
+    def from_env(cls) -> "Mem0LibraryBackend":
+        """Build the backend from MEM0_LIBRARY_CONFIG, MEM0_USER_ID and MEM0_LIBRARY_MAX_RESULTS."""
+        return cls(
+            config=load_config(os.getenv("MEM0_LIBRARY_CONFIG")),
+            user_id=os.getenv("MEM0_USER_ID", "mem0-mcp"),
+            search_limit=int(os.getenv("LOCAL_SEARCH_LIMIT", 10)),
+            max_results=int(os.getenv("MEM0_LIBRARY_MAX_RESULTS", 10000)),
+        )
+
+    async def start(self) -> None:
+        """Import mem0ai and connect its vector store, off the event loop."""
+        if self.memory is not None:
+            return
+
+        def build():
+            # Imported lazily so mem0ai is only needed when this backend is selected
+            from mem0 import AsyncMemory
+
+            if self.config is None:
+                return AsyncMemory()
+            return AsyncMemory.from_config(self.config)
+
+        self.memory = await asyncio.to_thread(build)
+        logger.info(f"Opened mem0ai memory store for user {self.user_id}")
+
+    def info(self) -> Dict[str, Any]:
+        return {"backend": self.name, "user_id": self.user_id}
+
+    def _filters(self, namespace: Namespace) -> Dict[str, Any]:
+        filters = {"user_id": namespace.user or self.user_id}
+        if namespace.tenant:
+            filters["tenant"] = namespace.tenant
+        if namespace.project:
+            filters["project"] = namespace.project
+        return filters
+
+    def _in_namespace(self, item: Dict[str, Any], namespace: Namespace) -> bool:
+        metadata = item.get("metadata") or {}
+        return all(item.get(k, metadata.get(k)) == v for k, v in self._filters(namespace).items())
+
+    async def add(
+        self, content: str, tags: List[str], namespace: Namespace = DEFAULT_NAMESPACE
+    ) -> Dict[str, Any]:
+        """Store a snippet verbatim, with its tags and namespace as metadata."""
+        filters = self._filters(namespace)
+        user_id = filters.pop("user_id")
+        try:
+            result = await self.memory.add(
+                content, user_id=user_id, metadata={"tags": list(tags), **filters}, infer=False
+            )
+        except Exception as e:
+            logger.exception("Error adding coding preference")
+            return {"success": False, "error": str(e)}
+
+        added = [r for r in result.get("results", []) if r.get("event", "ADD") == "ADD"]
+        if not added:
+            return {"success": False, "error": "mem0ai stored no memory"}
+        mem_id = added[0].get("id")
+        self._notify_add(
+            {"id": mem_id, "content": content, "tags": list(tags), "namespace": namespace}
+        )
+        return {"success": True, "id": mem_id}
+
+    async def update_tags(
+        self, mem_id: str, tags: List[str], namespace: Namespace = DEFAULT_NAMESPACE
+    ) -> Dict[str, Any]:
+        """Replace the tags in a memory's metadata; 404 if it is not in the namespace."""
+        try:
+            item = await self.memory.get(mem_id)
+            if item is None or not self._in_namespace(item, namespace):
+                return {"success": False, "error": f"Memory not found: {mem_id}", "status": 404}
+            # The metadata is replaced whole, so the namespace fields are carried over
+            metadata = {**(item.get("metadata") or {}), "tags": list(tags)}
+            await self.memory.update(mem_id, metadata=metadata)
+        except ValueError as e:
+            # mem0ai reports unknown ids as ValueError("Memory with id ... not found")
+            logger.error(f"Failed to update coding preference tags: {e}")
+            return {"success": False, "error": str(e), "status": 404}
+        except Exception as e:
+            logger.exception("Error updating coding preference tags")
+            return {"success": False, "error": str(e)}
+        return {"success": True, "id": mem_id}
+
+    async def delete(self, mem_id: str, namespace: Namespace = DEFAULT_NAMESPACE) -> Dict[str, Any]:
+        """Delete a memory; 404 if it is not in the namespace."""
+        try:
+            item = await self.memory.get(mem_id)
+            if item is None or not self._in_namespace(item, namespace):
+                return {"success": False, "error": f"Memory not found: {mem_id}", "status": 404}
+            await self.memory.delete(mem_id)
+        except Exception as e:
+            logger.exception("Error deleting coding preference")
+            return {"success": False, "error": str(e)}
+        return {"success": True, "id": mem_id}
+
+    async def get(self, mem_id: str, namespace: Namespace = DEFAULT_NAMESPACE) -> Dict[str, Any]:
+        """Fetch one memory; 404 if there is no such memory in the namespace."""
+        try:
+            item = await self.memory.get(mem_id)
+        except Exception as e:
+            logger.exception("Error getting coding preference")
+            return {"success": False, "error": str(e)}
+        if item is None or not self._in_namespace(item, namespace):
+            return {"success": False, "error": f"Memory not found: {mem_id}", "status": 404}
+        return {"success": True, "preference": _preference(item)}
+
+    async def _list(self, top_k: int, namespace: Namespace) -> Dict[str, Any]:
+        try:
+            result = await self.memory.get_all(filters=self._filters(namespace), top_k=top_k)
+        except Exception as e:
+            logger.exception("Error getting coding preferences")
+            return {"success": False, "error": str(e)}
+        return {"success": True, "preferences": [_preference(i) for i in result.get("results", [])]}
+
+    async def get_all(self, namespace: Namespace = DEFAULT_NAMESPACE) -> Dict[str, Any]:
+        """Every memory of the namespace, up to MEM0_LIBRARY_MAX_RESULTS."""
+        return await self._list(self.max_results, namespace)
+
+    async def get_page(
+        self,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        namespace: Namespace = DEFAULT_NAMESPACE,
+    ) -> Dict[str, Any]:
+        """
+        One page of memories. mem0ai has no cursors, so the cursor is an offset
+        and each page lists the memories up to its end.
+        """
+        limit = self.page_size if limit is None else max(1, int(limit))
+        try:
+            offset = int(cursor) if cursor else 0
+        except ValueError:
+            return {"success": False, "error": f"Invalid cursor: {cursor}", "status": 400}
+        end = min(offset + limit, self.max_results)
+        result = await self._list(end + 1, namespace)
+        if not result.get("success"):
+            return result
+        preferences = result["preferences"]
+        return {
+            "success": True,
+            "preferences": preferences[offset:end],
+            "next_cursor": str(end) if len(preferences) > end else None,
+        }
+
+    async def search(self, query: str, namespace: Namespace = DEFAULT_NAMESPACE) -> Dict[str, Any]:
+        """Semantic search in the namespace's memories."""
+        try:
+            result = await self.memory.search(
+                query, top_k=self.search_limit, filters=self._filters(namespace)
+            )
+        except Exception as e:
+            logger.exception("Error searching coding preferences")
+            return {"success": False, "error": str(e)}
+        return {"success": True, "preferences": [_preference(i) for i in result.get("results", [])]}
@@ -0,0 +1,338 @@
+"""
+Local memory backend: SQLite storage with in-process NumPy search.
+Memories live in one SQLite file in WAL mode, so reads, pages and writes are
+single indexed statements with no network round trip. Semantic search runs
+over a vector_index.VectorIndex of every memory, embedded with the local model
+or hashed bag of words; the hashed vectors are kept narrow (LOCAL_BACKEND_DIM)
+because the brute-force scan is bound by memory bandwidth. Each write bumps a
+version column, which lets every worker process catch its index up with
+writes made by the others. Each memory records its tenant, user and project;
+the index is partitioned by namespace, so scoped searches only scan their own
+memories.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from .backends import MemoryBackend
+from .namespaces import DEFAULT_NAMESPACE, NAMESPACE_COLUMNS, Namespace, sql_filter
+from .shared import connect
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS memories (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    content TEXT NOT NULL,
+    tags TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    tenant TEXT,
+    user_id TEXT,
+    project TEXT
+);
+CREATE INDEX IF NOT EXISTS memories_version ON memories (version);
+"""
+
+_NAMESPACE_INDEX = (
+    "CREATE INDEX IF NOT EXISTS memories_namespace ON memories (tenant, user_id, project)"
+)
+
+# Memories embedded per step when loading the index, between event loop yields
+_LOAD_BATCH = 500
+
+
+def _row(mem_id: str, content: str, tags: str) -> Dict[str, Any]:
+    return {"id": mem_id, "content": content, "tags": json.loads(tags)}
+
+
+class LocalBackend(MemoryBackend):
+    """Memories in a local SQLite file, searched in process."""
+
+    name = "local"
+
+    def __init__(
+        self,
+        path: str = "data/memories.sqlite3",
+        model_name: Optional[str] = None,
+        search_limit: int = 10,
+        dim: int = 256,
+        page_size: int = 100,
+        max_page_size: int = 1000,
+    ):
+        super().__init__()
+        self.path = path
+        self.model_name = model_name
+        self.search_limit = search_limit
+        self.dim = dim
+        self.page_size = page_size
+        self.max_page_size = max_page_size
+        self.embedder = None
+        # Vector index per exact namespace key
+        self._partitions: Dict[str, Any] = {}
+        self._db: Optional[sqlite3.Connection] = None
+        # Highest version already in the vector index
+        self._version = 0
+        # The hashing embedder is cheap enough to run on the event loop
+        self._embed_inline = True
+
+    @classmethod
+    def from_env(cls) -> "LocalBackend":
+        """Build the backend from LOCAL_BACKEND_* and LOCAL_EMBEDDING_MODEL / LOCAL_SEARCH_LIMIT."""
+        return cls(
+            path=os.getenv("LOCAL_BACKEND_PATH", "data/memories.sqlite3"),
+            model_name=os.getenv("LOCAL_EMBEDDING_MODEL") or None,
+            search_limit=int(os.getenv("LOCAL_SEARCH_LIMIT", 10)),
+            dim=int(os.getenv("LOCAL_BACKEND_DIM", 256)),
+        )
+
+    async def start(self) -> None:
+        """Open the database and embed every stored memory into the search index."""
+        if self._db is not None:
+            return
+        # Imported lazily so NumPy is only loaded when this backend is selected
+        from .vector_index import HashingEmbedder, load_embedder
+
+        self._db = connect(self.path)
+        self._db.executescript(_SCHEMA)
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(memories)")}
+        for column in NAMESPACE_COLUMNS:
+            if column not in columns:
+                self._db.execute(f"ALTER TABLE memories ADD COLUMN {column} TEXT")
+        self._db.execute(_NAMESPACE_INDEX)
+        self.embedder = await asyncio.to_thread(load_embedder, self.model_name, self.dim)
+        self._embed_inline = isinstance(self.embedder, HashingEmbedder)
+        while await self._catch_up(_LOAD_BATCH):
+            await asyncio.sleep(0)
+        logger.info(f"Opened local memory store {self.path} ({self._indexed()} memories)")
+
+    async def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def info(self) -> Dict[str, Any]:
+        (memories,) = self._db.execute("SELECT COUNT(*) FROM memories").fetchone()
+        return {
+            "backend": self.name,
+            "path": self.path,
+            "memories": memories,
+            "indexed": self._indexed(),
+            "namespaces": len(self._partitions),
+            "embedder": type(self.embedder).__name__,
+        }
+
+    def _indexed(self) -> int:
+        return sum(len(vectors) for vectors in self._partitions.values())
+
+    def _partition(self, key: str):
+        vectors = self._partitions.get(key)
+        if vectors is None:
+            from .vector_index import VectorIndex
+
+            vectors = self._partitions[key] = VectorIndex(self.embedder)
+        return vectors
+
+    async def _catch_up(self, limit: Optional[int] = None) -> int:
+        """Index memories written or retagged since the last call, by any process."""
+        sql = (
+            "SELECT id, content, tags, tenant, user_id, project, version "
+            "FROM memories WHERE version > ? ORDER BY version"
+        )
+        rows = self._db.execute(
+            sql + (f" LIMIT {int(limit)}" if limit else ""), (self._version,)
+        ).fetchall()
+        if not rows:
+            return 0
+        by_namespace: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            by_namespace.setdefault(Namespace(*row[3:6]).key, []).append(_row(*row[:3]))
+        for key, memories in by_namespace.items():
+            await self._index(key, memories)
+        self._version = max(self._version, rows[-1][6])
+        return len(rows)
+
+    async def _index(self, key: str, memories: List[Dict[str, Any]]) -> None:
+        if self._embed_inline:
+            vectors = self.embedder.embed([m["content"] for m in memories])
+        else:
+            vectors = await asyncio.to_thread(self.embedder.embed, [m["content"] for m in memories])
+        self._partition(key).add_many(memories, vectors)
+
+    def _insert(
+        self, items: List[Tuple[str, List[str]]], namespace: Namespace
+    ) -> List[Dict[str, Any]]:
+        """Store memories in one transaction and return them with their new ids."""
+        memories = [
+            {"id": uuid.uuid4().hex, "content": content, "tags": list(tags)}
+            for content, tags in items
+        ]
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            (version,) = self._db.execute(
+                "SELECT COALESCE(MAX(version), 0) FROM memories"
+            ).fetchone()
+            self._db.executemany(
+                "INSERT INTO memories (id, content, tags, version, tenant, user_id, project) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        m["id"],
+                        m["content"],
+                        json.dumps(m["tags"]),
+                        version + i + 1,
+                        namespace.tenant,
+                        namespace.user,
+                        namespace.project,
+                    )
+                    for i, m in enumerate(memories)
+                ],
+            )
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        if version == self._version:
+            # Nothing from other processes in between, so the index is still current
+            self._version = version + len(memories)
+        return memories
+
+    async def add(
+        self, content: str, tags: List[str], namespace: Namespace = DEFAULT_NAMESPACE
+    ) -> Dict[str, Any]:
+        """Store a memory and index it."""
+        return (await self.add_many([(content, tags)], namespace))[0]
+
+    async def add_many(
+        self, items: List[Tuple[str, List[str]]], namespace: Namespace = DEFAULT_NAMESPACE
+    ) -> List[Dict[str, Any]]:
+        """Store several memories in one transaction, returning one result per item."""
+        try:
+            memories = self._insert(items, namespace)
+        except Exception as e:
+            logger.exception("Error adding coding preferences")
+            return [{"success": False, "error": str(e)} for _ in items]
+
+        await self._index(namespace.key, memories)
+        for memory in memories:
+            self._notify_add({**memory, "namespace": namespace})
+        return [{"success": True, "id": memory["id"]} for memory in memories]
+
+    async def update_tags(
+        self, mem_id: str, tags: List[str], namespace: Namespace = DEFAULT_NAMESPACE
+    ) -> Dict[str, Any]:
+        """Replace the tags of a stored memory; 404 if there is no such memory in the namespace."""
+        where, params = sql_filter(namespace, "AND")
+        try:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute(
+                    "SELECT tenant, user_id, project FROM memories WHERE id = ?" + where,
+                    (mem_id, *params),
+                ).fetchone()
+                if row is not None:
+                    self._db.execute(
+                        "UPDATE memories SET tags = ?, "
+                        "version = (SELECT MAX(version) + 1 FROM memories) WHERE id = ?",
+                        (json.dumps(list(tags)), mem_id),
+                    )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        except Exception as e:
+            logger.exception("Error updating coding preference tags")
+            return {"success": False, "error": str(e)}
+
+        if row is None:
+            return {"success": False, "error": f"Memory not found: {mem_id}", "status": 404}
+        self._partition(Namespace(*row).key).set_tags(mem_id, tags)
+        return {"success": True, "id": mem_id}
+
+    async def delete(self, mem_id: str, namespace: Namespace = DEFAULT_NAMESPACE) -> Dict[str, Any]:
+        """Delete a stored memory; 404 if there is no such memory in the namespace."""
+        where, params = sql_filter(namespace, "AND")
+        try:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute(
+                    "SELECT tenant, user_id, project FROM memories WHERE id = ?" + where,
+                    (mem_id, *params),
+                ).fetchone()
+                if row is not None:
+                    self._db.execute("DELETE FROM memories WHERE id = ?", (mem_id,))
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        except Exception as e:
+            logger.exception("Error deleting coding preference")
+            return {"success": False, "error": str(e)}
+
+        if row is None:
+            return {"success": False, "error": f"Memory not found: {mem_id}", "status": 404}
+        self._partition(Namespace(*row).key).remove_many([mem_id])
+        return {"success": True, "id": mem_id}
+
+    async def get(self, mem_id: str, namespace: Namespace = DEFAULT_NAMESPACE) -> Dict[str, Any]:
+        """Fetch one memory; 404 if there is no such memory in the namespace."""
+        where, params = sql_filter(namespace, "AND")
+        row = self._db.execute(
+            "SELECT id, content, tags FROM memories WHERE id = ?" + where, (mem_id, *params)
+        ).fetchone()
+        if row is None:
+            return {"success": False, "error": f"Memory not found: {mem_id}", "status": 404}
+        return {"success": True, "preference": _row(*row)}
+
+    async def get_all(self, namespace: Namespace = DEFAULT_NAMESPACE) -> Dict[str, Any]:
+        """Every memory of the namespace, oldest first."""
+        where, params = sql_filter(namespace)
+        rows = self._db.execute(
+            "SELECT id, content, tags FROM memories" + where + " ORDER BY seq", params
+        ).fetchall()
+        return {"success": True, "preferences": [_row(*row) for row in rows]}
+
+    async def get_page(
+        self,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        namespace: Namespace = DEFAULT_NAMESPACE,
+    ) -> Dict[str, Any]:
+        """
+        One page of memories, oldest first. The cursor is the position of the
+        last one returned.
+        """
+        limit = self.page_size if limit is None else max(1, min(int(limit), self.max_page_size))
+        try:
+            after = int(cursor) if cursor else 0
+        except ValueError:
+            return {"success": False, "error": f"Invalid cursor: {cursor}", "status": 400}
+        where, params = sql_filter(namespace, "AND")
+        rows = self._db.execute(
+            "SELECT seq, id, content, tags FROM memories WHERE seq > ?"
+            + where
+            + " ORDER BY seq LIMIT ?",
+            (after, *params, limit + 1),
+        ).fetchall()
+        return {
+            "success": True,
+            "preferences": [_row(*row[1:]) for row in rows[:limit]],
+            "next_cursor": str(rows[limit - 1][0]) if len(rows) > limit else None,
+        }
+
+    async def search(self, query: str, namespace: Namespace = DEFAULT_NAMESPACE) -> Dict[str, Any]:
+        """Rank the namespace's memories by cosine similarity to the query, in process."""
+        await self._catch_up()
+        results = [
+            preference
+            for key, vectors in self._partitions.items()
+            if namespace.covers(Namespace.from_key(key))
+            for preference in vectors.search(query, self.search_limit)
+        ]
+        results.sort(key=lambda p: p["score"], reverse=True)
+        return {"success": True, "preferences": results[: self.search_limit]}
@@ -0,0 +1,374 @@
+"""
+In-process search over coding preferences.
+Mirrors every preference from Mem0 into a local keyword index (BM25 with
+language and tag facets) and, with SEARCH_ENGINE=local, an embedding index.
+The mirror is synced in the background and updated by add_coding_preference,
+so keyword, filtered and local semantic searches need no network call. It is
+persisted in a snapshot and reloaded from it on startup. The default
+namespace is mirrored from startup; other namespaces get a mirror of their
+own on first use, up to LOCAL_INDEX_MAX_NAMESPACES.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from .keyword_index import KeywordIndex
+from .namespaces import DEFAULT_NAMESPACE, Namespace
+from .snapshot import Snapshot
+
+logger = logging.getLogger(__name__)
+
+# Reciprocal-rank fusion constant; 60 is the value from the original RRF paper
+RRF_K = 60
+# Candidates taken from each ranking before fusing
+FUSION_DEPTH = 50
+# Preferences indexed per step when loading the snapshot, between event loop yields
+SNAPSHOT_BATCH = 200
+# Seconds between sync attempts until the first one succeeds, if shorter than the interval
+NOT_READY_RETRY = 10.0
+
+
+def fuse(rankings: List[List[Dict[str, Any]]], limit: int) -> List[Dict[str, Any]]:
+    """Merge ranked result lists by reciprocal-rank fusion, keyed on Mem0 id."""
+    scores: Dict[Any, float] = {}
+    preferences: Dict[Any, Dict[str, Any]] = {}
+    for ranking in rankings:
+        for rank, preference in enumerate(ranking):
+            key = preference.get("id")
+            scores[key] = scores.get(key, 0.0) + 1.0 / (RRF_K + rank + 1)
+            preferences.setdefault(key, preference)
+    best = sorted(scores, key=scores.__getitem__, reverse=True)[:limit]
+    return [{**preferences[key], "score": scores[key]} for key in best]
+
+
+class LocalSearchEngine:
+    """Keyword and optional semantic indexes of a namespace's preferences, synced from Mem0."""
+
+    def __init__(
+        self,
+        semantic: bool = False,
+        model_name: Optional[str] = None,
+        limit: int = 10,
+        sync_interval: float = 300.0,
+        snapshot: Optional[Snapshot] = None,
+        namespace: Namespace = DEFAULT_NAMESPACE,
+    ):
+        self.namespace = namespace
+        self.semantic = semantic
+        self.model_name = model_name
+        self.limit = limit
+        self.sync_interval = sync_interval
+        self.snapshot = snapshot
+        self.keywords = KeywordIndex()
+        # VectorIndex, set once the embedding model is loaded and the snapshot embedded
+        self.vectors = None
+        self.ready = False
+        # Time the last complete sync from Mem0 started, in this process
+        self.last_sync: Optional[float] = None
+        # Preferences added while a sync runs, which its listing may have missed
+        self._added_during_sync: Set[str] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls, namespace: Namespace = DEFAULT_NAMESPACE) -> Optional["LocalSearchEngine"]:
+        """
+        Build the engine of a namespace from environment variables. The keyword
+        index is on with KEYWORD_INDEX=true; SEARCH_ENGINE=local adds the
+        embedding index.
+        """
+        semantic = os.getenv("SEARCH_ENGINE", "remote").lower() == "local"
+        keywords = os.getenv("KEYWORD_INDEX", "false").lower() in ("true", "1", "yes")
+        if not semantic and not keywords:
+            return None
+        return cls(
+            semantic=semantic,
+            model_name=os.getenv("LOCAL_EMBEDDING_MODEL") or None,
+            limit=int(os.getenv("LOCAL_SEARCH_LIMIT", 10)),
+            sync_interval=float(os.getenv("LOCAL_INDEX_SYNC_INTERVAL", 300)),
+            snapshot=Snapshot.from_env(namespace),
+            namespace=namespace,
+        )
+
+    @property
+    def warming(self) -> bool:
+        """Serving from the snapshot while the first refresh from Mem0 runs."""
+        return self.ready and self.last_sync is None
+
+    def start(self, client) -> None:
+        """Start the background task that loads the model and syncs the indexes from Mem0."""
+        self._task = asyncio.create_task(self._run(client))
+
+    async def stop(self, remove_snapshot: bool = False) -> None:
+        """Stop the background sync task and close the snapshot, or delete it."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self.snapshot is not None:
+            if remove_snapshot:
+                self.snapshot.remove()
+            else:
+                self.snapshot.close()
+
+    async def _run(self, client) -> None:
+        if self.snapshot is not None:
+            await self._load_snapshot()
+        if self.semantic:
+            await self._load_vectors()
+        while True:
+            try:
+                await self.sync(client)
+            except Exception:
+                logger.exception("Error syncing local search index")
+            # Until a sync completes (or a non-empty snapshot loaded), the index may
+            # be missing preferences, so searches keep going to Mem0
+            if self.last_sync is not None:
+                self.ready = True
+                await asyncio.sleep(self.sync_interval)
+            else:
+                await asyncio.sleep(min(self.sync_interval, NOT_READY_RETRY))
+
+    async def _load_snapshot(self) -> None:
+        """Fill the keyword index from the snapshot, yielding to the event loop between batches."""
+        started = time.perf_counter()
+        for batch in self.snapshot.iter_batches(SNAPSHOT_BATCH):
+            self.keywords.add_many(batch)
+            await asyncio.sleep(0)
+        if len(self.keywords):
+            # Serve from the snapshot while the refresh from Mem0 runs
+            self.ready = True
+        logger.info(
+            f"Loaded {len(self.keywords)} preferences from the local snapshot "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+
+    async def _load_vectors(self) -> None:
+        # Imported lazily so NumPy is only loaded when semantic search is local
+        from .vector_index import VectorIndex, load_embedder
+
+        # Model loading and bulk embedding are CPU-bound, so they run off the event loop
+        vectors = VectorIndex(await asyncio.to_thread(load_embedder, self.model_name))
+        batch = []
+        for preference in self.keywords.all():
+            batch.append(preference)
+            if len(batch) == SNAPSHOT_BATCH:
+                vectors.add_many(batch, await asyncio.to_thread(vectors.embed, batch))
+                batch = []
+        if batch:
+            vectors.add_many(batch, await asyncio.to_thread(vectors.embed, batch))
+        # Only searched once it holds everything the keyword index does
+        self.vectors = vectors
+
+    async def sync(self, client) -> None:
+        """
+        Mirror every preference from Mem0 into the indexes and the snapshot,
+        page by page. After a complete listing, preferences that are gone from
+        Mem0 are dropped. Mem0 cannot list only what changed, so this is a
+        full listing every time; the snapshot only skips unchanged rows.
+        """
+        started = time.time()
+        seen: Set[str] = set()
+        self._added_during_sync = set()
+        async for page in client.iter_pages(namespace=self.namespace):
+            if not page.get("success"):
+                logger.warning(f"Local index sync stopped: {page.get('error')}")
+                return
+            preferences = page["preferences"]
+            self.keywords.add_many(preferences)
+            if self.snapshot is not None:
+                self.snapshot.upsert_many(preferences)
+            if self.vectors is not None:
+                # Embed off the event loop, but mutate the index on it so searches and
+                # direct adds never see a half-grown matrix
+                vectors = await asyncio.to_thread(self.vectors.embed, preferences)
+                self.vectors.add_many(preferences, vectors)
+            seen.update(p["id"] for p in preferences if p.get("id") is not None)
+
+        gone = self.keywords.ids() - seen - self._added_during_sync
+        self.keywords.remove_many(gone)
+        if self.vectors is not None:
+            self.vectors.remove_many(gone)
+        if self.snapshot is not None:
+            self.snapshot.remove_many(gone)
+            self.snapshot.mark_synced(started)
+        self.last_sync = started
+        logger.info(
+            f"Local search index synced {len(seen)} preferences, "
+            f"dropped {len(gone)} ({len(self.keywords)} total)"
+        )
+
+    def add(self, memory: Dict[str, Any]) -> None:
+        """Index a preference that was just stored in Mem0."""
+        self.keywords.add_many([memory])
+        if self.vectors is not None:
+            self.vectors.add_many([memory])
+        if self.snapshot is not None:
+            self.snapshot.upsert_many([memory])
+        if memory.get("id") is not None:
+            self._added_during_sync.add(memory["id"])
+
+    def remove_many(self, mem_ids: Iterable[str]) -> None:
+        """Drop preferences that were deleted from Mem0."""
+        mem_ids = list(mem_ids)
+        self.keywords.remove_many(mem_ids)
+        if self.vectors is not None:
+            self.vectors.remove_many(mem_ids)
+        if self.snapshot is not None:
+            self.snapshot.remove_many(mem_ids)
+        self._added_during_sync.difference_update(mem_ids)
+
+    def get(self, mem_id: str) -> Optional[Dict[str, Any]]:
+        """A preference from the local mirror, by Mem0 id."""
+        return self.keywords.get(mem_id)
+
+    def all(self) -> List[Dict[str, Any]]:
+        """Every preference in the local mirror, oldest first."""
+        return self.keywords.all()
+
+    def set_tags(self, mem_id: str, tags: List[str]) -> None:
+        """Index the merged tags of a stored preference."""
+        self.keywords.set_tags(mem_id, tags)
+        if self.vectors is not None:
+            self.vectors.set_tags(mem_id, tags)
+        if self.snapshot is not None:
+            preference = self.keywords.get(mem_id)
+            if preference is not None:
+                self.snapshot.upsert_many([preference])
+
+    def info(self) -> Dict[str, Any]:
+        """Readiness, size and freshness of the local mirror."""
+        info: Dict[str, Any] = {
+            "ready": self.ready,
+            "warming": self.warming,
+            "entries": len(self.keywords),
+            "semantic": self.vectors is not None,
+            "last_sync": self.last_sync,
+        }
+        if self.snapshot is not None:
+            info["snapshot"] = self.snapshot.info()
+        return info
+
+    def keyword_search(
+        self, query: str, limit: int, language: Optional[str] = None, tags: Iterable[str] = ()
+    ) -> List[Dict[str, Any]]:
+        """BM25 search restricted to the language and tags."""
+        return self.keywords.search(query, limit, language, tags)
+
+    def semantic_search(
+        self, query: str, limit: int, language: Optional[str] = None, tags: Iterable[str] = ()
+    ) -> List[Dict[str, Any]]:
+        """Cosine search of the embedding index restricted to the language and tags."""
+        return self.vectors.search(query, limit, self.keywords.filter(language, tags))
+
+
+class LocalSearchPartitions:
+    """
+    A LocalSearchEngine for the default namespace and each namespace listed in
+    namespaces. The default namespace's engine runs from startup; the listed
+    ones are created and synced on first use, and the least recently used are
+    stopped beyond max_namespaces, their snapshots deleted. Other namespaces
+    have no mirror: any caller can name one, and each would cost a full sync.
+    """
+
+    def __init__(
+        self,
+        default: LocalSearchEngine,
+        factory: Callable[[Namespace], LocalSearchEngine],
+        max_namespaces: int = 64,
+        namespaces: Iterable[str] = (),
+    ):
+        self.default = default
+        self.factory = factory
+        self.max_namespaces = max_namespaces
+        self.namespaces = frozenset(namespaces)
+        self._engines: "OrderedDict[str, LocalSearchEngine]" = OrderedDict([("", default)])
+        self._client = None
+        # Stops of evicted engines, referenced until they finish
+        self._stopping: Set[asyncio.Task] = set()
+
+    @classmethod
+    def from_env(cls) -> Optional["LocalSearchPartitions"]:
+        """
+        Build the partitions from LOCAL_INDEX_NAMESPACES (comma-separated
+        namespace keys such as "acme/alice/-"), LOCAL_INDEX_MAX_NAMESPACES and
+        LocalSearchEngine.from_env.
+        """
+        default = LocalSearchEngine.from_env()
+        if default is None:
+            return None
+        return cls(
+            default,
+            LocalSearchEngine.from_env,
+            max_namespaces=int(os.getenv("LOCAL_INDEX_MAX_NAMESPACES", 64)),
+            namespaces=[
+                Namespace.from_key(key.strip()).key
+                for key in os.getenv("LOCAL_INDEX_NAMESPACES", "").split(",")
+                if key.strip()
+            ],
+        )
+
+    @property
+    def ready(self) -> bool:
+        return self.default.ready
+
+    def start(self, client) -> None:
+        """Start syncing the default namespace; others start on first use."""
+        self._client = client
+        self.default.start(client)
+
+    async def stop(self) -> None:
+        for engine in self._engines.values():
+            await engine.stop()
+        if self._stopping:
+            await asyncio.gather(*self._stopping, return_exceptions=True)
+
+    def partition(self, namespace: Namespace) -> Optional[LocalSearchEngine]:
+        """
+        The engine of a namespace, created and started if it is not mirrored
+        yet, or None if the namespace is not configured for a mirror.
+        """
+        key = namespace.key
+        engine = self._engines.get(key)
+        if engine is not None:
+            self._engines.move_to_end(key)
+            return engine
+        if key not in self.namespaces:
+            return None
+
+        engine = self._engines[key] = self.factory(namespace)
+        if self._client is not None:
+            engine.start(self._client)
+        while len(self._engines) > max(1, self.max_namespaces):
+            evicted = next(k for k in self._engines if k != "")
+            task = asyncio.create_task(self._engines.pop(evicted).stop(remove_snapshot=True))
+            self._stopping.add(task)
+            task.add_done_callback(self._stopping.discard)
+        return engine
+
+    def add(self, memory: Dict[str, Any]) -> None:
+        """Index a just stored preference in every mirrored namespace that contains it."""
+        namespace = memory.get("namespace", DEFAULT_NAMESPACE)
+        preference = {k: v for k, v in memory.items() if k != "namespace"}
+        for key, engine in self._engines.items():
+            if Namespace.from_key(key).covers(namespace):
+                engine.add(preference)
+
+    def set_tags(self, mem_id: str, tags: List[str]) -> None:
+        """Index the merged tags of a stored preference wherever it is mirrored."""
+        for engine in self._engines.values():
+            engine.set_tags(mem_id, tags)
+
+    def remove_many(self, mem_ids: List[str]) -> None:
+        """Drop deleted preferences wherever they are mirrored."""
+        for engine in self._engines.values():
+            engine.remove_many(mem_ids)
+
+    def info(self) -> Dict[str, Any]:
+        """The default namespace's mirror, and how many namespaces are mirrored."""
+        return {**self.default.info(), "namespaces": len(self._engines)}
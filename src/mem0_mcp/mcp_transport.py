@@ -0,0 +1,160 @@
+"""
+Model Context Protocol transports built on the MCP SDK.
+Exposes the same tools over real JSON-RPC sessions: SSE with a session-bound
+message endpoint, streamable HTTP, and stdio. Tool calls from one client are
+multiplexed over its single long-lived session.
+
+The SDK takes about half a second to import, more than the rest of the server,
+so it is only loaded (in a worker thread) when the first SDK client connects.
+Servers used only through /mcp, /messages/ and /sse never import it.
+"""
+
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from fastapi import FastAPI
+from starlette.routing import Mount, Route
+
+if TYPE_CHECKING:
+    from mcp.server.lowlevel import Server
+
+logger = logging.getLogger(__name__)
+
+CallTool = Callable[[str, Dict[str, Any]], Awaitable[Optional[Dict[str, Any]]]]
+
+
+def _import_sdk() -> None:
+    """Import every SDK module the transports use."""
+    import mcp.server.lowlevel  # noqa: F401
+    import mcp.server.sse  # noqa: F401
+    import mcp.server.streamable_http_manager  # noqa: F401
+    import mcp.types  # noqa: F401
+
+
+def build_mcp_server(tools: List[Any], call_tool: CallTool) -> "Server":
+    """Create an MCP SDK server exposing tools (objects with name, description, input_schema)."""
+    import mcp.types as types
+    from mcp.server.lowlevel import Server
+
+    server = Server("mem0-mcp")
+
+    @server.list_tools()
+    async def list_tools() -> List[types.Tool]:
+        return [
+            types.Tool(name=tool.name, description=tool.description, inputSchema=tool.input_schema)
+            for tool in tools
+        ]
+
+    @server.call_tool()
+    async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[types.TextContent]:
+        result = await call_tool(name, arguments or {})
+        if result is None:
+            raise ValueError(f"Unknown tool: {name}")
+        return [types.TextContent(type="text", text=json.dumps(result))]
+
+    return server
+
+
+class _ASGIEndpoint:
+    """Wraps an ASGI callable so Starlette routes hand it the raw scope."""
+
+    def __init__(self, handler: Callable[[Any, Any, Any], Awaitable[None]]):
+        self.handler = handler
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.handler(scope, receive, send)
+
+
+class MCPTransports:
+    """
+    The MCP SDK transports, mounted next to the existing HTTP endpoints.
+    build_server creates the SDK server; it is called when the SDK is first needed.
+    """
+
+    def __init__(self, build_server: Callable[[], "Server"], prefix: str = "/mcp"):
+        self.build_server = build_server
+        self.prefix = prefix
+        self.server: Optional["Server"] = None
+        self.sse = None
+        self.session_manager = None
+        self._load_lock = asyncio.Lock()
+        self._manager_task: Optional[asyncio.Task] = None
+        self._manager_started = asyncio.Event()
+        self._stopping = asyncio.Event()
+
+    @property
+    def loaded(self) -> bool:
+        return self.server is not None
+
+    def _build(self) -> None:
+        from mcp.server.sse import SseServerTransport
+        from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+
+        server = self.build_server()
+        self.sse = SseServerTransport(f"{self.prefix}/messages/")
+        self.session_manager = StreamableHTTPSessionManager(app=server)
+        self.server = server
+
+    async def load(self) -> None:
+        """Import the SDK off the event loop and build the server, once."""
+        if self.loaded:
+            return
+        async with self._load_lock:
+            if self.loaded:
+                return
+            await asyncio.to_thread(_import_sdk)
+            self._build()
+            logger.info("Loaded the MCP SDK transports")
+
+    async def _run_session_manager(self) -> None:
+        # The manager's task group must be entered and exited in the same task
+        async with self.session_manager.run():
+            self._manager_started.set()
+            await self._stopping.wait()
+
+    async def _handle_sse(self, scope, receive, send) -> None:
+        await self.load()
+        async with self.sse.connect_sse(scope, receive, send) as (read, write):
+            await self.server.run(read, write, self.server.create_initialization_options())
+
+    async def _handle_message(self, scope, receive, send) -> None:
+        await self.load()
+        await self.sse.handle_post_message(scope, receive, send)
+
+    async def _handle_stream(self, scope, receive, send) -> None:
+        await self.load()
+        if self._manager_task is None:
+            self._manager_task = asyncio.create_task(self._run_session_manager())
+        await self._manager_started.wait()
+        await self.session_manager.handle_request(scope, receive, send)
+
+    def mount(self, app: FastAPI) -> None:
+        """Add GET {prefix}/sse, POST {prefix}/messages/ and {prefix}/stream to the app."""
+        app.router.routes.extend(
+            [
+                Route(f"{self.prefix}/sse", endpoint=_ASGIEndpoint(self._handle_sse)),
+                Mount(f"{self.prefix}/messages/", app=self._handle_message),
+                Route(f"{self.prefix}/stream", endpoint=_ASGIEndpoint(self._handle_stream)),
+            ]
+        )
+
+    @asynccontextmanager
+    async def run(self) -> AsyncIterator[None]:
+        """Enter once from the app lifespan; stops the streamable HTTP session manager on exit."""
+        try:
+            yield
+        finally:
+            if self._manager_task is not None:
+                self._stopping.set()
+                await self._manager_task
+
+    async def run_stdio(self) -> None:
+        """Serve a single MCP session over stdin/stdout."""
+        from mcp.server.stdio import stdio_server
+
+        await self.load()
+        async with stdio_server() as (read, write):
+            await self.server.run(read, write, self.server.create_initialization_options())
@@ -0,0 +1,283 @@
+"""
+Prometheus metrics and optional OpenTelemetry spans for the request pipeline.
+prometheus_client and opentelemetry are optional dependencies: without them
+every metric and span is a no-op and /metrics reports that it is disabled.
+With several workers, metrics are aggregated through prometheus_client's
+multiprocess mode (PROMETHEUS_MULTIPROC_DIR).
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+from starlette.responses import Response
+
+# Each optional dependency is only imported when its feature is enabled
+prometheus_client = None
+if os.getenv("METRICS_ENABLED", "false").lower() in ("1", "true", "yes"):
+    try:
+        import prometheus_client
+    except ImportError:  # pragma: no cover - optional dependency
+        pass
+
+trace = None
+if os.getenv("TRACING_ENABLED", "false").lower() in ("1", "true", "yes"):
+    try:
+        from opentelemetry import trace
+    except ImportError:  # pragma: no cover - optional dependency
+        pass
+
+METRICS_ENABLED = prometheus_client is not None
+TRACING_ENABLED = trace is not None
+
+# From sub-millisecond local work up to the upstream deadline
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+# Response body sizes, from a few hundred bytes to whole-store listings
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+class _NoopMetric:
+    """Stands in for every metric when prometheus_client is unavailable."""
+
+    def labels(self, *args, **kwargs) -> "_NoopMetric":
+        return self
+
+    def inc(self, amount: float = 1) -> None:
+        pass
+
+    def dec(self, amount: float = 1) -> None:
+        pass
+
+    def observe(self, amount: float) -> None:
+        pass
+
+    def set_function(self, fn: Callable[[], float]) -> None:
+        pass
+
+
+def _metric(kind: str, name: str, documentation: str, labels=(), **kwargs):
+    if not METRICS_ENABLED:
+        return _NoopMetric()
+    return getattr(prometheus_client, kind)(name, documentation, labels, **kwargs)
+
+
+TOOL_CALLS = _metric(
+    "Counter", "mem0_mcp_tool_calls_total", "Tool calls by tool and outcome", ["tool", "outcome"]
+)
+TOOL_DURATION = _metric(
+    "Histogram",
+    "mem0_mcp_tool_duration_seconds",
+    "Tool call duration",
+    ["tool"],
+    buckets=LATENCY_BUCKETS,
+)
+STAGE_DURATION = _metric(
+    "Histogram",
+    "mem0_mcp_stage_duration_seconds",
+    "Duration of each request pipeline stage",
+    ["endpoint", "stage"],
+    buckets=LATENCY_BUCKETS,
+)
+UPSTREAM_DURATION = _metric(
+    "Histogram",
+    "mem0_mcp_upstream_duration_seconds",
+    "Duration of each Mem0 request attempt",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+UPSTREAM_RESPONSES = _metric(
+    "Counter",
+    "mem0_mcp_upstream_responses_total",
+    "Mem0 request attempts by operation and status code (or error kind)",
+    ["operation", "status"],
+)
+DEDUP_HITS = _metric(
+    "Counter",
+    "mem0_mcp_dedup_hits_total",
+    "Adds answered with an existing memory, by exact or near match",
+    ["kind"],
+)
+RESPONSE_BYTES = _metric(
+    "Histogram",
+    "mem0_mcp_response_bytes",
+    "Tool-call response body size, before and after compression",
+    ["endpoint", "stage"],
+    buckets=SIZE_BUCKETS,
+)
+ADMISSION_QUEUE_DEPTH = _metric(
+    "Gauge",
+    "mem0_mcp_admission_queue_depth",
+    "Tool calls waiting for an admission slot, by priority class",
+    ["priority"],
+    multiprocess_mode="livesum",
+)
+ADMISSION_WAIT = _metric(
+    "Histogram",
+    "mem0_mcp_admission_wait_seconds",
+    "Time queued tool calls waited for an admission slot",
+    ["priority"],
+    buckets=LATENCY_BUCKETS,
+)
+ADMISSION_REJECTED = _metric(
+    "Counter",
+    "mem0_mcp_admission_rejected_total",
+    "Tool calls rejected with 429, by priority class and reason (quota, queue_full, timeout)",
+    ["priority", "reason"],
+)
+IN_FLIGHT = _metric(
+    "Gauge",
+    "mem0_mcp_requests_in_flight",
+    "Requests being handled",
+    ["endpoint"],
+    multiprocess_mode="livesum",
+)
+SSE_CONNECTIONS = _metric("Gauge", "mem0_mcp_sse_connections", "Open legacy /sse streams")
+POOL_CONNECTIONS = _metric(
+    "Gauge",
+    "mem0_mcp_upstream_pool_connections",
+    "Connections of the Mem0 pool in use, and the pool limit",
+    ["state"],
+)
+CIRCUIT_OPEN = _metric(
+    "Gauge", "mem0_mcp_upstream_circuit_open", "1 while the Mem0 circuit breaker is not closed"
+)
+
+
+@contextmanager
+def observe_stage(endpoint: str, stage: str) -> Iterator[None]:
+    """Time one stage of a request (parse, validate, tool, serialize)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_DURATION.labels(endpoint, stage).observe(time.perf_counter() - started)
+
+
+@contextmanager
+def track_in_flight(endpoint: str) -> Iterator[None]:
+    """Count a request as in flight while the block runs."""
+    gauge = IN_FLIGHT.labels(endpoint)
+    gauge.inc()
+    try:
+        yield
+    finally:
+        gauge.dec()
+
+
+@contextmanager
+def trace_span(name: str, **attributes: Any) -> Iterator[Optional[Any]]:
+    """Wrap a block in an OpenTelemetry span when TRACING_ENABLED is set."""
+    if not TRACING_ENABLED:
+        yield None
+        return
+    with trace.get_tracer("mem0-mcp").start_as_current_span(name, attributes=attributes) as span:
+        yield span
+
+
+def instrument_tool(
+    call_tool: Callable[[str, Dict[str, Any]], Awaitable[Optional[Dict[str, Any]]]],
+) -> Callable[[str, Dict[str, Any]], Awaitable[Optional[Dict[str, Any]]]]:
+    """Decorate a call_tool dispatcher with per-tool counters, latency and a span."""
+
+    @wraps(call_tool)
+    async def instrumented(tool_name: str, arguments: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        started = time.perf_counter()
+        with trace_span("tool_call", tool=str(tool_name)):
+            try:
+                result = await call_tool(tool_name, arguments)
+            except Exception:
+                TOOL_CALLS.labels(tool_name, "exception").inc()
+                raise
+
+        # Unknown names are not used as labels so clients cannot grow the series count
+        if result is None:
+            TOOL_CALLS.labels("unknown", "unknown_tool").inc()
+            return None
+        TOOL_CALLS.labels(tool_name, "success" if result.get("success") else "error").inc()
+        TOOL_DURATION.labels(tool_name).observe(time.perf_counter() - started)
+        return result
+
+    return instrumented
+
+
+def instrument_bulk(
+    tool_name: str,
+    bulk_call: Callable[[List[Dict[str, Any]]], Awaitable[List[Dict[str, Any]]]],
+) -> Callable[[List[Dict[str, Any]]], Awaitable[List[Dict[str, Any]]]]:
+    """
+    Decorate a tool's bulk function with the counters and latency of
+    instrument_tool, per call. Every call of the group is observed with the
+    duration of the whole group, since that is how long each one waited.
+    """
+
+    @wraps(bulk_call)
+    async def instrumented(arguments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        started = time.perf_counter()
+        with trace_span("bulk_tool_call", tool=tool_name, calls=len(arguments)):
+            try:
+                results = await bulk_call(arguments)
+            except Exception:
+                TOOL_CALLS.labels(tool_name, "exception").inc(len(arguments))
+                raise
+
+        duration = time.perf_counter() - started
+        for result in results:
+            TOOL_CALLS.labels(tool_name, "success" if result.get("success") else "error").inc()
+            TOOL_DURATION.labels(tool_name).observe(duration)
+        return results
+
+    return instrumented
+
+
+def register_collectors(client, sse_connections) -> None:
+    """
+    Sample the SSE, connection pool and circuit breaker gauges at scrape time.
+    These per-process gauges are not exported in multiprocess mode.
+    """
+    SSE_CONNECTIONS.set_function(lambda: len(sse_connections))
+    POOL_CONNECTIONS.labels("in_use").set_function(lambda: client.pool_usage()["in_use"])
+    POOL_CONNECTIONS.labels("limit").set_function(lambda: client.pool_usage()["limit"])
+    CIRCUIT_OPEN.set_function(
+        lambda: float(client.resilience is not None and client.resilience.breaker.state != "closed")
+    )
+
+
+def metrics_response() -> Response:
+    """The Prometheus text exposition, or 404 when metrics are disabled."""
+    if not METRICS_ENABLED:
+        return Response(
+            "Metrics are disabled; set METRICS_ENABLED=true and install prometheus_client"
+            ' (pip install -e ".[metrics]")\n',
+            status_code=404,
+            media_type="text/plain",
+        )
+    registry = prometheus_client.REGISTRY
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        # Aggregate the samples every worker wrote to the shared directory
+        from prometheus_client import multiprocess
+
+        registry = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return Response(
+        prometheus_client.generate_latest(registry),
+        media_type=prometheus_client.CONTENT_TYPE_LATEST,
+    )
@@ -0,0 +1,133 @@
+"""
+Tenant, user and project namespaces for memories.
+A namespace comes from the X-Tenant-Id, X-User-Id and X-Project-Id headers
+of a request, or from the tenant, user_id and project tool arguments. It is
+passed to the memory backend as Mem0 scoping (org_id, user_id, project_id)
+and partitions the response cache, the local indexes, the duplicate index
+and the write spool. Without any of them a call uses the default namespace,
+which is the whole store as before.
+"""
+
+import hashlib
+import itertools
+from dataclasses import dataclass, fields
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+from starlette.requests import Request
+
+# Names and ids are restricted so they can be used in cache keys and file names
+NAME_PATTERN = r"^[A-Za-z0-9][A-Za-z0-9_.@:-]{0,127}$"
+
+# Columns SQLite stores use for a namespace, in Namespace field order
+NAMESPACE_COLUMNS = ("tenant", "user_id", "project")
+
+# Request header -> tool argument
+HEADERS = {
+    "x-tenant-id": "tenant",
+    "x-user-id": "user_id",
+    "x-project-id": "project",
+}
+
+
+@dataclass(frozen=True)
+class Namespace:
+    """A slice of the store. Unset parts are not scoped: the default namespace is everything."""
+
+    tenant: Optional[str] = None
+    user: Optional[str] = None
+    project: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        """Stable string form, "" for the default namespace."""
+        if self.is_default:
+            return ""
+        return "/".join(part or "-" for part in (self.tenant, self.user, self.project))
+
+    @classmethod
+    def from_key(cls, key: str) -> "Namespace":
+        if not key:
+            return cls()
+        tenant, user, project = (None if part == "-" else part for part in key.split("/"))
+        return cls(tenant, user, project)
+
+    @property
+    def is_default(self) -> bool:
+        return self.tenant is None and self.user is None and self.project is None
+
+    def covers(self, other: "Namespace") -> bool:
+        """Whether every memory of other is also in this namespace."""
+        return all(
+            mine is None or mine == theirs
+            for mine, theirs in (
+                (getattr(self, f.name), getattr(other, f.name)) for f in fields(self)
+            )
+        )
+
+    def covering(self) -> List["Namespace"]:
+        """Every namespace covering this one, itself and the default namespace included."""
+        options = [
+            (part, None) if part is not None else (None,)
+            for part in (self.tenant, self.user, self.project)
+        ]
+        return [Namespace(*parts) for parts in itertools.product(*options)]
+
+    def scope(self) -> Dict[str, str]:
+        """Mem0 scoping parameters of the namespace."""
+        params = {"org_id": self.tenant, "user_id": self.user, "project_id": self.project}
+        return {name: value for name, value in params.items() if value is not None}
+
+    def file_suffix(self) -> str:
+        """Short suffix for per-namespace files, "" for the default namespace."""
+        if self.is_default:
+            return ""
+        return "-" + hashlib.sha256(self.key.encode()).hexdigest()[:16]
+
+
+DEFAULT_NAMESPACE = Namespace()
+
+
+def sql_filter(namespace: Namespace, prefix: str = "WHERE") -> Tuple[str, List[str]]:
+    """SQL condition on NAMESPACE_COLUMNS selecting the rows of a namespace, and its parameters."""
+    parts = (namespace.tenant, namespace.user, namespace.project)
+    conditions = [f"{column} = ?" for column, part in zip(NAMESPACE_COLUMNS, parts) if part]
+    if not conditions:
+        return "", []
+    return f" {prefix} " + " AND ".join(conditions), [part for part in parts if part]
+
+
+class NamespaceArgs(BaseModel):
+    """Arguments shared by the coding preference tools to pick a namespace."""
+
+    tenant: Optional[str] = Field(
+        None, pattern=NAME_PATTERN, description="Tenant (organization) the memories belong to"
+    )
+    user_id: Optional[str] = Field(
+        None, pattern=NAME_PATTERN, description="User the memories belong to"
+    )
+    project: Optional[str] = Field(
+        None, pattern=NAME_PATTERN, description="Project the memories belong to"
+    )
+
+    def namespace(self) -> Namespace:
+        return Namespace(self.tenant, self.user_id, self.project)
+
+
+def request_namespace(request: Request) -> Dict[str, str]:
+    """Namespace arguments set by the request headers."""
+    return {
+        argument: request.headers[header]
+        for header, argument in HEADERS.items()
+        if request.headers.get(header)
+    }
+
+
+def with_namespace(arguments: Any, namespace: Dict[str, str]) -> Any:
+    """
+    Tool arguments with the header namespace applied. Headers win over
+    arguments, so a gateway setting them pins callers to their namespace.
+    """
+    if not namespace or not isinstance(arguments, dict):
+        return arguments
+    return {**arguments, **namespace}
@@ -0,0 +1,574 @@
+"""
+Coding preference tools.
+Argument models and handlers for add_coding_preference,
+get_all_coding_preferences, search_coding_preferences and
+get_coding_preference, backed by the memory backend, the optional write spool,
+the local search indexes, the duplicate index, the change log and the chunk
+index for oversized snippets. Every tool is scoped to the namespace of its
+tenant, user_id and project arguments.
+"""
+
+import asyncio
+import logging
+import os
+import re
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional, Tuple
+
+from pydantic import Field, field_validator
+
+from .backends import MemoryBackend
+from .changelog import ChangeLog
+from .chunking import ADD_BATCH, ChunkIndex, Span, join, parent_of
+from .dedup import DedupIndex, Duplicate, fingerprint
+from .keyword_index import matches, parse_preference
+from .local_search import FUSION_DEPTH, LocalSearchEngine, LocalSearchPartitions, fuse
+from .namespaces import Namespace, NamespaceArgs
+from .projection import ResponseShapeArgs, shape_pages, shape_result
+from .spool import WriteSpool
+from .streaming import ndjson_preferences
+from .tools import ToolRegistry
+
+logger = logging.getLogger(__name__)
+
+
+class AddCodingPreferenceArgs(NamespaceArgs):
+    """Arguments of add_coding_preference."""
+
+    title: str = Field(description="Title of the coding preference")
+    content: str = Field(description="Content of the coding preference (code snippet)")
+    language: str = Field(description="Programming language of the code snippet")
+    description: Optional[str] = Field(None, description="Description of the coding preference")
+    tags: List[str] = Field(
+        default_factory=list, description="List of tags for categorizing the preference"
+    )
+
+
+class GetAllCodingPreferencesArgs(ResponseShapeArgs, NamespaceArgs):
+    """Arguments of get_all_coding_preferences."""
+
+    cursor: Optional[str] = Field(
+        None, description="Cursor returned as next_cursor by the previous page"
+    )
+    limit: Optional[int] = Field(
+        None, ge=1, description="Maximum number of preferences per page, at most MEM0_MAX_PAGE_SIZE"
+    )
+    stream: bool = Field(
+        False, description="Stream every preference as NDJSON instead of one response"
+    )
+    since: Optional[str] = Field(
+        None,
+        description="sync_token of an earlier call: only return preferences added or changed"
+        " after it, limit at a time, with has_more",
+    )
+
+    @field_validator("limit")
+    @classmethod
+    def _within_page_cap(cls, limit: Optional[int]) -> Optional[int]:
+        # Read per call, since the server may load MEM0_MAX_PAGE_SIZE after importing this
+        cap = int(os.getenv("MEM0_MAX_PAGE_SIZE", 1000))
+        if limit is not None and limit > cap:
+            raise ValueError(f"must be at most {cap} (MEM0_MAX_PAGE_SIZE)")
+        return limit
+
+
+class SearchCodingPreferencesArgs(ResponseShapeArgs, NamespaceArgs):
+    """Arguments of search_coding_preferences."""
+
+    query: str = Field("", description="Search query for coding preferences")
+    language: Optional[str] = Field(
+        None, description="Only return preferences in this programming language"
+    )
+    tags: List[str] = Field(
+        default_factory=list, description="Only return preferences carrying all of these tags"
+    )
+    limit: Optional[int] = Field(None, ge=1, description="Maximum number of results")
+    mode: Optional[Literal["keyword", "semantic", "hybrid"]] = Field(
+        None,
+        description="keyword (BM25), semantic, or hybrid (reciprocal-rank fusion of both)."
+        " Defaults to keyword when filtering or without a query, otherwise semantic",
+    )
+
+
+class GetCodingPreferenceArgs(NamespaceArgs):
+    """Arguments of get_coding_preference."""
+
+    id: str = Field(description="ID of the coding preference, as returned by the other tools")
+
+
+def format_preference(preference: AddCodingPreferenceArgs) -> str:
+    """Render a coding preference as the markdown stored in Mem0."""
+    return (
+        f"# {preference.title}\n\n"
+        f"```{preference.language}\n{preference.content}\n```\n\n"
+        f"{preference.description or ''}"
+    )
+
+
+# A chunked snippet's parent: format_preference with an empty code block
+_PARENT_RE = re.compile(r"\A(# [^\n]*\n\n```[^\n]*\n)(\n```\n\n.*)\Z", re.DOTALL)
+
+
+class CodingPreferences:
+    """Handlers of the coding preference tools."""
+
+    def __init__(
+        self,
+        mem0: MemoryBackend,
+        write_spool: Optional[WriteSpool] = None,
+        local_search: Optional[LocalSearchPartitions] = None,
+        dedup: Optional[DedupIndex] = None,
+        changes: Optional[ChangeLog] = None,
+        chunks: Optional[ChunkIndex] = None,
+    ):
+        self.mem0 = mem0
+        self.write_spool = write_spool
+        self.local_search = local_search
+        self.dedup = dedup
+        self.changes = changes
+        self.chunks = chunks
+
+    def _local(self, namespace: Namespace) -> Optional[LocalSearchEngine]:
+        """The local mirror of a namespace, if local search is on."""
+        if self.local_search is None:
+            return None
+        return self.local_search.partition(namespace)
+
+    async def add(self, args: AddCodingPreferenceArgs) -> Dict[str, Any]:
+        """
+        Add a new coding preference to Mem0, or queue it in async write mode.
+        Oversized snippets are stored, or queued, in chunks.
+        """
+        namespace = args.namespace()
+        if self.dedup is not None:
+            duplicate = self.dedup.find(args.language, args.content, namespace)
+            if duplicate is not None:
+                result = await self._merge(args, duplicate, namespace)
+                if result is not None:
+                    return result
+
+        if self.chunks is not None and self.chunks.needs_split(args.content):
+            result = await self._add_chunked(args, namespace)
+        elif self.write_spool is not None:
+            result = await self.write_spool.append(format_preference(args), args.tags, namespace)
+        else:
+            result = await self.mem0.add(format_preference(args), args.tags, namespace)
+        self._record(args, result, namespace)
+        return result
+
+    async def add_many(self, preferences: List[AddCodingPreferenceArgs]) -> List[Dict[str, Any]]:
+        """
+        Add several coding preferences, grouped into bulk Mem0 requests where
+        possible: one per namespace in the batch.
+        """
+        groups: Dict[Namespace, List[int]] = {}
+        for index, args in enumerate(preferences):
+            groups.setdefault(args.namespace(), []).append(index)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(preferences)
+        for namespace, indices in groups.items():
+            stored = await self._add_many([preferences[i] for i in indices], namespace)
+            for index, result in zip(indices, stored):
+                results[index] = result
+        return results
+
+    async def _add_many(
+        self, preferences: List[AddCodingPreferenceArgs], namespace: Namespace
+    ) -> List[Dict[str, Any]]:
+        results: List[Optional[Dict[str, Any]]] = [None] * len(preferences)
+        to_store: List[int] = []
+        # Repeats within the batch are stored once, with the tags of every copy
+        first: Dict[str, int] = {}
+        repeats: List[Tuple[int, int]] = []
+        tags = [list(args.tags) for args in preferences]
+
+        for index, args in enumerate(preferences):
+            if self.dedup is not None:
+                key = fingerprint(args.language, args.content, namespace)
+                if key in first:
+                    original = first[key]
+                    tags[original] += [tag for tag in args.tags if tag not in tags[original]]
+                    repeats.append((index, original))
+                    continue
+                duplicate = self.dedup.find(args.language, args.content, namespace)
+                if duplicate is not None:
+                    results[index] = await self._merge(args, duplicate, namespace)
+                    if results[index] is not None:
+                        continue
+                first[key] = index
+            if self.chunks is not None and self.chunks.needs_split(args.content):
+                results[index] = await self._add_chunked(args, namespace)
+                self._record(args, results[index], namespace)
+                continue
+            to_store.append(index)
+
+        items = [(format_preference(preferences[i]), tags[i]) for i in to_store]
+        if self.write_spool is not None and items:
+            stored = await self.write_spool.append_many(items, namespace)
+        elif items:
+            stored = await self.mem0.add_many(items, namespace)
+        else:
+            stored = []
+        for index, result in zip(to_store, stored):
+            results[index] = result
+            self._record(
+                preferences[index].model_copy(update={"tags": tags[index]}), result, namespace
+            )
+
+        for index, original in repeats:
+            result = results[original]
+            results[index] = {**result, "duplicate": "exact"} if result.get("success") else result
+        return results
+
+    async def _add_chunked(
+        self, args: AddCodingPreferenceArgs, namespace: Namespace
+    ) -> Dict[str, Any]:
+        """
+        Store an oversized snippet as a parent without code and one memory per
+        chunk, linked by tags, or queue them together in async write mode.
+        Returns the parent ID. If a chunk cannot be stored, whatever was
+        stored is deleted again.
+        """
+        spans = self.chunks.split(args.content)
+        count = len(spans)
+        parent = (
+            format_preference(args.model_copy(update={"content": ""})),
+            args.tags + [f"parts:{count}"],
+        )
+        items = [
+            (
+                format_preference(
+                    args.model_copy(
+                        update={
+                            "title": f"{args.title} (part {part}/{count})",
+                            "content": args.content[start:end],
+                            "description": None,
+                        }
+                    )
+                ),
+                args.tags + [f"part:{part}"],
+            )
+            for part, (start, end) in enumerate(spans, 1)
+        ]
+
+        if self.write_spool is not None:
+            # The spool adds the parent tag once the parent has a Mem0 ID
+            queued = await self.write_spool.append_chunked(
+                parent,
+                items,
+                namespace,
+                before_insert=lambda parent_id, chunk_ids: self.chunks.record(
+                    parent_id, chunk_ids, spans
+                ),
+            )
+            return {**queued[0], "parts": count}
+
+        result = await self.mem0.add(*parent, namespace)
+        if not result.get("success"):
+            return result
+        parent_id = result["id"]
+        items = [(content, tags + [f"parent:{parent_id}"]) for content, tags in items]
+        stored: List[Dict[str, Any]] = []
+        for offset in range(0, count, ADD_BATCH):
+            stored += await self.mem0.add_many(items[offset : offset + ADD_BATCH], namespace)
+        failed = [result for result in stored if not result.get("success")]
+        if failed:
+            written = [parent_id] + [result["id"] for result in stored if result.get("success")]
+            left = await self._discard(written, namespace)
+            if left:
+                logger.error(f"Chunked add of {parent_id} failed, could not delete {left}")
+            return {
+                "success": False,
+                "error": f"Stored {count - len(failed)} of {count} parts, so none were kept:"
+                f" {failed[0].get('error')}",
+            }
+        self.chunks.record(parent_id, [result["id"] for result in stored], spans)
+        return {"success": True, "id": parent_id, "parts": count}
+
+    async def _discard(self, mem_ids: List[str], namespace: Namespace) -> List[str]:
+        """Delete memories of a failed add. Returns the IDs that could not be deleted."""
+        results = await asyncio.gather(*(self.mem0.delete(i, namespace) for i in mem_ids))
+        deleted = [
+            mem_id
+            for mem_id, result in zip(mem_ids, results)
+            if result.get("success") or result.get("status") == 404
+        ]
+        if self.local_search is not None:
+            self.local_search.remove_many(deleted)
+        if self.changes is not None:
+            self.changes.forget(deleted)
+        return [mem_id for mem_id in mem_ids if mem_id not in deleted]
+
+    async def _merge(
+        self, args: AddCodingPreferenceArgs, duplicate: Duplicate, namespace: Namespace
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Answer a duplicate add with the stored memory, merging in any new tags.
+        Returns None when the preference has to be stored after all: the
+        memory is gone, or it is still queued and there are tags to merge.
+        """
+        mem_id = duplicate.mem_id
+        merged = duplicate.tags + [tag for tag in args.tags if tag not in duplicate.tags]
+        result: Dict[str, Any] = {"success": True, "id": mem_id, "duplicate": duplicate.kind}
+
+        if duplicate.queued:
+            status = await self.write_spool.status(mem_id) if self.write_spool is not None else None
+            if status is not None and status["status"] == "done":
+                # Delivered since it was indexed: continue with its Mem0 ID
+                self.dedup.resolve(mem_id, status["mem_id"])
+                mem_id = status["mem_id"]
+                result["id"] = mem_id
+            elif status is not None and status["status"] == "pending" and merged == duplicate.tags:
+                return {**result, "queued": True}
+            else:
+                return None
+
+        if merged != duplicate.tags:
+            updated = await self.mem0.update_tags(mem_id, merged, namespace)
+            if updated.get("status") == 404:
+                self.dedup.forget(mem_id)
+                return None
+            if not updated.get("success"):
+                return updated
+            self.dedup.set_tags(mem_id, merged)
+            if self.local_search is not None:
+                self.local_search.set_tags(mem_id, merged)
+            if self.changes is not None:
+                await self._log_tags(mem_id, merged, namespace)
+
+        if duplicate.kind == "near":
+            # Later copies of this variant are then exact matches
+            self.dedup.record(args.language, args.content, mem_id, merged, namespace=namespace)
+            result["distance"] = duplicate.distance
+        return result
+
+    def _record(
+        self, args: AddCodingPreferenceArgs, result: Dict[str, Any], namespace: Namespace
+    ) -> None:
+        if self.dedup is not None and result.get("success") and result.get("id"):
+            self.dedup.record(
+                args.language,
+                args.content,
+                result["id"],
+                args.tags,
+                queued=bool(result.get("queued")),
+                namespace=namespace,
+            )
+
+    async def _log_tags(self, mem_id: str, tags: List[str], namespace: Namespace) -> None:
+        if self.changes.set_tags(mem_id, tags):
+            return
+        # Stored before the change log existed: log it whole
+        result = await self.mem0.get(mem_id, namespace)
+        if result.get("success"):
+            self.changes.record({**result["preference"], "tags": tags, "namespace": namespace})
+
+    async def get_all(self, args: GetAllCodingPreferencesArgs) -> Dict[str, Any]:
+        """
+        Get all coding preferences from Mem0, or one page of them if paginated,
+        or only those changed since a sync token.
+        """
+        namespace = args.namespace()
+        if args.since is not None:
+            return shape_result(await self._changes_since(args, namespace), args)
+        paged = args.cursor is not None or args.limit is not None
+        if not paged:
+            local = self._local(namespace)
+            if local is not None and local.warming:
+                # Just started: answer from the snapshot while it is refreshed from Mem0.
+                # The snapshot may predate the change log, so there is no sync token
+                return shape_result({"success": True, "preferences": local.all()}, args)
+
+        # Taken before listing, so changes made during the listing are sent again next time
+        token = self.changes.token() if self.changes is not None and args.cursor is None else None
+        if paged:
+            result = await self.mem0.get_page(args.cursor, args.limit, namespace)
+        else:
+            result = await self.mem0.get_all(namespace)
+        # A stale cached listing may miss changes the token already covers
+        if token is not None and result.get("success") and not result.get("stale"):
+            result = {**result, "sync_token": token}
+        return shape_result(result, args)
+
+    async def _changes_since(
+        self, args: GetAllCodingPreferencesArgs, namespace: Namespace
+    ) -> Dict[str, Any]:
+        if self.changes is None:
+            return {
+                "success": False,
+                "error": "since needs the change log (CHANGE_LOG=true)",
+                "status": 400,
+            }
+        result = self.changes.since(args.since, namespace, args.limit)
+        if result is not None:
+            return result
+        # A token from another log: the client has to replace its copy with a full listing
+        token = self.changes.token()
+        result = await self.mem0.get_all(namespace)
+        if not result.get("success") or result.get("stale"):
+            return result
+        return {**result, "sync_token": token, "has_more": False, "reset": True}
+
+    def stream(self, args: GetAllCodingPreferencesArgs) -> Optional[AsyncIterator[bytes]]:
+        """Stream every coding preference as NDJSON, one Mem0 page at a time, if asked to."""
+        if not args.stream or args.since is not None:
+            return None
+        pages = self.mem0.iter_pages(args.limit, args.namespace())
+        return ndjson_preferences(shape_pages(pages, args) if args.shaped() else pages)
+
+    async def get(self, args: GetCodingPreferenceArgs) -> Dict[str, Any]:
+        """
+        Get one coding preference by ID, from the local mirror if it has it,
+        else Mem0. A snippet stored in chunks is put back together.
+        """
+        namespace = args.namespace()
+        result = await self._get(args.id, namespace)
+        parts = self.chunks.parts(args.id) if self.chunks is not None else []
+        if not parts or not result.get("success"):
+            return result
+        return await self._reassemble(result, parts, namespace)
+
+    async def _get(self, mem_id: str, namespace: Namespace) -> Dict[str, Any]:
+        local = self._local(namespace)
+        if local is not None and local.ready:
+            preference = local.get(mem_id)
+            if preference is not None:
+                return {"success": True, "preference": preference}
+        return await self.mem0.get(mem_id, namespace)
+
+    async def _reassemble(
+        self, result: Dict[str, Any], parts: List[Tuple[str, Span]], namespace: Namespace
+    ) -> Dict[str, Any]:
+        preference = result["preference"]
+        chunk_ids = [mem_id for mem_id, _ in parts]
+        frame = _PARENT_RE.match(preference.get("content", ""))
+        chunks = await asyncio.gather(*(self._get(mem_id, namespace) for mem_id in chunk_ids))
+        pieces = [
+            (
+                parse_preference(chunk["preference"]["content"])["code"]
+                if chunk.get("success")
+                else None
+            )
+            for chunk in chunks
+        ]
+        spans = [span for _, span in parts]
+        if frame is None or any(
+            piece is None or len(piece) != end - start for piece, (start, end) in zip(pieces, spans)
+        ):
+            # A chunk is missing or was changed elsewhere: point at the chunks instead
+            return {**result, "preference": {**preference, "parts": chunk_ids}}
+        content = frame.group(1) + join(pieces, spans) + frame.group(2)
+        return {**result, "preference": {**preference, "content": content, "parts": chunk_ids}}
+
+    async def search(self, args: SearchCodingPreferencesArgs) -> Dict[str, Any]:
+        """
+        Search for coding preferences. Keyword and filtered searches are
+        answered from the local index once it is ready; semantic searches use
+        the local embedding index if enabled, else Mem0.
+        """
+        result = await self._search(args)
+        if result.get("success"):
+            result = await self._with_parents(result, args.namespace())
+        return shape_result(result, args)
+
+    async def _with_parents(self, result: Dict[str, Any], namespace: Namespace) -> Dict[str, Any]:
+        """Keep the best-ranked chunk of each split snippet, with its parent attached."""
+        preferences = []
+        parent_ids = set()
+        for preference in result["preferences"]:
+            parent_id = parent_of(preference)
+            if parent_id is not None:
+                if parent_id in parent_ids:
+                    continue
+                parent_ids.add(parent_id)
+            preferences.append(preference)
+        if not parent_ids:
+            return result
+
+        wanted = list(parent_ids)
+        found = await asyncio.gather(*(self._get(mem_id, namespace) for mem_id in wanted))
+        parents = {
+            mem_id: parent["preference"]
+            for mem_id, parent in zip(wanted, found)
+            if parent.get("success")
+        }
+        preferences = [
+            (
+                {**preference, "parent": parents[parent_of(preference)]}
+                if parent_of(preference) in parents
+                else preference
+            )
+            for preference in preferences
+        ]
+        return {**result, "preferences": preferences}
+
+    async def _search(self, args: SearchCodingPreferencesArgs) -> Dict[str, Any]:
+        mode = args.mode
+        if mode is None:
+            filtered = bool(args.language or args.tags)
+            mode = "keyword" if filtered or not args.query.strip() else "semantic"
+
+        local = self._local(args.namespace())
+        if local is None or not local.ready:
+            return await self._search_remote(args)
+        limit = args.limit or local.limit
+        if mode == "keyword":
+            preferences = local.keyword_search(args.query, limit, args.language, args.tags)
+            return {"success": True, "preferences": preferences}
+        if mode == "semantic":
+            if local.vectors is None:
+                return await self._search_remote(args)
+            preferences = local.semantic_search(args.query, limit, args.language, args.tags)
+            return {"success": True, "preferences": preferences}
+
+        depth = max(limit, FUSION_DEPTH)
+        rankings = [local.keyword_search(args.query, depth, args.language, args.tags)]
+        if local.vectors is not None:
+            rankings.append(local.semantic_search(args.query, depth, args.language, args.tags))
+        else:
+            remote = await self._search_remote(args)
+            # Mem0 failing leaves the keyword ranking on its own
+            if remote.get("success"):
+                rankings.append(remote["preferences"])
+        return {"success": True, "preferences": fuse(rankings, limit)}
+
+    async def _search_remote(self, args: SearchCodingPreferencesArgs) -> Dict[str, Any]:
+        """Search in Mem0 (or list everything, without a query) and filter the results here."""
+        namespace = args.namespace()
+        if args.query.strip():
+            result = await self.mem0.search(args.query, namespace)
+        else:
+            result = await self.mem0.get_all(namespace)
+        if not result.get("success") or not (args.language or args.tags or args.limit):
+            return result
+        preferences = [p for p in result["preferences"] if matches(p, args.language, args.tags)]
+        return {**result, "preferences": preferences[: args.limit]}
+
+    def register(self, registry: ToolRegistry) -> None:
+        """Register the coding preference tools."""
+        registry.register(
+            "add_coding_preference",
+            "Add a new coding preference with code example and context",
+            AddCodingPreferenceArgs,
+            self.add,
+            bulk_handler=self.add_many,
+        )
+        registry.register(
+            "get_all_coding_preferences",
+            "Get all coding preferences",
+            GetAllCodingPreferencesArgs,
+            self.get_all,
+            stream_handler=self.stream,
+        )
+        registry.register(
+            "search_coding_preferences",
+            "Search for coding preferences by query, language and tags",
+            SearchCodingPreferencesArgs,
+            self.search,
+            latency_sensitive=True,
+        )
+        registry.register(
+            "get_coding_preference",
+            "Get the full body of one coding preference by ID",
+            GetCodingPreferenceArgs,
+            self.get,
+            latency_sensitive=True,
+        )
@@ -0,0 +1,108 @@
+"""
+Response size controls for the read tools.
+Preferences can be cut down to the fields a caller asks for, with the stored
+markdown split into title, language, code and description, and long snippets
+truncated. The compact shape keeps only IDs, titles and scores; the full body
+is then one get_coding_preference call away.
+"""
+
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional, Sequence
+
+from pydantic import BaseModel, Field
+
+from .keyword_index import parse_preference
+
+PreferenceField = Literal[
+    "id", "title", "language", "code", "description", "content", "tags", "score", "parent"
+]
+
+# "parent" is only set on chunks of a split snippet returned by search
+COMPACT_FIELDS = ("id", "title", "score", "parent")
+
+# Appended to truncated text
+ELLIPSIS = "…"
+
+_PARSED_FIELDS = {"title", "language", "code", "description"}
+_TRUNCATED_FIELDS = ("content", "code")
+
+
+class ResponseShapeArgs(BaseModel):
+    """Arguments shared by the read tools to shrink their results."""
+
+    fields: Optional[List[PreferenceField]] = Field(
+        None,
+        description="Only return these fields of each preference. title, language, code and"
+        " description are taken from the stored markdown content",
+    )
+    compact: bool = Field(
+        False,
+        description="Only return the id, title and score of each preference;"
+        " get_coding_preference returns the full body",
+    )
+    max_content_chars: Optional[int] = Field(
+        None, ge=1, description="Truncate content and code to this many characters"
+    )
+
+    def shaped(self) -> bool:
+        return bool(self.fields or self.compact or self.max_content_chars)
+
+    def selected_fields(self) -> Optional[Sequence[str]]:
+        return COMPACT_FIELDS if self.compact else self.fields
+
+
+def project(
+    preference: Dict[str, Any],
+    fields: Optional[Sequence[str]] = None,
+    max_content_chars: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    A preference with only the given fields (all stored fields if None), and
+    content and code cut to max_content_chars. Cut values set "truncated".
+    """
+    if fields is None:
+        shaped = dict(preference)
+    else:
+        parsed = (
+            parse_preference(preference.get("content", ""))
+            if _PARSED_FIELDS.intersection(fields)
+            else {}
+        )
+        shaped = {}
+        for name in fields:
+            if name in parsed:
+                shaped[name] = parsed[name]
+            elif name in preference:
+                shaped[name] = preference[name]
+
+    parent = shaped.get("parent")
+    if isinstance(parent, dict):
+        shaped["parent"] = project(
+            parent, fields and [name for name in fields if name != "score"], max_content_chars
+        )
+
+    if max_content_chars is not None:
+        for name in _TRUNCATED_FIELDS:
+            value = shaped.get(name)
+            if isinstance(value, str) and len(value) > max_content_chars:
+                shaped[name] = value[:max_content_chars] + ELLIPSIS
+                shaped["truncated"] = True
+    return shaped
+
+
+def shape_result(result: Dict[str, Any], args: ResponseShapeArgs) -> Dict[str, Any]:
+    """Apply the requested shape to every preference of a read tool result."""
+    if not args.shaped() or not result.get("success") or "preferences" not in result:
+        return result
+    fields = args.selected_fields()
+    return {
+        **result,
+        "preferences": [project(p, fields, args.max_content_chars) for p in result["preferences"]],
+    }
+
+
+async def shape_pages(
+    pages: AsyncIterator[Dict[str, Any]], args: ResponseShapeArgs
+) -> AsyncIterator[Dict[str, Any]]:
+    """Apply the requested shape to each page of a paged read, e.g. before streaming it."""
+    async for page in pages:
+        yield shape_result(page, args)
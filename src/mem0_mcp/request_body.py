@@ -0,0 +1,68 @@
+"""
+Bounded reading and parsing of tool-call request bodies.
+/mcp and /messages/ read their body through read_json. A Content-Length
+above MAX_BODY_BYTES is refused before anything is read, and a body without
+one is refused as soon as the bytes received pass the limit, so an oversized
+upload is never buffered whole. Bodies of BODY_PARSE_THREAD_BYTES or more are
+parsed in a worker thread, so a pasted file does not stall the event loop.
+"""
+
+import asyncio
+import os
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from starlette.requests import Request
+
+from .serialization import FastJSONResponse
+
+
+@dataclass
+class BodySettings:
+    """Size limits for tool-call request bodies."""
+
+    max_bytes: int = 8 * 1024 * 1024
+    thread_min_bytes: int = 256 * 1024
+
+    @classmethod
+    def from_env(cls) -> "BodySettings":
+        """Build settings from MAX_BODY_BYTES and BODY_PARSE_THREAD_BYTES."""
+        return cls(
+            max_bytes=int(os.getenv("MAX_BODY_BYTES", cls.max_bytes)),
+            thread_min_bytes=int(os.getenv("BODY_PARSE_THREAD_BYTES", cls.thread_min_bytes)),
+        )
+
+
+class BodyTooLarge(Exception):
+    """A request body passed MAX_BODY_BYTES."""
+
+    def __init__(self, limit: int):
+        super().__init__(f"Request body too large (limit {limit} bytes)")
+        self.limit = limit
+
+    def response(self) -> FastJSONResponse:
+        """The 413 response naming the limit."""
+        return FastJSONResponse({"error": str(self)}, status_code=413)
+
+
+async def read_body(request: Request, max_bytes: int) -> bytes:
+    """The request body, raising BodyTooLarge as soon as it is known to pass max_bytes."""
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > max_bytes:
+        raise BodyTooLarge(max_bytes)
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > max_bytes:
+            raise BodyTooLarge(max_bytes)
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+async def read_json(request: Request, settings: BodySettings, parse: Callable[[bytes], Any]) -> Any:
+    """Read a bounded body and parse it, in a worker thread if it is large."""
+    body = await read_body(request, settings.max_bytes)
+    if len(body) >= settings.thread_min_bytes:
+        return await asyncio.to_thread(parse, body)
+    return parse(body)
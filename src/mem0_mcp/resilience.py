@@ -0,0 +1,278 @@
+"""
+Resilience layer shared by every Mem0 upstream call.
+Each call gets an overall deadline and is retried on 429/5xx and connection
+errors with jittered exponential backoff that honors Retry-After. A token
+bucket caps the request rate (shared by all workers when SHARED_STATE=sqlite),
+and a circuit breaker fails calls fast while Mem0 keeps failing, probing again
+after a cool-down.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import asdict, dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+import aiohttp
+
+from .shared import SharedDatabase
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+# Statuses where Mem0 did not process the request, so even a POST is safe to retry
+UNPROCESSED_STATUSES = {429, 503}
+
+
+class UpstreamError(Exception):
+    """Non-200 response from Mem0. The message is the response body."""
+
+    def __init__(self, status: int, body: str, retry_after: Optional[float] = None):
+        super().__init__(body)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling Mem0 while the circuit breaker is open."""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Client-side rate limiter allowing `rate` calls per second with bursts up to `burst`."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        """Take a token, sleeping until one is available."""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        # Tokens may go negative: each waiter reserves its token and sleeps off the debt
+        self._tokens -= 1
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self.rate)
+
+
+class SharedTokenBucket:
+    """
+    Token bucket kept in SQLite so every worker process draws from the same
+    budget. The transaction runs on a worker thread, off the event loop.
+    """
+
+    def __init__(self, rate: float, burst: int, path: str, name: str = "mem0"):
+        self.rate = rate
+        self.burst = burst
+        self.name = name
+        self._shared = SharedDatabase(path)
+        self._db = self._shared.db
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS token_bucket "
+            "(name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+
+    async def acquire(self) -> None:
+        """Take a token, sleeping until one is available."""
+        tokens = await self._shared.run(self._take)
+        if tokens < 0:
+            await asyncio.sleep(-tokens / self.rate)
+
+    def _take(self) -> float:
+        """Take a token and return what is left, negative if it has to be waited for."""
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._db.execute(
+                "SELECT tokens, updated FROM token_bucket WHERE name = ?", (self.name,)
+            ).fetchone()
+            now = time.time()
+            tokens = (
+                self.burst if row is None else min(self.burst, row[0] + (now - row[1]) * self.rate)
+            )
+            tokens -= 1
+            self._db.execute(
+                "INSERT OR REPLACE INTO token_bucket (name, tokens, updated) VALUES (?, ?, ?)",
+                (self.name, tokens, now),
+            )
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        return tokens
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures and lets one probe through after a cool-down."""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+
+    def allow(self) -> bool:
+        """Whether a call may go to Mem0 now."""
+        if self.state == self.CLOSED:
+            return True
+
+        now = time.monotonic()
+        if self.state == self.OPEN:
+            if now - self._opened_at < self.reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+            self._probe_started = None
+
+        # Half open: one probe at a time, replaced if it never reported back
+        if self._probe_started is None or now - self._probe_started > self.reset_timeout:
+            self._probe_started = now
+            return True
+        return False
+
+    def record_success(self) -> None:
+        if self.state != self.CLOSED:
+            logger.info("Mem0 circuit breaker closed")
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probe_started = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or (
+            self.state == self.CLOSED and self.failures >= self.failure_threshold
+        ):
+            logger.warning(f"Mem0 circuit breaker opened after {self.failures} failures")
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._probe_started = None
+
+
+@dataclass
+class ResilienceStats:
+    """Counters for upstream calls."""
+
+    calls: int = 0
+    retries: int = 0
+    failures: int = 0
+    rejected: int = 0
+    timeouts: int = 0
+
+
+class Resilience:
+    """Deadline, retry, rate limit and circuit breaker policy for upstream calls."""
+
+    def __init__(
+        self,
+        deadline: float = 30.0,
+        max_retries: int = 3,
+        retry_base: float = 0.2,
+        retry_max: float = 5.0,
+        rate_limit: float = 0.0,
+        rate_burst: int = 20,
+        breaker_threshold: int = 5,
+        breaker_reset: float = 30.0,
+        shared_path: Optional[str] = None,
+    ):
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.bucket = None
+        if rate_limit > 0 and shared_path:
+            self.bucket = SharedTokenBucket(rate_limit, rate_burst, shared_path)
+        elif rate_limit > 0:
+            self.bucket = TokenBucket(rate_limit, rate_burst)
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_reset)
+        self.stats = ResilienceStats()
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Delay before retry number `attempt`, with full jitter, at least Retry-After."""
+        delay = random.uniform(0, min(self.retry_max, self.retry_base * 2**attempt))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    async def call(self, attempt: Callable[[], Awaitable[T]], idempotent: bool = True) -> T:
+        """
+        Run `attempt` under the policy. Raises UpstreamError, CircuitOpenError,
+        TimeoutError or aiohttp.ClientError once retries are exhausted.
+        """
+        self.stats.calls += 1
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadline
+
+        number = 0
+        while True:
+            if not self.breaker.allow():
+                self.stats.rejected += 1
+                raise CircuitOpenError("Mem0 is unavailable (circuit breaker open)")
+
+            if self.bucket is not None:
+                try:
+                    await asyncio.wait_for(self.bucket.acquire(), deadline - loop.time())
+                except asyncio.TimeoutError:
+                    self.stats.timeouts += 1
+                    raise asyncio.TimeoutError("Mem0 call timed out waiting for the rate limiter")
+
+            retry_after = None
+            try:
+                result = await asyncio.wait_for(attempt(), deadline - loop.time())
+                self.breaker.record_success()
+                return result
+            except UpstreamError as e:
+                if e.status >= 500:
+                    self.breaker.record_failure()
+                elif e.status != 429:
+                    # Mem0 answered deliberately; the request itself is at fault
+                    self.breaker.record_success()
+                    raise
+                retryable = e.status in (RETRYABLE_STATUSES if idempotent else UNPROCESSED_STATUSES)
+                retry_after = e.retry_after
+                error: Exception = e
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.breaker.record_failure()
+                # A refused connection never reached Mem0; anything else may have
+                retryable = idempotent or isinstance(e, aiohttp.ClientConnectorError)
+                error = e
+
+            delay = self.backoff(number, retry_after)
+            if not retryable or number == self.max_retries or loop.time() + delay >= deadline:
+                self.stats.failures += 1
+                if isinstance(error, asyncio.TimeoutError) and loop.time() >= deadline:
+                    self.stats.timeouts += 1
+                    raise asyncio.TimeoutError(
+                        f"Mem0 call exceeded its {self.deadline:g}s deadline"
+                    )
+                raise error
+
+            self.stats.retries += 1
+            logger.warning(f"Retrying Mem0 call in {delay:.2f}s after: {error!r}")
+            await asyncio.sleep(delay)
+            number += 1
+
+    def info(self) -> Dict[str, Any]:
+        """Counters and breaker state, for the stats endpoint."""
+        return {**asdict(self.stats), "circuit": self.breaker.state}
@@ -0,0 +1,61 @@
+"""
+JSON serialization for the hot request paths.
+Uses orjson when it is installed (and JSON_BACKEND allows it), falling back to
+the stdlib encoder with the same compact output. Static payloads can be
+serialized once and served with an ETag.
+"""
+
+import hashlib
+import json
+import os
+from typing import Any
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+JSON_BACKEND = os.getenv("JSON_BACKEND", "auto").lower()
+USE_ORJSON = orjson is not None and JSON_BACKEND in ("auto", "orjson")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize content to compact UTF-8 JSON bytes."""
+    if USE_ORJSON:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode(
+        "utf-8"
+    )
+
+
+def loads(body: bytes) -> Any:
+    """Parse JSON bytes; errors are json.JSONDecodeError with either backend."""
+    if USE_ORJSON:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with the fastest available JSON backend."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class PrecomputedJSON:
+    """A JSON body serialized once and served with an ETag for conditional requests."""
+
+    def __init__(self, content: Any):
+        self.body = dumps(content)
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+
+    def response(self, request: Request) -> Response:
+        """Return the body, or 304 Not Modified if the client already has this version."""
+        headers = {"ETag": self.etag, "Cache-Control": "no-cache"}
+        if_none_match = request.headers.get("if-none-match", "")
+        if self.etag in (tag.strip() for tag in if_none_match.split(",")) or if_none_match == "*":
+            return Response(status_code=304, headers=headers)
+        return Response(self.body, media_type="application/json", headers=headers)
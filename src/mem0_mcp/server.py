@@ -0,0 +1,68 @@
+"""
+Production entry point shared by both servers.
+Runs uvicorn with one or more worker processes, using uvloop and httptools
+when they are installed. With several workers, cross-worker state is switched
+to the local SQLite backend and metrics to prometheus_client's multiprocess mode.
+"""
+
+import importlib.util
+import logging
+import os
+import sys
+import tempfile
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_workers(value: str) -> int:
+    """Parse a worker count; "auto" or 0 means one worker per CPU core."""
+    if str(value).lower() in ("auto", "0"):
+        return os.cpu_count() or 1
+    return max(1, int(value))
+
+
+def run_server(
+    app: Any, import_string: str, host: str, port: int, workers: int, app_dir: str
+) -> None:
+    """
+    Serve the app. A single worker runs the already imported app object;
+    several workers each import `import_string` (e.g. "app:app") from `app_dir`.
+    """
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    logger.info(f"Running {workers} worker(s) with loop={loop}, http={http}")
+
+    if workers == 1:
+        import uvicorn
+
+        uvicorn.run(app, host=host, port=port, loop=loop, http=http)
+        return
+
+    # Set before the workers start, so every worker process picks them up
+    os.environ.setdefault("SHARED_STATE", "sqlite")
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="mem0-mcp-metrics-")
+    # Replace this process with the uvicorn CLI: spawned workers re-import the
+    # parent's __main__ module, which would otherwise build the app twice per worker
+    os.execv(
+        sys.executable,
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            import_string,
+            "--host",
+            host,
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+            "--app-dir",
+            app_dir,
+            "--loop",
+            loop,
+            "--http",
+            http,
+        ],
+    )
@@ -0,0 +1,52 @@
+"""
+Local state shared between the worker processes of one host.
+With SHARED_STATE=sqlite (the default when running more than one worker) the
+response cache, the Mem0 rate limiter and /sse broadcasts go through one
+SQLite database in WAL mode, so every worker sees the same cache, draws from
+one rate budget and delivers every event. Their statements, like those of the
+write spool, run on a worker thread through SharedDatabase, so a worker
+waiting for another's lock does not stall its event loop.
+"""
+
+import asyncio
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def shared_state_path() -> Optional[str]:
+    """Path of the shared SQLite database, or None when state is kept per process."""
+    if os.getenv("SHARED_STATE", "none").lower() != "sqlite":
+        return None
+    return os.getenv("SHARED_STATE_PATH", "data/shared.sqlite3")
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """Open a SQLite database in autocommit WAL mode for use from several processes."""
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    # The timeout makes writers wait for each other's locks instead of failing
+    db = sqlite3.connect(path, isolation_level=None, check_same_thread=False, timeout=5.0)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    return db
+
+
+class SharedDatabase:
+    """A connection to a shared database whose statements run on one worker thread."""
+
+    def __init__(self, path: str):
+        self.db = connect(path)
+        # One thread, so statements on the connection never interleave
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shared-state")
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run fn(*args) on the database thread."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        self.db.close()
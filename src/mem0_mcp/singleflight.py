@@ -0,0 +1,35 @@
+"""
+Single-flight coalescing of identical concurrent upstream calls.
+The first caller for a key starts the upstream request; callers that arrive
+while it is in flight await the same task and share its result.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """Share one in-flight task between concurrent callers with the same key."""
+
+    def __init__(self):
+        self._inflight: Dict[str, "asyncio.Task[Any]"] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn() unless a call for key is already in flight, then await its result."""
+        task = self._inflight.get(key)
+        if task is None:
+            # The call runs in its own task so one waiter being cancelled
+            # (e.g. a client disconnect) does not cancel it for the others
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+            self.executed += 1
+        else:
+            self.coalesced += 1
+
+        return await asyncio.shield(task)
+
+    def __len__(self) -> int:
+        return len(self._inflight)
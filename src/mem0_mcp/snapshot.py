@@ -0,0 +1,120 @@
+"""
+Local snapshot of the Mem0 store for warm starts.
+The local search engine writes every preference it mirrors into a SQLite
+file, only touching rows that changed. On startup the snapshot is loaded back
+into the local indexes, so searches and lists are served from it right away
+while a refresh from Mem0 runs in the background. Each namespace mirrored
+locally has a snapshot file of its own, deleted when its mirror is dropped.
+"""
+
+import json
+import os
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from .namespaces import DEFAULT_NAMESPACE, Namespace
+from .shared import connect
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS mems (
+    id TEXT PRIMARY KEY,
+    content TEXT NOT NULL,
+    tags TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+"""
+
+
+class Snapshot:
+    """SQLite copy of every preference, in the order they were first seen."""
+
+    def __init__(self, path: str = "data/snapshot.sqlite3"):
+        self.path = path
+        self._db = connect(path)
+        self._db.executescript(_SCHEMA)
+
+    @classmethod
+    def from_env(cls, namespace: Namespace = DEFAULT_NAMESPACE) -> Optional["Snapshot"]:
+        """
+        Build the snapshot of a namespace from SNAPSHOT_* variables; other
+        namespaces than the default get a suffix in the file name.
+        Off unless SNAPSHOT=true.
+        """
+        if os.getenv("SNAPSHOT", "false").lower() not in ("true", "1", "yes", "on"):
+            return None
+        root, ext = os.path.splitext(os.getenv("SNAPSHOT_PATH", "data/snapshot.sqlite3"))
+        return cls(path=root + namespace.file_suffix() + ext)
+
+    def iter_batches(self, size: int = 500) -> Iterator[List[Dict[str, Any]]]:
+        """Yield the stored preferences in batches, oldest first."""
+        cursor = self._db.execute("SELECT id, content, tags FROM mems ORDER BY rowid")
+        while True:
+            rows = cursor.fetchmany(size)
+            if not rows:
+                return
+            yield [
+                {"id": mem_id, "content": content, "tags": json.loads(tags)}
+                for mem_id, content, tags in rows
+            ]
+
+    def upsert_many(self, preferences: Iterable[Dict[str, Any]]) -> None:
+        """Store preferences, rewriting only rows whose content or tags changed."""
+        rows = [
+            (p["id"], p.get("content", ""), json.dumps(p.get("tags") or []))
+            for p in preferences
+            if p.get("id") is not None
+        ]
+        if not rows:
+            return
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            self._db.executemany(
+                "INSERT INTO mems (id, content, tags) VALUES (?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET content = excluded.content, tags = excluded.tags "
+                "WHERE content != excluded.content OR tags != excluded.tags",
+                rows,
+            )
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+
+    def remove_many(self, mem_ids: Iterable[str]) -> None:
+        """Drop preferences that are gone from Mem0."""
+        self._db.executemany("DELETE FROM mems WHERE id = ?", [(i,) for i in mem_ids])
+
+    def mark_synced(self, at: Optional[float] = None) -> None:
+        """Record the time of the last complete sync from Mem0."""
+        self._db.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('synced_at', ?)",
+            (at if at is not None else time.time(),),
+        )
+
+    def synced_at(self) -> Optional[float]:
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'synced_at'").fetchone()
+        return row[0] if row is not None else None
+
+    def info(self) -> Dict[str, Any]:
+        """Entry count, time of the last complete sync and its age in seconds."""
+        (entries,) = self._db.execute("SELECT COUNT(*) FROM mems").fetchone()
+        synced_at = self.synced_at()
+        return {
+            "entries": entries,
+            "synced_at": synced_at,
+            "age_seconds": round(time.time() - synced_at, 1) if synced_at is not None else None,
+        }
+
+    def close(self) -> None:
+        self._db.close()
+
+    def remove(self) -> None:
+        """Close the snapshot and delete its file."""
+        self.close()
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.remove(self.path + suffix)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,326 @@
+"""
+Durable write-behind spool for add_coding_preference.
+In async write mode a preference is appended to a local SQLite spool and the
+caller gets a client-side ID immediately. A background worker drains the
+spool to Mem0 in batches, retrying failures with exponential backoff. Pending
+writes survive restarts and are drained on the next start; delivery is at
+least once. Each write is delivered to the namespace it was made in. The
+chunks of an oversized snippet are queued with their parent and delivered
+after it. Spool statements run on a worker thread, so a worker waiting for
+another's lock on the spool does not stall its event loop.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .chunking import PARENT_TAG
+from .namespaces import DEFAULT_NAMESPACE, Namespace
+from .shared import SharedDatabase
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS spool (
+    id TEXT PRIMARY KEY,
+    content TEXT NOT NULL,
+    tags TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    mem_id TEXT,
+    last_error TEXT,
+    namespace TEXT NOT NULL DEFAULT '',
+    parent TEXT
+);
+CREATE INDEX IF NOT EXISTS spool_due ON spool (status, next_attempt_at);
+"""
+
+# A row is due once its parent, if it has one, has been delivered
+_DUE = (
+    "FROM spool LEFT JOIN spool AS parent ON parent.id = spool.parent "
+    "WHERE spool.status = 'pending' AND (spool.parent IS NULL OR parent.status = 'done')"
+)
+
+
+class WriteSpool:
+    """SQLite-backed queue of preferences waiting to be written to Mem0."""
+
+    def __init__(
+        self,
+        path: str = "data/spool.sqlite3",
+        batch_size: int = 50,
+        max_attempts: int = 50,
+        retry_base: float = 1.0,
+        retry_max: float = 300.0,
+        retention: float = 86400.0,
+        lease: float = 120.0,
+        fsync: bool = False,
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.retention = retention
+        self.lease = lease
+
+        self._shared = SharedDatabase(path)
+        self._db = self._shared.db
+        # NORMAL survives process crashes; FULL also survives power loss at the cost of an fsync
+        if fsync:
+            self._db.execute("PRAGMA synchronous=FULL")
+        self._db.executescript(_SCHEMA)
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(spool)")}
+        if "namespace" not in columns:
+            self._db.execute("ALTER TABLE spool ADD COLUMN namespace TEXT NOT NULL DEFAULT ''")
+        if "parent" not in columns:
+            self._db.execute("ALTER TABLE spool ADD COLUMN parent TEXT")
+        self._db.execute("CREATE INDEX IF NOT EXISTS spool_parent ON spool (parent)")
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._delivered_listeners: List[Callable[[str, str], None]] = []
+
+    @classmethod
+    def from_env(cls) -> Optional["WriteSpool"]:
+        """Build the spool when WRITE_MODE=async, otherwise return None."""
+        if os.getenv("WRITE_MODE", "sync").lower() != "async":
+            return None
+        return cls(
+            path=os.getenv("SPOOL_PATH", "data/spool.sqlite3"),
+            batch_size=int(os.getenv("SPOOL_BATCH_SIZE", 50)),
+            max_attempts=int(os.getenv("SPOOL_MAX_ATTEMPTS", 50)),
+            retry_base=float(os.getenv("SPOOL_RETRY_BASE", 1.0)),
+            retry_max=float(os.getenv("SPOOL_RETRY_MAX", 300.0)),
+            retention=float(os.getenv("SPOOL_RETENTION", 86400.0)),
+            lease=float(os.getenv("SPOOL_LEASE", 120.0)),
+            fsync=os.getenv("SPOOL_FSYNC", "false").lower() in ("1", "true", "yes"),
+        )
+
+    async def append(
+        self, content: str, tags: List[str], namespace: Namespace = DEFAULT_NAMESPACE
+    ) -> Dict[str, Any]:
+        """Durably queue a preference and return its client-side ID."""
+        return (await self.append_many([(content, tags)], namespace))[0]
+
+    async def append_many(
+        self, items: List[Tuple[str, List[str]]], namespace: Namespace = DEFAULT_NAMESPACE
+    ) -> List[Dict[str, Any]]:
+        """Durably queue several preferences in one transaction; one result per item."""
+        now = time.time()
+        rows = [
+            (uuid.uuid4().hex, content, json.dumps(tags), now, namespace.key, None)
+            for content, tags in items
+        ]
+        await self._shared.run(self._insert, rows)
+        self._wakeup.set()
+        return [{"success": True, "id": row[0], "queued": True} for row in rows]
+
+    async def append_chunked(
+        self,
+        parent: Tuple[str, List[str]],
+        chunks: List[Tuple[str, List[str]]],
+        namespace: Namespace = DEFAULT_NAMESPACE,
+        before_insert: Optional[Callable[[str, List[str]], None]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Durably queue a parent and its chunks in one transaction; one result
+        per item, the parent's first. Chunks are delivered after the parent,
+        tagged "parent:<its Mem0 ID>", and fail if it does. before_insert is
+        called with the parent's and the chunks' IDs before anything is queued,
+        so nothing can be delivered before it has run.
+        """
+        now = time.time()
+        parent_id = uuid.uuid4().hex
+        rows = [(parent_id, parent[0], json.dumps(parent[1]), now, namespace.key, None)]
+        rows += [
+            (uuid.uuid4().hex, content, json.dumps(tags), now, namespace.key, parent_id)
+            for content, tags in chunks
+        ]
+        if before_insert is not None:
+            before_insert(parent_id, [row[0] for row in rows[1:]])
+        await self._shared.run(self._insert, rows)
+        self._wakeup.set()
+        return [{"success": True, "id": row[0], "queued": True} for row in rows]
+
+    def on_delivered(self, listener: Callable[[str, str], None]) -> None:
+        """Register a callback run with the spool ID and Mem0 ID of each delivered preference."""
+        self._delivered_listeners.append(listener)
+
+    def _insert(self, rows: List[tuple]) -> None:
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            self._db.executemany(
+                "INSERT INTO spool (id, content, tags, created_at, namespace, parent)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+
+    async def status(self, spool_id: str) -> Optional[Dict[str, Any]]:
+        """Delivery status of a queued preference, or None if unknown."""
+        row = await self._shared.run(self._status_row, spool_id)
+        if row is None:
+            return None
+        status, attempts, mem_id, last_error = row
+        return {
+            "id": spool_id,
+            "status": status,
+            "attempts": attempts,
+            "mem_id": mem_id,
+            "error": last_error,
+        }
+
+    def _status_row(self, spool_id: str) -> Optional[tuple]:
+        return self._db.execute(
+            "SELECT status, attempts, mem_id, last_error FROM spool WHERE id = ?", (spool_id,)
+        ).fetchone()
+
+    async def stats(self) -> Dict[str, int]:
+        """Number of spooled preferences per status."""
+        rows = await self._shared.run(self._counts)
+        return {"pending": 0, "done": 0, "failed": 0, **dict(rows)}
+
+    def _counts(self) -> List[tuple]:
+        return self._db.execute("SELECT status, COUNT(*) FROM spool GROUP BY status").fetchall()
+
+    def start(self, client) -> None:
+        """Start the background worker that drains the spool into Mem0."""
+        self._task = asyncio.create_task(self._drain_loop(client))
+
+    async def stop(self) -> None:
+        """Stop the worker. Undelivered preferences stay in the spool for the next start."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._shared.close()
+
+    async def _drain_loop(self, client) -> None:
+        while True:
+            try:
+                drained = await self.drain_once(client)
+            except Exception:
+                logger.exception("Error draining write spool")
+                drained = 0
+
+            if drained < self.batch_size:
+                # Sleep until a new append or the next retry is due
+                self._wakeup.clear()
+                try:
+                    timeout = await self._shared.run(self._next_due_in)
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+
+    def _next_due_in(self) -> float:
+        row = self._db.execute("SELECT MIN(spool.next_attempt_at) " + _DUE).fetchone()
+        if row[0] is None:
+            return self.retry_max
+        return max(0.0, min(row[0] - time.time(), self.retry_max))
+
+    async def drain_once(self, client) -> int:
+        """Send one batch of due preferences to Mem0. Returns the batch size."""
+        now = time.time()
+        rows = await self._shared.run(self._claim, now)
+        if not rows:
+            return 0
+
+        # One bulk add per namespace in the batch
+        by_namespace: Dict[str, List[tuple]] = {}
+        for row in rows:
+            by_namespace.setdefault(row[4], []).append(row)
+        delivered = []
+        for key, batch in by_namespace.items():
+            results = await client.add_many(
+                [
+                    (content, json.loads(tags) + ([PARENT_TAG + parent] if parent else []))
+                    for _, content, tags, _, _, parent in batch
+                ],
+                Namespace.from_key(key),
+            )
+            delivered.extend(zip(batch, results))
+
+        await self._shared.run(self._settle, delivered, now)
+        for row, result in delivered:
+            if result.get("success"):
+                self._notify_delivered(row[0], result.get("id"))
+        return len(rows)
+
+    def _notify_delivered(self, spool_id: str, mem_id: str) -> None:
+        for listener in self._delivered_listeners:
+            try:
+                listener(spool_id, mem_id)
+            except Exception:
+                logger.exception("Error in delivery listener")
+
+    def _claim(self, now: float) -> List[tuple]:
+        # Claim the batch by pushing its next attempt past the lease, so other
+        # workers draining the same spool skip it; a crashed worker's claim expires
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            rows = self._db.execute(
+                "SELECT spool.id, spool.content, spool.tags, spool.attempts, spool.namespace, "
+                "parent.mem_id " + _DUE + " AND spool.next_attempt_at <= ? "
+                "ORDER BY spool.created_at LIMIT ?",
+                (now, self.batch_size),
+            ).fetchall()
+            self._db.executemany(
+                "UPDATE spool SET next_attempt_at = ? WHERE id = ?",
+                [(now + self.lease, row[0]) for row in rows],
+            )
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        return rows
+
+    def _settle(self, delivered: List[Tuple[tuple, Dict[str, Any]]], now: float) -> None:
+        """Record the outcome of each delivered row: done, retried later or failed."""
+        for (spool_id, _, _, attempts, _, _), result in delivered:
+            if result.get("success"):
+                self._db.execute(
+                    "UPDATE spool SET status = 'done', mem_id = ?, last_error = NULL WHERE id = ?",
+                    (result.get("id"), spool_id),
+                )
+                continue
+
+            attempts += 1
+            if attempts >= self.max_attempts:
+                logger.error(f"Giving up on spooled preference {spool_id}: {result.get('error')}")
+                status, next_attempt_at = "failed", now
+            else:
+                # Exponential backoff with full jitter
+                delay = random.uniform(0, min(self.retry_max, self.retry_base * 2**attempts))
+                status, next_attempt_at = "pending", now + delay
+            self._db.execute(
+                "UPDATE spool SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ? "
+                "WHERE id = ?",
+                (status, attempts, next_attempt_at, str(result.get("error")), spool_id),
+            )
+            if status == "failed":
+                # Chunks are never delivered without their parent
+                self._db.execute(
+                    "UPDATE spool SET status = 'failed', last_error = ? "
+                    "WHERE parent = ? AND status = 'pending'",
+                    (f"Parent {spool_id} failed", spool_id),
+                )
+
+        # Parents are kept while chunks still need their Mem0 ID
+        self._db.execute(
+            "DELETE FROM spool WHERE status = 'done' AND created_at < ? AND NOT EXISTS "
+            "(SELECT 1 FROM spool AS child WHERE child.parent = spool.id "
+            "AND child.status = 'pending')",
+            (now - self.retention,),
+        )
@@ -0,0 +1,238 @@
+"""
+Event-driven Server-Sent Events connection manager.
+Idle SSE connections cost no wakeups: each connection waits on its own queue,
+disconnects are detected from the ASGI http.disconnect event instead of by
+polling, heartbeats for every connection come from one shared timer, and
+broadcasts are fanned out to subscribers by a single task. With
+SHARED_STATE=sqlite, broadcasts go through a SQLite event log that each worker
+polls, so subscribers on every worker receive them; the log is written and
+read on a worker thread, off the event loop.
+"""
+
+import asyncio
+import itertools
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+
+from starlette.responses import Response
+
+from .shared import SharedDatabase, shared_state_path
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_FRAME = b": ping\n\n"
+
+
+class SSEConnection:
+    """Outgoing frame queue of one connected client."""
+
+    def __init__(self, connection_id: int, queue_size: int):
+        self.id = connection_id
+        self.queue: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue(maxsize=queue_size)
+        self.closed = False
+
+    def send(self, frame: bytes) -> bool:
+        """Queue a frame without blocking. Returns False if the client is too slow to keep up."""
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def close(self) -> None:
+        """Wake the connection's writer so it ends the response."""
+        if self.closed:
+            return
+        self.closed = True
+        # Make room for the sentinel if the queue is full of undelivered frames
+        while self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class ConnectionRegistry:
+    """Central registry of SSE connections with shared heartbeat and broadcast tasks."""
+
+    # Events kept in the shared log for workers that fall behind
+    EVENT_LOG_SIZE = 1000
+
+    def __init__(
+        self,
+        heartbeat_interval: float = 15.0,
+        queue_size: int = 100,
+        shared_path: Optional[str] = None,
+        poll_interval: float = 0.2,
+    ):
+        self.heartbeat_interval = heartbeat_interval
+        self.queue_size = queue_size
+        self.poll_interval = poll_interval
+        self._connections: Dict[int, SSEConnection] = {}
+        self._ids = itertools.count(1)
+        self._outbox: "asyncio.Queue[bytes]" = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+        self._shared: Optional[SharedDatabase] = None
+        if shared_path:
+            self._shared = SharedDatabase(shared_path)
+            self._shared.db.execute(
+                "CREATE TABLE IF NOT EXISTS sse_events "
+                "(id INTEGER PRIMARY KEY AUTOINCREMENT, frame BLOB NOT NULL)"
+            )
+
+    @classmethod
+    def from_env(cls) -> "ConnectionRegistry":
+        """Build the registry from SSE_* environment variables."""
+        return cls(
+            heartbeat_interval=float(os.getenv("SSE_HEARTBEAT_INTERVAL", 15)),
+            queue_size=int(os.getenv("SSE_QUEUE_SIZE", 100)),
+            shared_path=shared_state_path(),
+            poll_interval=float(os.getenv("SSE_POLL_INTERVAL", 0.2)),
+        )
+
+    def __len__(self) -> int:
+        return len(self._connections)
+
+    async def start(self) -> None:
+        """Start the shared heartbeat timer and fan-out task."""
+        self._tasks = [asyncio.create_task(self._heartbeat())]
+        if self._shared is None:
+            self._tasks.append(asyncio.create_task(self._fan_out()))
+        else:
+            self._tasks.append(asyncio.create_task(self._publish()))
+            self._tasks.append(asyncio.create_task(self._poll_events()))
+
+    async def stop(self) -> None:
+        """Stop the shared tasks and end every open stream."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for connection in list(self._connections.values()):
+            connection.close()
+        if self._shared is not None:
+            self._shared.close()
+
+    def register(self) -> SSEConnection:
+        connection = SSEConnection(next(self._ids), self.queue_size)
+        self._connections[connection.id] = connection
+        return connection
+
+    def unregister(self, connection: SSEConnection) -> None:
+        connection.closed = True
+        self._connections.pop(connection.id, None)
+
+    def broadcast(self, frame: bytes) -> None:
+        """
+        Queue a frame for every subscriber; delivery happens on the fan-out
+        task, or through the shared event log.
+        """
+        self._outbox.put_nowait(frame)
+
+    def _deliver(self, frame: bytes) -> None:
+        for connection in list(self._connections.values()):
+            if not connection.send(frame):
+                logger.warning(f"Dropping slow SSE connection {connection.id}")
+                connection.close()
+                self.unregister(connection)
+
+    async def _fan_out(self) -> None:
+        while True:
+            self._deliver(await self._outbox.get())
+
+    async def _publish(self) -> None:
+        while True:
+            frame = await self._outbox.get()
+            try:
+                await self._shared.run(self._insert_event, frame)
+            except Exception:
+                logger.exception("Error writing shared SSE event")
+
+    def _insert_event(self, frame: bytes) -> None:
+        self._shared.db.execute("INSERT INTO sse_events (frame) VALUES (?)", (frame,))
+
+    def _last_event_id(self) -> int:
+        return self._shared.db.execute("SELECT COALESCE(MAX(id), 0) FROM sse_events").fetchone()[0]
+
+    def _read_events(self, after: int) -> List[Tuple[int, bytes]]:
+        db = self._shared.db
+        rows = db.execute(
+            "SELECT id, frame FROM sse_events WHERE id > ? ORDER BY id", (after,)
+        ).fetchall()
+        if rows:
+            db.execute("DELETE FROM sse_events WHERE id <= ?", (rows[-1][0] - self.EVENT_LOG_SIZE,))
+        return rows
+
+    async def _poll_events(self) -> None:
+        # Only events broadcast after this worker started are delivered
+        last_id = await self._shared.run(self._last_event_id)
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                rows = await self._shared.run(self._read_events, last_id)
+            except Exception:
+                logger.exception("Error reading shared SSE events")
+                continue
+            if rows:
+                last_id = rows[-1][0]
+            for _, frame in rows:
+                self._deliver(bytes(frame))
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            self._deliver(HEARTBEAT_FRAME)
+
+
+class SSEResponse(Response):
+    """
+    ASGI response that streams a registered connection's frames.
+    The writer sleeps on the connection queue; a single watcher task waits for
+    http.disconnect and closes the queue, so an idle client never wakes either.
+    """
+
+    media_type = "text/event-stream"
+
+    def __init__(self, registry: ConnectionRegistry, initial_frames: List[bytes]):
+        super().__init__(media_type=self.media_type)
+        self.registry = registry
+        self.initial_frames = initial_frames
+
+    async def __call__(self, scope, receive, send) -> None:
+        connection = self.registry.register()
+
+        async def watch_disconnect() -> None:
+            while (await receive())["type"] != "http.disconnect":
+                pass
+            connection.close()
+
+        watcher = asyncio.create_task(watch_disconnect())
+        try:
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 200,
+                    "headers": [
+                        (b"content-type", b"text/event-stream"),
+                        (b"cache-control", b"no-cache"),
+                        (b"connection", b"keep-alive"),
+                    ],
+                }
+            )
+            for frame in self.initial_frames:
+                await send({"type": "http.response.body", "body": frame, "more_body": True})
+
+            while True:
+                frame = await connection.queue.get()
+                if frame is None:
+                    break
+                await send({"type": "http.response.body", "body": frame, "more_body": True})
+
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        except OSError:
+            # The client went away between frames
+            pass
+        finally:
+            watcher.cancel()
+            self.registry.unregister(connection)
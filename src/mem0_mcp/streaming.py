@@ -0,0 +1,34 @@
+"""
+NDJSON streaming of large tool results.
+Preferences are written out page by page as they arrive from Mem0, so the
+first bytes reach the client before the whole store has been fetched.
+"""
+
+import json
+from typing import Any, AsyncIterator, Dict
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _line(payload: Dict[str, Any]) -> str:
+    return json.dumps(payload) + "\n"
+
+
+async def ndjson_preferences(pages: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """
+    Encode pages of preferences as NDJSON.
+    Emits one {"preference": ...} line per preference and a final status line,
+    {"success": true, "count": n} or {"success": false, "error": ..., "count": n}.
+    """
+    count = 0
+    async for page in pages:
+        if not page.get("success"):
+            yield _line({"success": False, "error": page.get("error"), "count": count}).encode()
+            return
+
+        preferences = page.get("preferences", [])
+        if preferences:
+            yield "".join(_line({"preference": p}) for p in preferences).encode()
+            count += len(preferences)
+
+    yield _line({"success": True, "count": count}).encode()
@@ -0,0 +1,174 @@
+"""
+Tool registry shared by every protocol adapter.
+Each tool declares its name, description, Pydantic argument model and handler
+once. Dispatch is a dict lookup, arguments are validated by the model (whose
+validator is compiled when the class is defined), and the JSON schema sent to
+clients is generated from the same model.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Type
+
+from pydantic import BaseModel, ValidationError
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Any], Awaitable[Dict[str, Any]]]
+BulkHandler = Callable[[List[Any]], Awaitable[List[Dict[str, Any]]]]
+StreamHandler = Callable[[Any], Optional[AsyncIterator[bytes]]]
+
+
+def _clean_schema(schema: Any) -> Any:
+    """Drop Pydantic's generated titles and collapse Optional[X] to X."""
+    if isinstance(schema, list):
+        return [_clean_schema(item) for item in schema]
+    if not isinstance(schema, dict):
+        return schema
+
+    schema = {
+        key: _clean_schema(value)
+        for key, value in schema.items()
+        if not (key == "title" and isinstance(value, str))
+    }
+    variants = schema.get("anyOf")
+    if variants and len(variants) == 2 and {"type": "null"} in variants:
+        schema.pop("anyOf")
+        schema.update(next(v for v in variants if v != {"type": "null"}))
+    if schema.get("default", ...) is None:
+        schema.pop("default")
+    return schema
+
+
+def input_schema(args_model: Type[BaseModel]) -> Dict[str, Any]:
+    """JSON schema of a tool's arguments, as advertised to clients."""
+    schema = _clean_schema(args_model.model_json_schema())
+    # The model docstring documents the code, not the tool
+    schema.pop("description", None)
+    schema.setdefault("required", [])
+    return schema
+
+
+def format_validation_error(error: ValidationError) -> str:
+    """One-line summary of a validation error."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc']) or 'arguments'}: {e['msg']}"
+        for e in error.errors(include_url=False)
+    )
+
+
+@dataclass
+class Tool:
+    """A tool: its public definition, argument model and handlers."""
+
+    name: str
+    description: str
+    args_model: Type[BaseModel]
+    handler: Handler
+    bulk_handler: Optional[BulkHandler] = None
+    stream_handler: Optional[StreamHandler] = None
+    latency_sensitive: bool = False
+    input_schema: Dict[str, Any] = field(init=False)
+
+    def __post_init__(self):
+        self.input_schema = input_schema(self.args_model)
+
+    def definition(self) -> Dict[str, Any]:
+        """Public definition of the tool, as sent to clients."""
+        return {
+            "name": self.name,
+            "description": self.description,
+            "input_schema": self.input_schema,
+        }
+
+
+class ToolRegistry:
+    """Tools by name, with validated dispatch."""
+
+    def __init__(self):
+        self._tools: Dict[str, Tool] = {}
+
+    def register(
+        self,
+        name: str,
+        description: str,
+        args_model: Type[BaseModel],
+        handler: Handler,
+        bulk_handler: Optional[BulkHandler] = None,
+        stream_handler: Optional[StreamHandler] = None,
+        latency_sensitive: bool = False,
+    ) -> Tool:
+        """
+        Add a tool. Names must be unique. Calls to latency-sensitive tools are
+        admitted ahead of other work when the server is busy.
+        """
+        if name in self._tools:
+            raise ValueError(f"Tool already registered: {name}")
+        tool = Tool(
+            name, description, args_model, handler, bulk_handler, stream_handler, latency_sensitive
+        )
+        self._tools[name] = tool
+        return tool
+
+    def __iter__(self) -> Iterator[Tool]:
+        return iter(self._tools.values())
+
+    def __len__(self) -> int:
+        return len(self._tools)
+
+    def get(self, name: str) -> Optional[Tool]:
+        return self._tools.get(name)
+
+    def definitions(self) -> List[Dict[str, Any]]:
+        """Public definitions of every tool."""
+        return [tool.definition() for tool in self]
+
+    async def call(self, name: str, arguments: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Validate the arguments and run a tool. Returns None if the tool is unknown."""
+        tool = self._tools.get(name)
+        if tool is None:
+            return None
+        try:
+            args = tool.args_model.model_validate(arguments or {})
+        except ValidationError as e:
+            return {"success": False, "error": f"Invalid arguments: {format_validation_error(e)}"}
+        return await tool.handler(args)
+
+    def open_stream(self, name: str, arguments: Dict[str, Any]) -> Optional[AsyncIterator[bytes]]:
+        """Start a streamed response if the tool streams for these arguments, else None."""
+        tool = self._tools.get(name)
+        if tool is None or tool.stream_handler is None:
+            return None
+        try:
+            args = tool.args_model.model_validate(arguments or {})
+        except ValidationError:
+            # Left to call(), which reports the error
+            return None
+        return tool.stream_handler(args)
+
+    def bulk_calls(
+        self,
+    ) -> Dict[str, Callable[[List[Dict[str, Any]]], Awaitable[List[Dict[str, Any]]]]]:
+        """Per tool with a bulk handler, a function running many raw calls at once."""
+
+        def make(tool: Tool):
+            async def run(arguments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+                results: List[Dict[str, Any]] = [{} for _ in arguments]
+                indexes, valid = [], []
+                for index, raw in enumerate(arguments):
+                    try:
+                        valid.append(tool.args_model.model_validate(raw or {}))
+                        indexes.append(index)
+                    except ValidationError as e:
+                        results[index] = {
+                            "success": False,
+                            "error": f"Invalid arguments: {format_validation_error(e)}",
+                        }
+                if valid:
+                    for index, result in zip(indexes, await tool.bulk_handler(valid)):
+                        results[index] = result
+                return results
+
+            return run
+
+        return {tool.name: make(tool) for tool in self if tool.bulk_handler is not None}
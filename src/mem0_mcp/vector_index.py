@@ -0,0 +1,170 @@
+"""
+Local in-process semantic search over coding preferences.
+A CPU-only embedding index of every preference, searched with a brute-force
+cosine scan in NumPy and kept in sync by local_search.LocalSearchEngine.
+Embeddings come from a local sentence-transformers model when one is
+configured, otherwise from a hashed bag of words, so the index works with no
+network access at all.
+"""
+
+import logging
+import zlib
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+from .keyword_index import tokenize
+
+logger = logging.getLogger(__name__)
+
+# Tokens whose hashes HashingEmbedder remembers before starting over
+_MAX_CACHED_TOKENS = 1 << 17
+
+
+class HashingEmbedder:
+    """Hashed bag-of-words embeddings; no model download and no network required."""
+
+    def __init__(self, dim: int = 1024):
+        self.dim = dim
+        # token -> signed bucket (+/- (column + 1)), so each token is hashed once
+        self._buckets: Dict[str, int] = {}
+
+    def _bucket(self, token: str) -> int:
+        bucket = self._buckets.get(token)
+        if bucket is None:
+            if len(self._buckets) >= _MAX_CACHED_TOKENS:
+                self._buckets.clear()
+            # crc32 is stable across processes, unlike hash()
+            h = zlib.crc32(token.encode())
+            bucket = self._buckets[token] = (h % self.dim + 1) * (1 if h & 0x80000000 else -1)
+        return bucket
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            buckets = np.fromiter((self._bucket(token) for token in tokenize(text)), dtype=np.int64)
+            np.add.at(vectors[row], np.abs(buckets) - 1, np.sign(buckets).astype(np.float32))
+        # Sublinear term frequency, then L2-normalize so a dot product is a cosine
+        np.copysign(np.log1p(np.abs(vectors)), vectors, out=vectors)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+class SentenceTransformerEmbedder:
+    """Embeddings from a small local sentence-transformers model, run on CPU."""
+
+    def __init__(self, model_name: str):
+        # Imported lazily so sentence-transformers is only needed when configured
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        return self.model.encode(texts, normalize_embeddings=True, convert_to_numpy=True).astype(
+            np.float32
+        )
+
+
+@lru_cache(maxsize=8)
+def load_embedder(model_name: Optional[str], dim: int = 1024):
+    """
+    Load the configured model, falling back to hashed bag of words of dim
+    dimensions. Cached, so every namespace's index shares one loaded model.
+    """
+    if model_name:
+        try:
+            return SentenceTransformerEmbedder(model_name)
+        except Exception:
+            logger.exception(f"Could not load embedding model {model_name}, using hashing")
+    return HashingEmbedder(dim)
+
+
+class VectorIndex:
+    """Growable matrix of normalized embeddings with brute-force cosine search."""
+
+    def __init__(self, embedder):
+        self.embedder = embedder
+        self._vectors = np.zeros((0, embedder.dim), dtype=np.float32)
+        self._size = 0
+        self._preferences: List[Dict[str, Any]] = []
+        self._positions: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return self._size
+
+    def embed(self, preferences: List[Dict[str, Any]]) -> np.ndarray:
+        """Embed preferences without touching the index, e.g. from a worker thread."""
+        return self.embedder.embed([p.get("content", "") for p in preferences])
+
+    def add_many(
+        self, preferences: List[Dict[str, Any]], vectors: Optional[np.ndarray] = None
+    ) -> None:
+        """Insert or replace preferences, keyed on their Mem0 id."""
+        if not preferences:
+            return
+
+        if vectors is None:
+            vectors = self.embed(preferences)
+        for preference, vector in zip(preferences, vectors):
+            position = self._positions.get(preference.get("id"))
+            if position is None:
+                position = self._append_slot()
+                self._preferences.append(preference)
+                if preference.get("id") is not None:
+                    self._positions[preference["id"]] = position
+            else:
+                self._preferences[position] = preference
+            self._vectors[position] = vector
+
+    def _append_slot(self) -> int:
+        # Grow capacity geometrically so inserts are amortized O(1)
+        if self._size == len(self._vectors):
+            grown = np.zeros((max(64, 2 * len(self._vectors)), self.embedder.dim), np.float32)
+            grown[: self._size] = self._vectors[: self._size]
+            self._vectors = grown
+        self._size += 1
+        return self._size - 1
+
+    def remove_many(self, mem_ids: Iterable[str]) -> None:
+        """Drop preferences, moving the last row into each freed slot."""
+        for mem_id in mem_ids:
+            position = self._positions.pop(mem_id, None)
+            if position is None:
+                continue
+            last = self._size - 1
+            if position != last:
+                self._vectors[position] = self._vectors[last]
+                self._preferences[position] = self._preferences[last]
+                moved = self._preferences[position].get("id")
+                if moved is not None:
+                    self._positions[moved] = position
+            self._preferences.pop()
+            self._size -= 1
+
+    def set_tags(self, mem_id: str, tags: List[str]) -> None:
+        """Replace the tags of an indexed preference; its vector is unchanged."""
+        position = self._positions.get(mem_id)
+        if position is not None:
+            self._preferences[position] = {**self._preferences[position], "tags": list(tags)}
+
+    def search(
+        self, query: str, limit: int, ids: Optional[Set[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Return up to limit preferences ranked by cosine similarity, with a
+        score. With ids, only those preferences are considered.
+        """
+        if not self._size:
+            return []
+
+        scores = self._vectors[: self._size] @ self.embedder.embed([query])[0]
+        if ids is not None:
+            allowed = np.zeros(self._size, dtype=bool)
+            allowed[[self._positions[i] for i in ids if i in self._positions]] = True
+            scores = np.where(allowed, scores, 0.0)
+        limit = min(limit, self._size)
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+        return [{**self._preferences[i], "score": float(scores[i])} for i in top if scores[i] > 0]
@@ -0,0 +1,131 @@
+"""
+Admission control: per-client quotas, the weighted-fair queue, shedding when
+the queue is full or too slow, and which client a request is charged to.
+"""
+
+import asyncio
+
+import pytest
+from starlette.requests import Request
+
+from mem0_mcp import AdmissionController, AdmissionSettings
+from mem0_mcp.admission import BULK, INTERACTIVE, AdmissionRejected, client_id, key_fingerprint
+
+
+def request(headers=None, host="10.0.0.7"):
+    """A bare Starlette request from `host` with the given headers."""
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/mcp",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+        "client": (host, 50000),
+    }
+    return Request(scope)
+
+
+def test_quota_sheds_calls_over_the_burst():
+    async def scenario():
+        admission = AdmissionController(AdmissionSettings(client_rate=0.01, client_burst=2))
+        for _ in range(2):
+            (await admission.acquire("a", INTERACTIVE))()
+        with pytest.raises(AdmissionRejected) as rejected:
+            await admission.acquire("a", INTERACTIVE)
+        assert rejected.value.reason == "quota"
+        assert rejected.value.retry_after > 0
+        # Another client has a bucket of its own
+        (await admission.acquire("b", INTERACTIVE))()
+        assert admission.info()["rejected"] == {"quota": 1}
+
+    asyncio.run(scenario())
+
+
+def test_per_client_quota_overrides_the_default():
+    settings = AdmissionSettings(client_rate=0, quotas={"sync": (1.0, 1.0)})
+    assert settings.quota("cursor") is None
+    assert settings.quota("sync") == (1.0, 1.0)
+
+
+def test_fair_queue_serves_light_clients_first():
+    async def scenario():
+        admission = AdmissionController(AdmissionSettings(concurrency=1))
+        release = await admission.acquire("busy", BULK)
+        order = []
+
+        async def call(client, priority):
+            done = await admission.acquire(client, priority)
+            order.append(client)
+            done()
+
+        waiting = [asyncio.create_task(call("busy", BULK)) for _ in range(3)]
+        waiting.append(asyncio.create_task(call("quiet", BULK)))
+        waiting.append(asyncio.create_task(call("search", INTERACTIVE)))
+        await asyncio.sleep(0)
+        release()
+        await asyncio.gather(*waiting)
+        # Interactive calls go first, then the client that has sent the fewest
+        assert order[:2] == ["search", "quiet"]
+        assert order[2:] == ["busy"] * 3
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_is_shed():
+    async def scenario():
+        admission = AdmissionController(AdmissionSettings(concurrency=1, queue_size=1))
+        release = await admission.acquire("a", BULK)
+        queued = asyncio.create_task(admission.acquire("b", BULK))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as rejected:
+            await admission.acquire("c", BULK)
+        assert rejected.value.reason == "queue_full"
+        release()
+        (await queued)()
+        assert admission.running == 0
+
+    asyncio.run(scenario())
+
+
+def test_slow_queue_times_out():
+    async def scenario():
+        admission = AdmissionController(AdmissionSettings(concurrency=1, queue_timeout=0.01))
+        release = await admission.acquire("a", BULK)
+        with pytest.raises(AdmissionRejected) as rejected:
+            await admission.acquire("b", BULK)
+        assert rejected.value.reason == "timeout"
+        assert len(admission) == 0
+        release()
+        assert admission.running == 0
+
+    asyncio.run(scenario())
+
+
+def test_requests_are_charged_to_their_address_by_default():
+    assert client_id(request()) == "10.0.0.7"
+    # Unknown keys and tenant headers cannot pick a fresh quota
+    spoofed = {"X-API-Key": "made-up", "X-Tenant-Id": "acme", "X-Client-Id": "fresh"}
+    assert client_id(request(spoofed)) == "10.0.0.7"
+    keys = {key_fingerprint("secret"): "cursor"}
+    assert client_id(request(spoofed), keys=keys) == "10.0.0.7"
+
+
+def test_configured_keys_and_trusted_proxies_name_the_client():
+    keys = {key_fingerprint("secret"): "cursor"}
+    assert client_id(request({"X-API-Key": "secret"}), keys=keys) == "cursor"
+    assert client_id(request({"Authorization": "Bearer secret"}), keys=keys) == "cursor"
+    assert client_id(request({"X-Client-Id": "n8n"}), trust_header=True) == "n8n"
+
+
+def test_settings_reject_non_positive_quotas_and_weights(monkeypatch):
+    monkeypatch.setenv("CLIENT_QUOTAS", "x=0/5")
+    with pytest.raises(ValueError):
+        AdmissionSettings.from_env()
+    monkeypatch.setenv("CLIENT_QUOTAS", "x=2")
+    monkeypatch.setenv("CLIENT_WEIGHTS", "x=0")
+    with pytest.raises(ValueError):
+        AdmissionSettings.from_env()
+    monkeypatch.delenv("CLIENT_WEIGHTS")
+    monkeypatch.setenv("CLIENT_KEYS", "cursor=secret")
+    settings = AdmissionSettings.from_env()
+    assert settings.quotas == {"x": (2.0, 2.0)}
+    assert settings.keys == {key_fingerprint("secret"): "cursor"}
@@ -0,0 +1,130 @@
+"""
+Batch tool calls: each item's shape is validated on its own, fan-out is
+bounded by BATCH_CONCURRENCY, adds are grouped into bulk requests, and
+results come back in request order.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+from stub_mem0 import start_stub
+
+from mem0_mcp import create_app
+from mem0_mcp.adapters import is_tool_call
+from mem0_mcp.batch import BatchSettings, run_batch
+
+
+@pytest.mark.parametrize(
+    "item,valid",
+    [
+        ({"name": "search_coding_preferences", "arguments": {"query": "a"}}, True),
+        ({"name": "get_all_coding_preferences"}, True),
+        ({"name": ["search"]}, False),
+        ({"arguments": {}}, False),
+        ("search_coding_preferences", False),
+        (5, False),
+        (None, False),
+    ],
+)
+def test_tool_call_shape(item, valid):
+    assert is_tool_call(item) is valid
+
+
+def test_fan_out_is_bounded_and_ordered():
+    async def scenario():
+        running = peak = 0
+
+        async def call_tool(name, arguments):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.001 * (10 - arguments["i"] % 10))
+            running -= 1
+            return {"i": arguments["i"]}
+
+        calls = [("echo", {"i": i}) for i in range(40)]
+        results = await run_batch(calls, call_tool, BatchSettings(concurrency=3))
+        assert peak == 3
+        assert [r["result"]["i"] for r in results] == list(range(40))
+
+    asyncio.run(scenario())
+
+
+def test_unknown_tools_and_errors_fail_on_their_own():
+    async def call_tool(name, arguments):
+        if name == "boom":
+            raise RuntimeError("boom")
+        return None if name == "nope" else {"success": True}
+
+    results = asyncio.run(
+        run_batch([("ok", {}), ("nope", {}), ("boom", {})], call_tool, BatchSettings())
+    )
+    assert [r["status"] for r in results] == [200, 400, 500]
+
+
+def test_adds_are_grouped_into_bulk_calls():
+    async def scenario():
+        groups = []
+
+        async def bulk_add(arguments):
+            groups.append(len(arguments))
+            return [{"success": True, "n": a["n"]} for a in arguments]
+
+        async def call_tool(name, arguments):
+            return {"success": True, "n": arguments["n"]}
+
+        calls = [("add", {"n": n}) if n % 3 else ("search", {"n": n}) for n in range(15)]
+        results = await run_batch(
+            calls, call_tool, BatchSettings(bulk_add_size=4), bulk={"add": bulk_add}
+        )
+        assert sorted(groups) == [2, 4, 4]
+        assert [r["result"]["n"] for r in results] == list(range(15))
+
+    asyncio.run(scenario())
+
+
+@asynccontextmanager
+async def app_client():
+    """An HTTP client for the app against a fresh stub."""
+    runner, stub, base_url = await start_stub()
+    app = create_app("test", base_url)
+    try:
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                yield client
+    finally:
+        await runner.cleanup()
+
+
+def test_malformed_items_do_not_fail_the_batch():
+    async def scenario():
+        async with app_client() as client:
+            batch = [
+                {
+                    "name": "add_coding_preference",
+                    "arguments": {"title": "a", "content": "x = 1", "language": "python"},
+                },
+                5,
+                {"name": ["x"]},
+                {"name": "search_coding_preferences", "arguments": {"query": "x"}},
+            ]
+            response = await client.post("/mcp", json=batch)
+            assert response.status_code == 200
+            assert [r["status"] for r in response.json()] == [200, 400, 400, 200]
+
+    asyncio.run(scenario())
+
+
+def test_oversized_batch_is_refused(monkeypatch):
+    monkeypatch.setenv("BATCH_MAX_SIZE", "2")
+
+    async def scenario():
+        async with app_client() as client:
+            call = {"name": "get_all_coding_preferences", "arguments": {}}
+            response = await client.post("/mcp", json=[call] * 3)
+            assert response.status_code == 400
+
+    asyncio.run(scenario())
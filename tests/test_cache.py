@@ -0,0 +1,78 @@
+"""
+Response cache generations: a fill that started before a write to its
+partition is dropped, so a read racing a write cannot cache what the write
+changed. Covered for the in-process and the shared SQLite backends, and end
+to end through Mem0Client against the stub.
+"""
+
+import asyncio
+
+import pytest
+from stub_mem0 import start_stub
+
+from mem0_mcp import ClientSettings, Mem0Client, ResponseCache
+
+KEY = "acme/-/-|search:retry"
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def cache(request, tmp_path):
+    if request.param == "memory":
+        return ResponseCache()
+    return ResponseCache(shared_path=str(tmp_path / "shared.sqlite3"))
+
+
+def test_fill_racing_a_write_is_discarded(cache):
+    async def scenario():
+        generation = await cache.generation(KEY)
+        await cache.invalidate(["acme/-/-"])
+        await cache.set(KEY, {"success": True, "preferences": []}, generation)
+        assert await cache.get(KEY) is None
+        await cache.close()
+
+    asyncio.run(scenario())
+
+
+def test_writes_elsewhere_keep_the_fill(cache):
+    async def scenario():
+        generation = await cache.generation(KEY)
+        await cache.invalidate(["other/-/-"])
+        await cache.set(KEY, {"success": True, "preferences": []}, generation)
+        assert await cache.get(KEY) == {"success": True, "preferences": []}
+        await cache.close()
+
+    asyncio.run(scenario())
+
+
+def test_invalidating_everything_discards_the_fill(cache):
+    async def scenario():
+        generation = await cache.generation(KEY)
+        await cache.invalidate()
+        await cache.set(KEY, {"success": True, "preferences": []}, generation)
+        assert await cache.get(KEY) is None
+        await cache.close()
+
+    asyncio.run(scenario())
+
+
+def test_search_racing_an_add_does_not_cache_the_old_result():
+    async def scenario():
+        runner, stub, base_url = await start_stub(latency_ms=50)
+        cache = ResponseCache()
+        client = Mem0Client(base_url, "test", ClientSettings(), cache=cache)
+        try:
+            search = asyncio.create_task(client.search("retry"))
+            await asyncio.sleep(0.01)
+            # The add lands while the search is still waiting for its response
+            stub.latency_ms = 0
+            await client.add("retry with backoff", [])
+            await search
+            assert cache.stats.discarded_fills == 1
+            # So the next search goes upstream again instead of hitting the cache
+            assert len((await client.search("retry"))["preferences"]) == 1
+            assert cache.stats.misses == 2
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    asyncio.run(scenario())
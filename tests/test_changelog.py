@@ -0,0 +1,132 @@
+"""
+Change log behind incremental listings: sync tokens, deltas since a token in
+pages, namespace separation, retags and deletions, tokens from another log,
+and get_all_coding_preferences(since=...) through CodingPreferences.
+"""
+
+import asyncio
+
+import pytest
+from stub_mem0 import start_stub
+
+from mem0_mcp import ClientSettings, Mem0Client
+from mem0_mcp.changelog import ChangeLog
+from mem0_mcp.namespaces import Namespace
+from mem0_mcp.preferences import CodingPreferences, GetAllCodingPreferencesArgs
+
+
+@pytest.fixture
+def log(tmp_path):
+    changes = ChangeLog(str(tmp_path / "changes.sqlite3"), max_page_size=2)
+    yield changes
+    changes.close()
+
+
+def memory(mem_id, namespace=Namespace(), tags=()):
+    return {
+        "id": mem_id,
+        "content": f"content of {mem_id}",
+        "tags": list(tags),
+        "namespace": namespace,
+    }
+
+
+def ids(result):
+    return [preference["id"] for preference in result["preferences"]]
+
+
+def test_since_lists_only_later_changes(log):
+    log.record(memory("a"))
+    token = log.token()
+    log.record(memory("b"))
+    result = log.since(token)
+    assert ids(result) == ["b"]
+    assert result["has_more"] is False
+    assert ids(log.since(result["sync_token"])) == []
+
+
+def test_deltas_are_paged_in_version_order(log):
+    token = log.token()
+    for mem_id in "abcde":
+        log.record(memory(mem_id))
+    seen = []
+    while True:
+        result = log.since(token)
+        seen += ids(result)
+        token = result["sync_token"]
+        if not result["has_more"]:
+            break
+    assert seen == list("abcde")
+    assert ids(log.since(f"{log.log_id}.0", limit=1)) == ["a"]
+
+
+def test_retags_move_a_memory_to_the_end(log):
+    token = log.token()
+    log.record(memory("a"))
+    log.record(memory("b"))
+    assert log.set_tags("a", ["x"])
+    assert not log.set_tags("unknown", ["x"])
+    result = log.since(token)
+    assert ids(result) == ["b", "a"]
+    assert result["preferences"][1]["tags"] == ["x"]
+    assert log.info()["entries"] == 2
+
+
+def test_deltas_stay_within_their_namespace(log):
+    token = log.token()
+    log.record(memory("a", Namespace("acme")))
+    log.record(memory("b", Namespace("other")))
+    assert ids(log.since(token, Namespace("acme"))) == ["a"]
+    assert ids(log.since(token)) == ["a", "b"]
+
+
+def test_forgotten_memories_leave_the_deltas(log):
+    token = log.token()
+    log.record(memory("a"))
+    log.record(memory("b"))
+    log.forget(["a"])
+    assert ids(log.since(token)) == ["b"]
+
+
+def test_tokens_from_another_log_are_not_answered(log, tmp_path):
+    other = ChangeLog(str(tmp_path / "other.sqlite3"))
+    other.record(memory("a"))
+    assert log.since(other.token()) is None
+    # A version this log has not reached yet means the log was recreated
+    assert log.since(f"{log.log_id}.5") is None
+    assert log.since("garbage")["status"] == 400
+    other.close()
+
+
+def test_incremental_listing_through_the_tools(tmp_path):
+    async def scenario():
+        runner, stub, base_url = await start_stub()
+        client = Mem0Client(base_url, "test", ClientSettings())
+        changes = ChangeLog(str(tmp_path / "changes.sqlite3"))
+        client.on_add(changes.record)
+        preferences = CodingPreferences(client, changes=changes)
+        try:
+            await client.add("first", [])
+            listing = await preferences.get_all(GetAllCodingPreferencesArgs())
+            assert len(listing["preferences"]) == 1
+
+            await client.add("second", [])
+            delta = await preferences.get_all(
+                GetAllCodingPreferencesArgs(since=listing["sync_token"])
+            )
+            assert [p["content"] for p in delta["preferences"]] == ["second"]
+
+            # A token from a recreated log falls back to a full listing
+            reset = await preferences.get_all(GetAllCodingPreferencesArgs(since="0123.0"))
+            assert reset["reset"] and len(reset["preferences"]) == 2
+            assert reset["sync_token"] == changes.token()
+
+            without = CodingPreferences(client)
+            result = await without.get_all(GetAllCodingPreferencesArgs(since=reset["sync_token"]))
+            assert result["status"] == 400
+        finally:
+            changes.close()
+            await client.close()
+            await runner.cleanup()
+
+    asyncio.run(scenario())
@@ -0,0 +1,163 @@
+"""
+Chunking of oversized snippets: split/join round trips, chunked adds against
+the stub (including the cleanup after a failed chunk and delivery through the
+write spool), and the request body size limits.
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+import pytest
+from starlette.requests import Request
+from stub_mem0 import start_stub
+
+from mem0_mcp import ClientSettings, Mem0Client
+from mem0_mcp.chunking import ChunkIndex, join, split
+from mem0_mcp.preferences import AddCodingPreferenceArgs, CodingPreferences, GetCodingPreferenceArgs
+from mem0_mcp.request_body import BodyTooLarge, read_body
+from mem0_mcp.spool import WriteSpool
+
+CODE = "\n".join(f"def helper_{i}(value):\n    return value * {i}" for i in range(300))
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs():
+    # Injected failures are expected
+    logging.disable(logging.ERROR)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+@pytest.mark.parametrize(
+    "content,size,overlap",
+    [
+        (CODE, 500, 50),
+        (CODE, 500, 0),
+        ("x" * 1234, 100, 30),
+        ("short", 100, 10),
+        ("a\n" * 200, 7, 3),
+    ],
+)
+def test_split_and_join_round_trip(content, size, overlap):
+    spans = split(content, size, overlap)
+    assert spans[0][0] == 0 and spans[-1][1] == len(content)
+    assert all(end - start <= size for start, end in spans)
+    assert join([content[start:end] for start, end in spans], spans) == content
+
+
+def test_chunks_end_at_line_ends():
+    spans = split(CODE, 500, 50)
+    assert all(CODE[end - 1] == "\n" for _, end in spans[:-1])
+
+
+@asynccontextmanager
+async def chunked_preferences(tmp_path, spool=False):
+    """CodingPreferences with chunking against a fresh stub, optionally in async write mode."""
+    runner, stub, base_url = await start_stub()
+    client = Mem0Client(base_url, "test", ClientSettings(retry_base=0.001, retry_max=0.01))
+    chunks = ChunkIndex(str(tmp_path / "chunks.sqlite3"), threshold=1000, size=500, overlap=50)
+    write_spool = WriteSpool(str(tmp_path / "spool.sqlite3")) if spool else None
+    if write_spool is not None:
+        write_spool.on_delivered(chunks.resolve)
+    try:
+        yield CodingPreferences(client, write_spool, chunks=chunks), client, stub
+    finally:
+        if write_spool is not None:
+            await write_spool.stop()
+        chunks.close()
+        await client.close()
+        await runner.cleanup()
+
+
+def big_add():
+    return AddCodingPreferenceArgs(title="Helpers", content=CODE, language="python", tags=["big"])
+
+
+def test_chunked_add_is_put_back_together(tmp_path):
+    async def scenario():
+        async with chunked_preferences(tmp_path) as (preferences, _, stub):
+            result = await preferences.add(big_add())
+            assert result["success"] and result["parts"] > 1
+            assert len(stub.mems) == result["parts"] + 1
+            got = await preferences.get(GetCodingPreferenceArgs(id=result["id"]))
+            assert CODE in got["preference"]["content"]
+
+    asyncio.run(scenario())
+
+
+def test_failed_chunk_deletes_what_was_stored(tmp_path):
+    async def scenario():
+        async with chunked_preferences(tmp_path) as (preferences, client, stub):
+            add_many = client.add_many
+
+            async def second_chunk_fails(items, namespace):
+                stored = await add_many(items[:1], namespace)
+                return stored + [{"success": False, "error": "boom"}] * (len(items) - 1)
+
+            client.add_many = second_chunk_fails
+            result = await preferences.add(big_add())
+            assert not result["success"]
+            assert "boom" in result["error"]
+            assert stub.mems == []
+
+    asyncio.run(scenario())
+
+
+def test_async_chunks_are_delivered_after_their_parent(tmp_path):
+    async def scenario():
+        async with chunked_preferences(tmp_path, spool=True) as (preferences, client, stub):
+            result = await preferences.add(big_add())
+            assert result["queued"] and result["parts"] > 1
+            assert stub.mems == []
+
+            # The first drain can only deliver the parent
+            assert await preferences.write_spool.drain_once(client) == 1
+            parent_id = (await preferences.write_spool.status(result["id"]))["mem_id"]
+            assert await preferences.write_spool.drain_once(client) == result["parts"]
+            assert all(f"parent:{parent_id}" in mem["tags"] for mem in stub.mems[1:])
+
+            got = await preferences.get(GetCodingPreferenceArgs(id=parent_id))
+            assert CODE in got["preference"]["content"]
+
+    asyncio.run(scenario())
+
+
+def test_chunks_fail_with_their_parent(tmp_path):
+    async def scenario():
+        async with chunked_preferences(tmp_path, spool=True) as (preferences, client, stub):
+            preferences.write_spool.max_attempts = 1
+            stub.down = True
+            result = await preferences.add(big_add())
+            await preferences.write_spool.drain_once(client)
+            stats = await preferences.write_spool.stats()
+            assert stats == {"pending": 0, "done": 0, "failed": result["parts"] + 1}
+
+    asyncio.run(scenario())
+
+
+def request_with_body(chunks, content_length=None):
+    """A Starlette request whose body arrives in the given chunks."""
+    headers = [] if content_length is None else [(b"content-length", str(content_length).encode())]
+    messages = [{"type": "http.request", "body": c, "more_body": True} for c in chunks]
+    messages.append({"type": "http.request", "body": b"", "more_body": False})
+
+    async def receive():
+        return messages.pop(0)
+
+    return Request({"type": "http", "method": "POST", "headers": headers}, receive)
+
+
+def test_body_within_the_limit_is_read():
+    body = asyncio.run(read_body(request_with_body([b"a" * 60, b"b" * 40]), 100))
+    assert body == b"a" * 60 + b"b" * 40
+
+
+def test_declared_oversized_body_is_refused():
+    with pytest.raises(BodyTooLarge):
+        asyncio.run(read_body(request_with_body([b"x"], content_length=101), 100))
+
+
+def test_streamed_oversized_body_is_refused():
+    with pytest.raises(BodyTooLarge):
+        asyncio.run(read_body(request_with_body([b"x" * 60, b"x" * 60]), 100))
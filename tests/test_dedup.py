@@ -0,0 +1,101 @@
+"""
+Duplicate detection: exact fingerprints over whitespace-normalized code,
+SimHash near-duplicates, namespace separation, and duplicate adds answered
+with the stored memory through CodingPreferences.
+"""
+
+import asyncio
+
+import pytest
+from stub_mem0 import start_stub
+
+from mem0_mcp import ClientSettings, Mem0Client
+from mem0_mcp.dedup import DedupIndex, fingerprint, simhash
+from mem0_mcp.namespaces import Namespace
+from mem0_mcp.preferences import AddCodingPreferenceArgs, CodingPreferences
+
+CODE = "\n".join(
+    f"def handler_{i}(request):\n    return respond(request, status={i})" for i in range(40)
+)
+
+
+@pytest.fixture
+def index(tmp_path):
+    dedup = DedupIndex(str(tmp_path / "dedup.sqlite3"), near_duplicates=True)
+    yield dedup
+    dedup.close()
+
+
+def test_fingerprint_ignores_whitespace_and_language_case():
+    assert fingerprint("Python", "x = 1\n\n  y = 2") == fingerprint("python", "x = 1 y = 2")
+    assert fingerprint("python", "x = 1") != fingerprint("javascript", "x = 1")
+    assert fingerprint("python", "x = 1") != fingerprint("python", "x = 1", Namespace("acme"))
+
+
+def test_simhash_skips_snippets_too_short_to_compare():
+    assert simhash("x = 1") is None
+    assert simhash(CODE) is not None
+
+
+def test_exact_duplicates_are_found(index):
+    index.record("python", CODE, "mem-1", ["a"])
+    duplicate = index.find("PYTHON", "  " + CODE.replace("\n", "\n\n"))
+    assert (duplicate.mem_id, duplicate.kind, duplicate.tags) == ("mem-1", "exact", ["a"])
+    assert index.info()["exact_hits"] == 1
+
+
+def test_small_edits_are_near_duplicates(index):
+    index.record("python", CODE, "mem-1", [])
+    duplicate = index.find("python", CODE + "\n# retry on failure")
+    assert (duplicate.mem_id, duplicate.kind) == ("mem-1", "near")
+    assert duplicate.distance <= index.max_distance
+    assert index.find("python", "def other():\n    return compute(a, b, c) + 1\n" * 3) is None
+    # Other languages never match
+    assert index.find("javascript", CODE + "\n# retry on failure") is None
+
+
+def test_exact_mode_ignores_near_duplicates(tmp_path):
+    index = DedupIndex(str(tmp_path / "dedup.sqlite3"))
+    index.record("python", CODE, "mem-1", [])
+    assert index.find("python", CODE + "\n# retry on failure") is None
+    index.close()
+
+
+def test_duplicates_stay_within_their_namespace(index):
+    index.record("python", CODE, "mem-1", [], namespace=Namespace("acme"))
+    assert index.find("python", CODE, Namespace("acme")).mem_id == "mem-1"
+    assert index.find("python", CODE, Namespace("other")) is None
+    assert index.find("python", CODE + "\n# edit", Namespace("other")) is None
+
+
+def test_queued_ids_resolve_and_deleted_memories_are_forgotten(index):
+    index.record("python", CODE, "spool-1", [], queued=True)
+    assert index.find("python", CODE).queued
+    index.resolve("spool-1", "mem-1")
+    duplicate = index.find("python", CODE)
+    assert (duplicate.mem_id, duplicate.queued) == ("mem-1", False)
+    index.forget("mem-1")
+    assert index.find("python", CODE) is None
+
+
+def test_duplicate_add_merges_tags_into_the_stored_memory(index):
+    async def scenario():
+        runner, stub, base_url = await start_stub()
+        client = Mem0Client(base_url, "test", ClientSettings())
+        preferences = CodingPreferences(client, dedup=index)
+        try:
+            args = AddCodingPreferenceArgs(title="h", content=CODE, language="python", tags=["a"])
+            first = await preferences.add(args)
+            again = await preferences.add(args.model_copy(update={"tags": ["b"]}))
+            assert again == {"success": True, "id": first["id"], "duplicate": "exact"}
+            assert len(stub.mems) == 1
+            assert stub.mems[0]["tags"] == ["a", "b"]
+
+            near = await preferences.add(args.model_copy(update={"content": CODE + "\n# edit"}))
+            assert (near["id"], near["duplicate"]) == (first["id"], "near")
+            assert len(stub.mems) == 1
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    asyncio.run(scenario())
@@ -0,0 +1,128 @@
+"""
+Local search: BM25 ranking of the keyword index, its language and tag facets,
+reciprocal-rank fusion, and filtered keyword and hybrid searches through
+CodingPreferences against the stub.
+"""
+
+import asyncio
+
+from stub_mem0 import start_stub
+
+from mem0_mcp import ClientSettings, LocalSearchEngine, LocalSearchPartitions, Mem0Client
+from mem0_mcp.keyword_index import KeywordIndex, tokenize
+from mem0_mcp.local_search import fuse
+from mem0_mcp.preferences import (
+    AddCodingPreferenceArgs,
+    CodingPreferences,
+    SearchCodingPreferencesArgs,
+    format_preference,
+)
+
+
+def preference(mem_id, title, code, language="python", tags=()):
+    args = AddCodingPreferenceArgs(title=title, content=code, language=language)
+    return {"id": mem_id, "content": format_preference(args), "tags": list(tags)}
+
+
+PREFERENCES = [
+    preference("retry", "Retry with backoff", "def retry(call):\n    sleep(backoff)", tags=["net"]),
+    preference("cache", "LRU cache", "def cached(key):\n    return lru[key]", tags=["perf"]),
+    preference("fetch", "Fetch JSON", "async def fetch(url):\n    await retry(get(url))"),
+    preference("js", "Retry in JS", "function retry(fn) { return fn() }", "javascript", ["net"]),
+]
+
+
+def keyword_index():
+    index = KeywordIndex()
+    index.add_many(PREFERENCES)
+    return index
+
+
+def ids(results):
+    return [result["id"] for result in results]
+
+
+def test_identifiers_are_split_into_words():
+    assert tokenize("fetchJsonData snake_case") == [
+        "fetchjsondata",
+        "fetch",
+        "json",
+        "data",
+        "snake_case",
+        "snake",
+        "case",
+    ]
+
+
+def test_bm25_ranks_title_matches_first():
+    results = keyword_index().search("retry", 10)
+    assert set(ids(results)) == {"retry", "fetch", "js"}
+    # "retry" is in the titles of two of them and only in the code of fetch
+    assert ids(results)[-1] == "fetch"
+    assert all(a["score"] >= b["score"] for a, b in zip(results, results[1:]))
+
+
+def test_language_and_tag_filters():
+    index = keyword_index()
+    assert ids(index.search("retry", 10, language="JavaScript")) == ["js"]
+    assert set(ids(index.search("retry", 10, tags=["net"]))) == {"retry", "js"}
+    assert ids(index.search("retry", 10, language="python", tags=["net"])) == ["retry"]
+    assert index.search("retry", 10, tags=["net", "perf"]) == []
+
+
+def test_empty_query_lists_the_newest_matches():
+    index = keyword_index()
+    assert ids(index.search("", 2)) == ["js", "fetch"]
+    assert ids(index.search("", 10, language="python", tags=["perf"])) == ["cache"]
+
+
+def test_retags_and_removals_update_the_facets():
+    index = keyword_index()
+    index.set_tags("cache", ["net"])
+    assert set(ids(index.search("", 10, tags=["net"]))) == {"retry", "js", "cache"}
+    index.remove_many(["retry"])
+    assert "retry" not in ids(index.search("retry", 10))
+    assert index.get("retry") is None
+
+
+def test_fusion_favours_results_ranked_by_both():
+    keyword = [{"id": "a"}, {"id": "b"}, {"id": "c"}]
+    semantic = [{"id": "c"}, {"id": "d"}, {"id": "b"}]
+    fused = fuse([keyword, semantic], 3)
+    assert ids(fused) == ["c", "b", "a"]
+    assert fused[0]["score"] > fused[1]["score"] > fused[2]["score"]
+
+
+def search_args(**arguments):
+    return SearchCodingPreferencesArgs(**arguments)
+
+
+def test_filtered_and_hybrid_searches_through_the_tools():
+    async def scenario():
+        runner, stub, base_url = await start_stub()
+        stub.mems.extend(dict(p) for p in PREFERENCES)
+        client = Mem0Client(base_url, "test", ClientSettings())
+        engine = LocalSearchEngine()
+        engine.keywords.add_many(PREFERENCES)
+        engine.ready = True
+        preferences = CodingPreferences(
+            client, local_search=LocalSearchPartitions(engine, LocalSearchEngine)
+        )
+        try:
+            # Filtered searches are keyword searches, answered locally
+            requests = stub.requests
+            result = await preferences.search(search_args(query="retry", language="javascript"))
+            assert ids(result["preferences"]) == ["js"]
+            assert stub.requests == requests
+
+            # Hybrid fuses the local ranking with Mem0's, both filtered
+            result = await preferences.search(
+                search_args(query="retry", mode="hybrid", tags=["net"], limit=5)
+            )
+            assert set(ids(result["preferences"])) == {"retry", "js"}
+            assert stub.requests == requests + 1
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    asyncio.run(scenario())
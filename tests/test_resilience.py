@@ -0,0 +1,163 @@
+"""
+Behavior of the Mem0 resilience layer against the fault-injecting stub in
+benchmarks/stub_mem0.py: retries, Retry-After, the circuit breaker, the
+per-call deadline and the stale cache fallback.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+
+import pytest
+from stub_mem0 import start_stub
+
+from mem0_mcp import ClientSettings, Mem0Client, ResponseCache
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs():
+    # Injected failures are expected
+    logging.disable(logging.ERROR)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+@asynccontextmanager
+async def stub_client(cache=None, stub_options=None, **settings):
+    """A Mem0Client against a fresh stub; no cache and fast retries unless given."""
+    runner, stub, base_url = await start_stub(**(stub_options or {}))
+    settings.setdefault("retry_base", 0.001)
+    settings.setdefault("retry_max", 0.01)
+    client = Mem0Client(base_url, "test", ClientSettings(**settings), cache=cache)
+    try:
+        yield client, stub
+    finally:
+        await client.close()
+        await runner.cleanup()
+
+
+def test_transient_503s_are_retried():
+    async def scenario():
+        async with stub_client(max_retries=3) as (client, stub):
+            stub.fail_next = 2
+            result = await client.search("retry")
+            assert result["success"]
+            assert stub.faults == 2
+            assert client.resilience.stats.retries == 2
+            assert client.resilience.breaker.state == "closed"
+
+    asyncio.run(scenario())
+
+
+def test_gives_up_after_max_retries():
+    async def scenario():
+        async with stub_client(max_retries=2) as (client, stub):
+            stub.down = True
+            result = await client.search("outage")
+            assert not result["success"]
+            assert stub.faults == 3
+            assert client.resilience.stats.failures == 1
+
+    asyncio.run(scenario())
+
+
+def test_client_errors_are_not_retried():
+    async def scenario():
+        async with stub_client(stub_options={"error_status": 400}) as (client, stub):
+            stub.fail_next = 1
+            result = await client.search("bad request")
+            assert not result["success"]
+            assert stub.faults == 1
+            assert client.resilience.stats.retries == 0
+            # Mem0 answered, so the breaker does not count it
+            assert client.resilience.breaker.failures == 0
+
+    asyncio.run(scenario())
+
+
+def test_retry_after_is_honored():
+    async def scenario():
+        options = {"error_status": 429, "retry_after": 0.3}
+        async with stub_client(stub_options=options) as (client, stub):
+            stub.fail_next = 1
+            started = time.perf_counter()
+            result = await client.search("throttled")
+            assert result["success"]
+            assert time.perf_counter() - started >= 0.3
+
+    asyncio.run(scenario())
+
+
+def test_adds_are_only_retried_when_mem0_did_not_process_them():
+    async def scenario():
+        async with stub_client(stub_options={"error_status": 500}) as (client, stub):
+            stub.fail_next = 1
+            assert not (await client.add("x = 1", []))["success"]
+            assert stub.faults == 1
+
+            # A 503 means the write was never applied, so it is safe to send again
+            stub.error_status = 503
+            stub.fail_next = 1
+            assert (await client.add("x = 1", []))["success"]
+            assert len(stub.mems) == 1
+
+    asyncio.run(scenario())
+
+
+def test_circuit_breaker_opens_and_recovers():
+    async def scenario():
+        settings = {"max_retries": 0, "breaker_threshold": 3, "breaker_reset": 0.2}
+        async with stub_client(**settings) as (client, stub):
+            stub.down = True
+            for i in range(3):
+                assert not (await client.search(f"down {i}"))["success"]
+            assert client.resilience.breaker.state == "open"
+
+            # Open: calls fail fast without reaching Mem0
+            requests = stub.requests
+            assert not (await client.search("rejected"))["success"]
+            assert stub.requests == requests
+            assert client.resilience.stats.rejected == 1
+
+            # After the cool-down a failed probe opens it again
+            await asyncio.sleep(0.25)
+            assert not (await client.search("probe"))["success"]
+            assert stub.requests == requests + 1
+            assert client.resilience.breaker.state == "open"
+
+            # A successful probe closes it
+            stub.down = False
+            await asyncio.sleep(0.25)
+            assert (await client.search("recovered"))["success"]
+            assert client.resilience.breaker.state == "closed"
+
+    asyncio.run(scenario())
+
+
+def test_deadline_bounds_slow_calls():
+    async def scenario():
+        options = {"latency_ms": 1000}
+        async with stub_client(stub_options=options, deadline=0.2, max_retries=3) as (client, _):
+            started = time.perf_counter()
+            result = await client.search("slow")
+            assert not result["success"]
+            assert time.perf_counter() - started < 0.6
+            assert client.resilience.stats.timeouts == 1
+
+    asyncio.run(scenario())
+
+
+def test_stale_cache_is_served_while_mem0_is_down():
+    async def scenario():
+        cache = ResponseCache(ttl=0.0)
+        async with stub_client(cache=cache, max_retries=0) as (client, stub):
+            await client.add("def cached(): pass", ["py"])
+            assert (await client.search("cached"))["success"]
+
+            stub.down = True
+            result = await client.search("cached")
+            assert result["success"] and result["stale"]
+            assert not (await client.search("never cached"))["success"]
+
+    asyncio.run(scenario())